@@ -1,46 +1,26 @@
 import datetime
 import logging
-import os
 import pprint
 from numerize import numerize
 import sqlite3
+import sys
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-from typing import Callable
-import pandas as pd
-from dateutil.relativedelta import relativedelta
+from tkinter import ttk, messagebox
+from typing import TYPE_CHECKING, Callable
 from tkcalendar import Calendar
 from ttkthemes import ThemedStyle
-import openpyxl
-import matplotlib.pyplot as plt
-from google.auth.transport.requests import Request  # type: ignore
-from google.oauth2.credentials import Credentials  # type: ignore
-from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
-from googleapiclient.http import MediaFileUpload  # type: ignore
-from googleapiclient.errors import HttpError  # type: ignore
 
+import expense_db
+import expense_ops
+from drive_uploader import DriveUploader, drive_service, load_credentials
+from expense_db import create_database
+from tk_tasks import TaskRunner
+from tk_virtual_list import VirtualList
 
-def create_database():
-    try:
-        connection = sqlite3.connect('Expenses.db')
-        cursor = connection.cursor()
-
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS Transactions (
-                Id INTEGER PRIMARY KEY AUTOINCREMENT,
-                Date DATE NOT NULL,
-                Category TEXT NOT NULL,
-                Description TEXT,
-                Amount FLOAT NOT NULL,
-                Available FLOAT  NOT NULL,
-                Total FLOAT NOT NULL)
-        ''')
-        connection.commit()
-        logging.info('Created database!')
-        connection.close()
-    except sqlite3.DatabaseError as error:
-        logging.info(f'Error creating database! {error}')
+# pandas, openpyxl and matplotlib come in through expense_reports and expense_analytics, which are
+# imported by the exports and the view worker that need them so the window opens without them
+if TYPE_CHECKING:
+    from expense_analytics import ExpenseStore
 
 
 def show_message(message_label: tk.Label, text: str, colour: str, duration=2000) -> None:
@@ -58,78 +38,35 @@ def show_message(message_label: tk.Label, text: str, colour: str, duration=2000)
     message_label.after(duration, lambda: message_label.pack_forget())
 
 
-def upload(folder_name: str, filename: str):
-    """
-        Upload the database file to Google Drive.
+TOKEN_FILE = r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json'
+CREDENTIALS_FILE = r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\Drive_Credentials.json'
+PROJECT_DIR = r'C:\Users\huzai\PycharmProjects\Python-projects-1'
 
-        This function uploads the database file to a designated folder in Google Drive
-        after validating a provided passcode.
+uploader = DriveUploader(lambda: drive_service(load_credentials(TOKEN_FILE, CREDENTIALS_FILE)), PROJECT_DIR)
 
-        Args:
-            folder_name: The name of the folder to upload to Google Drive.
-            filename: The name of the database file to upload to folder
 
+def upload(folder_name: str, filename: str, message_label: tk.Label | None = None):
     """
-    global creds
-    try:
-        SCOPES = ['https://www.googleapis.com/auth/drive']
-        creds = None
-        if os.path.exists(r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json'):
-            creds = Credentials.from_authorized_user_file(
-                r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json', SCOPES)
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\Drive_Credentials.json', SCOPES)
-                creds = flow.run_local_server(port=0)
-            with open(r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json', 'w') as token:
-                token.write(creds.to_json())
-    except Exception as error:
-        logging.info(f"An error occurred {error}!")
-
-    try:
-        service = build('drive', 'v3', credentials=creds)
+        Queue a file for upload to Google Drive.
 
-        response = service.files().list(
-            q=f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder'",
-            spaces='drive').execute()
+        The upload runs on the uploader's background thread, the GUI only hears back through
+        the completion callback once it finishes.
 
-        if not response['files']:
-            file_metadata = {
-                "name": f"{folder_name}",
-                "mimeType": "application/vnd.google-apps.folder",
-            }
+        Args:
+            folder_name: The name of the folder to upload to Google Drive.
+            filename: The name of the file to upload to folder
+            message_label: The label to report the finished upload on, if any.
 
-            file = service.files().create(body=file_metadata, fields="id").execute()
-            folder_id = file.get('id')
+    """
+    def uploaded(file_id: str | None, error: Exception | None) -> None:
+        if message_label is None:
+            return
+        if error is None:
+            show_message(message_label, text=f"{filename} uploaded to Google Drive!", colour="green")
         else:
-            folder_id = response['files'][0]['id']
-
-        file_metadata = {
-            "name": f"{filename}",
-            "parents": [folder_id]
-        }
-
-        file_path = fr"C:\Users\huzai\PycharmProjects\Python-projects-1\{filename}"
-        # Search for the existing file in Google Drive
-        existing_file = service.files().list(
-            q=f"name='{filename}' and parents='{folder_id}'",
-            spaces='drive').execute()
+            show_message(message_label, text=f"Upload of {filename} failed!", colour="red")
 
-        if existing_file['files']:
-            existing_file_id = existing_file['files'][0]['id']
-
-            media = MediaFileUpload(file_path, resumable=True)
-            update_file = service.files().update(fileId=existing_file_id, media_body=media).execute()
-            logging.info(f"Updated file: {filename} --> {folder_name}")
-        else:
-            media = MediaFileUpload(file_path)
-            upload_file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
-            logging.info(f"Uploaded file to drive {filename} --> {folder_name} {upload_file.get('id')}")
-    except HttpError as error:
-        logging.info(f'An error occurred: {error}')
+    uploader.submit(folder_name, filename, uploaded)
 
 
 def deposit(date: Calendar, value: str, message_label: tk.Label, toggle_deposit: Callable) -> None:
@@ -148,52 +85,28 @@ def deposit(date: Calendar, value: str, message_label: tk.Label, toggle_deposit:
     """
     try:
         selected_date = date.parse_date(date.get_date())
-        connection = sqlite3.connect('Expenses.db')
-        cursor = connection.cursor()
-        formatted_date = selected_date.strftime('%Y-%m')
         value = float(value)
-
-        if value <= 0:
-            show_message(message_label, text="Amount should be greater than 0!", colour="red")
-            logging.info(f"Invalid Input!")
+        new_available, new_total = expense_ops.deposit(selected_date, value)
+        if new_total > value:
+            show_message(message_label,
+                         text=f"Deposit for month: {selected_date.strftime('%B')}\nValue: £{value} is Successful!\n"
+                              f"Current balance: £{new_available}\nTotal amount deposited: £{new_total}",
+                         colour="green", duration=7000)
+            messagebox.showinfo(f"{selected_date.strftime('%B')} TRANSCTIONS", f"Value: £{value} is Successful!\n"
+                                                                               f"Current balance: £{new_available}"
+                                                                               f"\nTotal amount deposited: £{new_total}")
         else:
-            cursor.execute("SELECT Available, Total FROM Transactions WHERE strftime('%Y-%m', Date) = ? AND Category "
-                           "= ?",
-                           (formatted_date, "MONTHLY DEPOSIT!"))
-            existing_values = cursor.fetchone()
-            if existing_values:
-                existing_available, initial_amount = existing_values
-                new_available = existing_available + value
-                new_total = initial_amount + value
-                # Update the existing deposit record
-                cursor.execute(
-                    "UPDATE Transactions SET Date = ?, Amount = ?, Available = ?, Total = ? "
-                    "WHERE strftime('%Y-%m', Date) = ? AND Category = ?",
-                    (selected_date.strftime('%Y-%m-%d'), value, new_available, new_total, formatted_date,
-                     "MONTHLY DEPOSIT!"))
-                # Update Available and Total columns
-                cursor.execute("UPDATE Transactions SET Available = ?, Total = ? WHERE strftime('%Y-%m', Date) = ?",
-                               (new_available, new_total, formatted_date))
-                show_message(message_label,
-                             text=f"Deposit for month: {selected_date.strftime('%B')}\nValue: £{value} is Successful!\n"
-                                  f"Current balance: £{new_available}\nTotal amount deposited: £{new_total}",
-                             colour="green", duration=7000)
-                messagebox.showinfo(f"{selected_date.strftime('%B')} TRANSCTIONS", f"Value: £{value} is Successful!\n"
-                                                                                   f"Current balance: £{new_available}"
-                                                                                   f"\nTotal amount deposited: £{new_total}")
-            else:
-                cursor.execute("INSERT INTO Transactions (Date, Category, Amount, Available, Total) VALUES (?, ?, ?, "
-                               "?, ?)",
-                               (selected_date.strftime('%Y-%m-%d'), "MONTHLY DEPOSIT!", value, value, value))
-                show_message(message_label,
-                             text=f"Deposit for month: {selected_date.strftime('%B')}\nValue: £{value} is Successful!\n",
-                             colour="green", duration=7000)
-                messagebox.showinfo(f"{selected_date.strftime('%B')} Deposit", f"Deposit of £{value} Successful")
-            toggle_deposit(False)
-            connection.commit()
-            connection.close()
-            logging.info("Successfully deposited the amount!")
+            show_message(message_label,
+                         text=f"Deposit for month: {selected_date.strftime('%B')}\nValue: £{value} is Successful!\n",
+                         colour="green", duration=7000)
+            messagebox.showinfo(f"{selected_date.strftime('%B')} Deposit", f"Deposit of £{value} Successful")
+        toggle_deposit(False)
+        logging.info("Successfully deposited the amount!")
+    except expense_ops.ExpenseError as error:
+        show_message(message_label, text=str(error), colour="red")
+        logging.info(f"Invalid Input! {error}")
     except sqlite3.Error as error:
+        expense_db.get_connection().rollback()
         show_message(message_label, text=f"SQLite error: {error}", colour="red")
         logging.error(f"SQLite error: {error}")
     except (TypeError, ValueError) as error:
@@ -221,45 +134,15 @@ def deduct(date: Calendar, category: Callable, description: str, value: str, mes
 
     try:
         selected_date = date.parse_date(date.get_date())
-        option = category()
-        formatted_date = selected_date.strftime('%Y-%m')
-        value = float(value)
-        connection = sqlite3.connect("Expenses.db")
-        cursor = connection.cursor()
-        # Fetch the existing total deposit for the current month
-        cursor.execute("SELECT Available, Total FROM Transactions WHERE strftime('%Y-%m', Date) = ? AND Category = ?",
-                       (formatted_date, "MONTHLY DEPOSIT!"))
-        existing_values = cursor.fetchone()
-        if value <= 0 or option.strip() == "":
-            show_message(message_label, text="Invalid Entry!\n(check value > 0 & category is not empty)", colour="red")
-            logging.info("Value should be greater than 0! or Category is empty")
-        else:
-            if existing_values is None:
-                show_message(message_label, text=f"No deposit made for the month {selected_date.strftime('%B')}",
-                             colour="red")
-                logging.info("No funds allocated for the month!")
-            else:
-                existing_available, existing_total = existing_values
-                if value > existing_available:
-                    show_message(message_label, text="Insufficient Funds!", colour="red")
-                    logging.info("Insufficient funds in the database add more!")
-                else:
-                    new_available = existing_available - value
-                    if description.strip() == "":
-                        description = "N/A"
-                    # Entering main category to db
-                    cursor.execute("INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) "
-                                   "VALUES (?, ?, ?, ?, ?, ?)",
-                                   (selected_date.strftime('%Y-%m-%d'), option, description, value,
-                                    new_available, existing_total))
-                    cursor.execute("UPDATE Transactions SET Available = ? WHERE strftime('%Y-%m', Date) = ?",
-                                   (new_available, formatted_date))
-                    show_message(message_label, text="Successfully added!", colour='green')
-                    logging.info("Successfully Inserted & Updated the data into the database")
-            toggle_deduct(False)
-            connection.commit()
-            connection.close()
+        expense_ops.deduct(selected_date, category(), float(value), description)
+        show_message(message_label, text="Successfully added!", colour='green')
+        logging.info("Successfully Inserted & Updated the data into the database")
+        toggle_deduct(False)
+    except expense_ops.ExpenseError as error:
+        show_message(message_label, text=str(error), colour="red")
+        logging.info(f"Deduction refused: {error}")
     except sqlite3.Error as error:
+        expense_db.get_connection().rollback()
         show_message(message_label, text=f"SQLite error: {error}", colour="red")
         logging.error(f"SQLite error: {error}")
     except (TypeError, ValueError) as error:
@@ -267,248 +150,68 @@ def deduct(date: Calendar, category: Callable, description: str, value: str, mes
         logging.error(f"An error occurred: {error}")
 
 
-def convert(convert_type: str, calendar: Callable, message_label: tk.Label) -> None:
+def report_failed(report: str, message_label: tk.Label) -> Callable:
+    """Returns an on_error callback reporting a failed background export"""
+    def failed(error: Exception) -> None:
+        show_message(message_label, text=f"{report} failed: {error}", colour="red")
+        logging.error(f"{report} failed: {error}")
+    return failed
+
+
+def convert(convert_type: str, calendar: Callable, message_label: tk.Label, tasks: TaskRunner) -> None:
     """
     Converts and exports data based on the selected conversion type.
 
+    The export is rendered in a worker process, the upload and messages follow once it is done.
+
     Args:
         convert_type (str): The type of conversion to perform (e.g., 'Pandas', 'CSV', etc.).
         calendar (Callable): A function to select a specific calendar date or range.
         message_label (tk.Label): The label widget to display status messages.
+        tasks (TaskRunner): Runs the export off the Tk thread.
 
     Returns:
         None: This function does not return a value but performs the specified data conversion and export.
 
     """
-    if convert_type == "Excel":
-        month, year = calendar()
-        connection = sqlite3.connect('Expenses.db')
-        selected = datetime.datetime.strptime(month, '%B')
-        formatted = selected.replace(year=int(year)).strftime('%Y-%m')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
-        params = (formatted,)
-
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-
-        if df.bool:
-            excel_file = f'{month}_sheet.xlsx'
-            df['Total Spent'] = df['Amount'].iloc[1:].cumsum()
-            columns_to_convert = ["Amount", "Available", "Total"]
-            for column in columns_to_convert:
-                df[column] = df[column].apply(lambda x: '£' + numerize.numerize(int(x)))
-            # df.drop(columns=['Description'], inplace=True)
-            df['Total Spent'].fillna(0, inplace=True)
-            df['Total Spent'] = df['Total Spent'].apply(lambda x: '£' + numerize.numerize(int(x)))
-            df.to_excel(excel_file, index=False, engine='openpyxl')
-            folder_name = f"{month}-{year}"
-            upload(folder_name, excel_file)
-
-            show_message(message_label, text=f"{excel_file}\nCreated Successfully!", colour="green")
-            logging.info(f"xlsx file successful!")
-        else:
-            show_message(message_label, text=f"Check {month} data!", colour="red")
-            logging.info(f"{month} doesnt have values to create dataframe")
-
-    elif convert_type == 'CSV' or convert_type == 'Pandas':
-        month, year = calendar()
-        connection = sqlite3.connect('Expenses.db')
-        selected = datetime.datetime.strptime(month, '%B')
-        formatted = selected.replace(year=int(year)).strftime('%Y-%m')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
-        params = (formatted,)
-
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-
-        if df.bool:
-            df['Total Spent'] = df['Amount'].iloc[1:].cumsum()
-            columns_to_convert = ["Amount", "Available", "Total"]
-            for column in columns_to_convert:
-                df[column] = df[column].apply(lambda x: '£' + numerize.numerize(int(x)))
-            df['Total Spent'].fillna(0, inplace=True)
-            df['Total Spent'] = df['Total Spent'].apply(lambda x: '£' + numerize.numerize(int(x)))
-
-            csv_file = f"{month}_pandas_file.csv"
-            folder_name = f"{month}-{year}"
-            df.to_csv(csv_file, index=False)
-            upload(folder_name, csv_file)
-
-            show_message(message_label, text=f"{csv_file}\nCreated Successfully!", colour="green")
-            logging.info(f"CSV file successful!")
-        else:
-            show_message(message_label, text=f"Check {month} {year} data!", colour="red")
-            logging.info(f"{month} {year} doesnt have values to create dataframe")
-    elif convert_type == "Pie Chart":
-        month, year = calendar()
-        connection = sqlite3.connect('Expenses.db')
-        selected = datetime.datetime.strptime(month, '%B')
-        formatted = selected.replace(year=int(year)).strftime('%Y-%m')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
-        params = (formatted,)
+    import expense_reports
 
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-        if df.bool:
+    if convert_type not in expense_reports.REPORT_FILES or convert_type == 'Monthly':
+        return
+    month, year = calendar()
+    month_number = datetime.datetime.strptime(month, '%B').month
 
-            df = df[df['Category'] != 'MONTHLY DEPOSIT!']
-
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 6))
-
-            category_amount_df = df.groupby('Category')['Amount'].sum()
-            ax1.pie(category_amount_df, labels=category_amount_df.index, autopct='%1.1f%%', startangle=90)
-            ax1.set_title(f'Spending by Category for {month} {year}')
-
-            ax2.pie(df[['Total', 'Available']].iloc[0], labels=['Total', 'Available'], autopct='%1.1f%%', startangle=90)
-            ax2.set_title(f'Total and Available Amount for {month} {year}')
-
-            plt.tight_layout()
-            fig_name = f"{month}_Pie_Chart.png"
-            folder_name = f"{month}-{year}"
-            fig.savefig(fig_name)
-            upload(folder_name, fig_name)
-
-            show_message(message_label, text="Pie Chart Successfully Created!", colour='green')
-            logging.info(f"Pie chart successful created!")
-        else:
+    def converted(file_path: str | None) -> None:
+        if file_path is None:
             show_message(message_label, text=f"Check {month} {year} data!", colour="red")
             logging.info(f"{month} {year} doesnt have values to create dataframe")
+            return
 
-    elif convert_type == 'Bar Graph':
-        month, year = calendar()
-        connection = sqlite3.connect('Expenses.db')
-        selected = datetime.datetime.strptime(month, '%B')
-        formatted = selected.replace(year=int(year)).strftime('%Y-%m')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
-        params = (formatted,)
-
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-        df['Date'] = pd.to_datetime(df['Date'])
-
-        if df.bool:
-            df = df[df['Category'] != 'MONTHLY DEPOSIT!']
-
-            category_amount_df = df.groupby('Category')['Amount'].sum()
-
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-            category_amount_df.plot(kind='bar', ax=ax1)
-
-            df['Cumulative_Amount'] = df['Amount'].cumsum()
-            df['Available_overtime'] = df['Total'] - df['Cumulative_Amount']
-            df['Day'] = df['Date'].dt.day
-            total_available = df[['Day', 'Available_overtime']].set_index('Day')
-            total_available.plot(kind='barh', ax=ax2)
-
-            ax1.set_xlabel('Category')
-            ax1.set_ylabel('Amount / £')
-            ax1.set_title(f'Category-wise Spending for {month} {year}')
-            ax2.set_xlabel('Amount / £')
-            ax2.set_ylabel('Day')
-            ax2.set_title(f'Available for {month} {year} per date')
-
-            ax1.set_xticklabels(ax1.get_xticklabels(), rotation=360, ha='center')
-            ax2.set_xticklabels(ax2.get_xticklabels(), rotation=360, ha='center')
-
-            plt.tight_layout()
-            fig_name = f"{month}_Bar_Graph.png"
-            folder_name = f"{month}-{year}"
-            fig.savefig(fig_name)
-            upload(folder_name, fig_name)
-
-            show_message(message_label, text="Bar Graph Successfully Created!", colour='green')
-            logging.info(f"Bar graph successful created!")
+        upload(f"{month}-{year}", file_path, message_label)
+        if convert_type in ('Excel', 'CSV', 'Pandas'):
+            show_message(message_label, text=f"{file_path}\nCreated Successfully!", colour="green")
         else:
-            show_message(message_label, text=f"Check {month} {year} data!", colour="red")
-            logging.info(f"{month} {year} doesnt have values to create dataframe")
+            show_message(message_label, text=f"{convert_type} Successfully Created!", colour='green')
+        logging.info(f"{convert_type} successfully created!")
 
-    elif convert_type == 'Line Chart':
-        month, year = calendar()
-        connection = sqlite3.connect('Expenses.db')
-        selected = datetime.datetime.strptime(month, '%B')
-        formatted = selected.replace(year=int(year)).strftime('%Y-%m')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
-        params = (formatted,)
-
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-        df['Date'] = pd.to_datetime(df['Date'])
-
-        if df.bool:
-            df = df[df['Category'] != "MONTHLY DEPOSIT!"]
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-            categorized = df.groupby("Category")["Amount"].sum()
-            ax1.plot(categorized.index, categorized.values)
-            ax1.set_xlabel('Categories')
-            ax1.set_ylabel('Total Amount')
-            ax1.set_title('Expenses by Category')
-            ax1.tick_params(axis='x', rotation=360)
-
-            df['Cumulative_Amount'] = df['Amount'].cumsum()
-            df['Available_overtime'] = df['Total'] - df['Cumulative_Amount']
-            df["Day"] = df['Date'].dt.day.round().astype(int)
-            ax2.plot(df['Day'], df['Available_overtime'])
-            ax2.set_xlabel('Date')
-            ax2.set_ylabel('Amount / £')
-            ax2.set_title(f'Available for {month} {year} per date')
-            ax2.tick_params(axis='x', rotation=360)
-
-            fig_name = f"{month}_Line_Chart.png"
-            folder_name = f"{month}-{year}"
-            plt.savefig(fig_name)
-            upload(folder_name, fig_name)
-
-            show_message(message_label, text="Line Chart Successfully Created!", colour='green')
-            logging.info(f"Line Chart successful created!")
+    show_message(message_label, text=f"Creating {convert_type}......", colour="green")
+    # Keyed by the file it writes, so only a repeat of the same export supersedes a pending one
+    tasks.run_render(f'convert:{convert_type}:{year}-{month_number}', expense_reports.export_report, convert_type,
+                     int(year), month_number, on_done=converted, on_error=report_failed(convert_type, message_label))
 
-        else:
-            show_message(message_label, text=f"Check {month} {year} data!", colour="red")
-            logging.info(f"{month} {year} doesnt have values to create dataframe")
-
-    elif convert_type == 'Histogram':
-        month, year = calendar()
-        connection = sqlite3.connect('Expenses.db')
-        selected = datetime.datetime.strptime(month, '%B')
-        formatted = selected.replace(year=int(year)).strftime('%Y-%m')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
-        params = (formatted,)
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-        df['Date'] = pd.to_datetime(df['Date'])
-
-        if not df.empty:
-            df = df[df['Category'] != 'MONTHLY DEPOSIT!']
-
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-            amounts = df['Amount'].tolist()
-
-            ax1.hist(amounts, bins=10)
-            ax1.set_xlabel('Amount')
-            ax1.set_ylabel('Frequency')
-            ax1.set_title('Expense Amount Histogram')
-
-            categorized = df.groupby("Category")["Amount"].sum()
-            ax2.bar(categorized.index, categorized.values)
-            ax2.set_xlabel('Categories')
-            ax2.set_ylabel('Total Amount')
-            ax2.set_title('Expenses by Category')
-            ax2.tick_params(axis='x', rotation=360)
-
-            plt.tight_layout()
-            fig_name = f"{month}_Histogram.png"
-            folder_name = f"{month}-{year}"
-            fig.savefig(fig_name)
-            upload(folder_name, fig_name)
-
-            show_message(message_label, text="Histogram Successfully Created!", colour='green')
-            logging.info(f"Histogram successfully created!")
-        else:
-            show_message(message_label, text=f"Check {month} data!", colour="red")
-            logging.info(f"{month} doesn't have values to create a dataframe")
 
-
-def view(date: Calendar, message_label: tk.Label, view_box: tk.scrolledtext.ScrolledText) -> None:
+def view(date: Calendar, message_label: tk.Label, view_box: VirtualList, tasks: TaskRunner) -> None:
     """
     Displays and retrieves expense data for the selected month.
 
+    The query runs on an I/O thread, the view_box shows the rows once they arrive and only formats
+    the ones scrolled into view.
+
     Args:
         date (Calendar): The selected date from a calendar widget.
         message_label (tk.Label): The label widget to display status messages.
-        view_box (tk.scrolledtext.ScrolledText): The text widget for displaying expense data.
+        view_box (VirtualList): The list widget for displaying expense data.
+        tasks (TaskRunner): Runs the query off the Tk thread.
 
     Returns:
         None: This function does not return a value but displays the expense data in the view_box.
@@ -516,26 +219,16 @@ def view(date: Calendar, message_label: tk.Label, view_box: tk.scrolledtext.Scro
     """
     try:
         selected_date = date.parse_date(date.get_date())
-        connection = sqlite3.connect("Expenses.db")
-        cursor = connection.cursor()
-
-        start_date = selected_date.strftime('%Y-%m-%d')
-        end_date = (selected_date + relativedelta(day=31)).strftime('%Y-%m-%d')
-
-        # or use
-        # next_month = selected_date.replace(day=28) + datetime.timedelta(days=4)
-        # end_date = next_month - datetime.timedelta(days=next_month.day)
-        view_box.config(state='normal')
-        view_box.delete("1.0", tk.END)
-
-        results = cursor.execute(
-            "SELECT Date, Category, Amount, Available, Total FROM Transactions WHERE Date BETWEEN ? AND ?"
-            "ORDER BY Date",
-            (start_date, end_date))
+    except (TypeError, ValueError) as error:
+        show_message(message_label, text=f"An error occurred: {error}", colour="red")
+        logging.error(f"An error occurred: {error}")
+        return
 
-        data = results.fetchall()
+    def display(result: tuple['ExpenseStore', tuple[float, float, float]]) -> None:
+        store, (total_deposit, available, _) = result
+        view_box.clear()
 
-        if not data:
+        if store.empty:
             view_box.grid_remove()
             show_message(message_label, text=f"No results found for the month of {selected_date.strftime('%B %Y')}",
                          colour="red")
@@ -544,39 +237,29 @@ def view(date: Calendar, message_label: tk.Label, view_box: tk.scrolledtext.Scro
             show_message(message_label, text="Getting results......", colour="green")
             logging.info(f"Match found! for the month of {selected_date.strftime('%B %Y')}")
 
-            view_box.insert(tk.END, f"Expenses for the Month of {selected_date.strftime('%B %Y')}\n\n", "custom_font")
-            view_box.insert(tk.END, "S.NO\tDATE\t\tCATEGORY\t\t\t\tSPENT\n", "custom_font")
-
-            spent = 0
-            available = 0
-            total_deposit = 0
-
-            for index, row in enumerate(data, start=1):
-                date_str = row[0]
-                category = row[1]
-                amount = row[2]
-
-                view_box.insert(tk.END, f"{index}\t{date_str}\t\t{category}\t\t\t\t£ {amount}\n", "custom_font")
-                if category != "MONTHLY DEPOSIT!":
-                    spent += amount
-                    available = row[3]
-                    total_deposit = row[4]
-                else:
-                    available = row[3]
-                    total_deposit = row[4]
-            view_box.insert(tk.END, f"\nTOTAL AVAILABLE: £{numerize.numerize(available)}\n"
-                                    f"TOTAL SPENT: £{numerize.numerize(spent)}\n"
-                                    f"TOTAL DEPOSITED: £{numerize.numerize(total_deposit)}", "custom_font")
-            view_box.config(state='disabled')
+            def rows(start: int, stop: int) -> list[str]:
+                return [f"{index}\t{date_str}\t\t{category}\t\t\t\t£ {amount}"
+                        for index, (date_str, category, amount) in enumerate(store.rows(start, stop), start=start + 1)]
+
+            spent = store.total_spent()
+            view_box.set_source(
+                len(store.dates), rows,
+                header=f"Expenses for the Month of {selected_date.strftime('%B %Y')}\n\n"
+                       "S.NO\tDATE\t\tCATEGORY\t\t\t\tSPENT\n",
+                footer=f"\nTOTAL AVAILABLE: £{numerize.numerize(available)}\n"
+                       f"TOTAL SPENT: £{numerize.numerize(spent)}\n"
+                       f"TOTAL DEPOSITED: £{numerize.numerize(total_deposit)}")
             view_box.after(2500, lambda: view_box.grid(row=3, column=0))
 
-        connection.close()
-    except sqlite3.Error as error:
-        show_message(message_label, text=f"SQLite error: {error}", colour="red")
-        logging.error(f"SQLite error: {error}")
-    except (TypeError, ValueError) as error:
-        show_message(message_label, text=f"An error occurred: {error}", colour="red")
-        logging.error(f"An error occurred: {error}")
+    def failed(error: Exception) -> None:
+        if isinstance(error, sqlite3.Error):
+            show_message(message_label, text=f"SQLite error: {error}", colour="red")
+            logging.error(f"SQLite error: {error}")
+        else:
+            show_message(message_label, text=f"An error occurred: {error}", colour="red")
+            logging.error(f"An error occurred: {error}")
+
+    tasks.run_io('view', expense_ops.month_view, selected_date, on_done=display, on_error=failed)
 
 
 def delete(date: Calendar, category: Callable, message_label: tk.Label, toggle_delete: Callable) -> None:
@@ -595,48 +278,16 @@ def delete(date: Calendar, category: Callable, message_label: tk.Label, toggle_d
     try:
         option = category()
         selected_date = date.parse_date(date.get_date())
-        connection = sqlite3.connect("Expenses.db")
-        cursor = connection.cursor()
-        print(option)
-        if option == "MONTHLY DEPOSIT!":
-            results = cursor.execute("SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? AND Category = ?",
-                                     (selected_date.strftime('%Y-%m'), "MONTHLY DEPOSIT!"))
-            if not results.fetchall():
-                show_message(message_label, text=f"{selected_date} data not found!", colour='red')
-                logging.info(f"{selected_date} deletion unsuccessful!")
-            else:
-                cursor.execute("DELETE FROM Transactions WHERE strftime('%Y-%m', Date) = ? AND Category = ?",
-                               (selected_date.strftime('%Y-%m'), "MONTHLY DEPOSIT!"))
-                show_message(message_label, text=f"Deleted data for date {selected_date} & updated!", colour="green")
-                logging.info(f"{selected_date} date data successfully deleted & updated!")
-                connection.commit()
-        else:
-            results = cursor.execute("SELECT * FROM Transactions WHERE strftime('%Y-%m-%d', Date) = ? AND Category = ?",
-                                 (selected_date.strftime('%Y-%m-%d'), option.capitalize()))
-            if not results.fetchall():
-                show_message(message_label, text=f"{selected_date} data not found!", colour='red')
-                logging.info(f"{selected_date} deletion unsuccessful!")
-            else:
-                get_values = cursor.execute("SELECT Available, Amount, Total FROM Transactions WHERE"
-                                            " strftime('%Y-%m-%d', Date)= ? AND Category = ?",
-                                            (selected_date.strftime('%Y-%m-%d'), option.capitalize()))
-                available, amount, total = 0, 0, 0
-                for row in get_values.fetchall():
-                    available += row[0]
-                    amount += row[1]
-                    total += row[2]
-                updated_total = total + amount
-                updated_available = available + amount
-                cursor.execute("DELETE FROM Transactions WHERE strftime('%Y-%m-%d', Date)= ? AND Category = ?",
-                               (selected_date, option.capitalize()))
-                cursor.execute("UPDATE Transactions SET Available = ?, Total = ? WHERE strftime('%Y-%m', Date) = ?",
-                               (updated_available, updated_total, selected_date.strftime('%Y-%m')))
-                show_message(message_label, text=f"Deleted data for date {selected_date} & updated!", colour="green")
-                logging.info(f"{selected_date} date data successfully deleted & updated!")
-                connection.commit()
-                toggle_delete(False)
-        connection.close()
+        expense_ops.delete(selected_date, option)
+        show_message(message_label, text=f"Deleted data for date {selected_date} & updated!", colour="green")
+        logging.info(f"{selected_date} date data successfully deleted & updated!")
+        if option != expense_ops.DEPOSIT:
+            toggle_delete(False)
+    except expense_ops.ExpenseError as error:
+        show_message(message_label, text=str(error), colour='red')
+        logging.info(f"Deletion unsuccessful! {error}")
     except sqlite3.Error as error:
+        expense_db.get_connection().rollback()
         show_message(message_label, text=f"SQLite error: {error}", colour="red")
         logging.error(f"SQLite error: {error}")
     except (TypeError, ValueError) as error:
@@ -644,137 +295,62 @@ def delete(date: Calendar, category: Callable, message_label: tk.Label, toggle_d
         logging.error(f"An error occurred: {error}")
 
 
-def summary(selection: str, date: Callable, message_label: tk.Label, toggle_summary: Callable):
+def summary(selection: str, date: Callable, message_label: tk.Label, toggle_summary: Callable, tasks: TaskRunner):
     """
         Generate and display summary charts based on the user's selection (Monthly or Yearly).
 
+        The chart is rendered in a worker process, the upload and messages follow once it is done.
+
         Parameters:
             selection (str): The user's selection, either 'Monthly' or 'Yearly'.
             date (Callable): A function that returns the selected month and year.
             message_label (tk.Label): The Tkinter Label widget for displaying messages.
             toggle_summary (Callable): A function for toggling the summary display in the GUI.
+            tasks (TaskRunner): Runs the rendering off the Tk thread.
 
         Returns:
             None
         """
+    import expense_reports
+
     if selection == 'Monthly':
         month, year = date()
-        formatted = datetime.datetime.strptime(month, "%B").replace(year=int(year)).strftime('%Y-%m')
-        connection = sqlite3.connect('Expenses.db')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date)=?"
-        params = (formatted,)
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-        df['Date'] = pd.to_datetime(df['Date'])
-        if df.bool:
-            filtered = df[df['Category'] != 'MONTHLY DEPOSIT!'].copy()
-
-            fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(20, 10))
-
-            # Categorized spending's for the moth
-            categorized = filtered.groupby('Category')['Amount'].sum()
-            categorized.plot(kind='bar', ax=ax1)
-
-            ax1.set_xlabel('Category')
-            ax1.set_ylabel('Amount / £')
-            ax1.set_title(f'Category-wise Spending for {month} {year}')
-            ax1.set_xticklabels(ax1.get_xticklabels(), rotation=360, ha='center')
-
-            # Available over the month
-            filtered['Day'] = filtered['Date'].dt.day
-            filtered['Cumulative_Amount'] = filtered['Amount'].cumsum()
-            filtered['Available_overtime'] = filtered['Total'] - filtered['Cumulative_Amount']
-            available = filtered.groupby('Day')['Available_overtime'].last()
-            available.plot(kind='line', ax=ax2)
-            ax2.set_xlabel('Date')
-            ax2.set_ylabel('Amount / £')
-            ax2.set_title(f'Available for {month} {year} per date')
-            ax2.tick_params(axis='x', rotation=360)
-
-            # Total vs available over the month
-            ax3.pie(filtered[['Total', 'Available']].iloc[0], labels=['Utilized', 'Available'], autopct='%1.1f%%',
-                    startangle=90)
-            ax3.set_title(f'Total and Available Amount for {month} {year}')
-
-            # Spending's over the month
-            daily_spending = filtered.groupby(filtered['Date'].dt.day)['Amount'].sum()
-            daily_spending.plot(kind='line', ax=ax4, linewidth=1)
-            ax4.set_xlabel('Date')
-            ax4.set_ylabel('Amount / £')
-            ax4.set_title(f"Spending's for {month} {year} per day")
-            ax4.tick_params(axis='x', rotation=360)
-
-            plt.tight_layout()
-            fig_name = f"{month} {year} summary.png"
-            fig.savefig(fig_name)
-            folder_name = f"{month}-{year}"
-
-            upload(folder_name, fig_name)
-            show_message(message_label, text=f"Monthly Summary for {month}\nSuccessfully Generated!", colour='green')
-            logging.info(f"{month} {year} Monthly summary generated successfully!")
-        else:
-            show_message(message_label, text=f"Check {month} {year} data!", colour="red")
-            logging.info(f"{month} {year} doesnt have values to create dataframe")
+        selected = datetime.datetime.strptime(month, "%B")
+
+        def generated(fig_name: str | None) -> None:
+            if fig_name is not None:
+                folder_name = f"{month}-{year}"
+
+                upload(folder_name, fig_name, message_label)
+                show_message(message_label, text=f"Monthly Summary for {month}\nSuccessfully Generated!",
+                             colour='green')
+                logging.info(f"{month} {year} Monthly summary generated successfully!")
+            else:
+                show_message(message_label, text=f"Check {month} {year} data!", colour="red")
+                logging.info(f"{month} {year} doesnt have values to create dataframe")
+
+        tasks.run_render(f'summary:Monthly:{year}-{selected.month}', expense_reports.export_report, 'Monthly',
+                         int(year), selected.month, on_done=generated,
+                         on_error=report_failed('Monthly Summary', message_label))
 
     elif selection == 'Yearly':
         month, year = date()
-        connection = sqlite3.connect('Expenses.db')
-        query = "SELECT * FROM Transactions WHERE strftime('%Y', Date)=? ORDER BY Date"
-        params = (year,)
-        df = pd.read_sql_query(query, connection, params=params)  # NOQA
-
-        df['Date'] = pd.to_datetime(df['Date'])
-
-        if df.bool:
-            filtered_df = df[df['Category'] != 'MONTHLY DEPOSIT!']
-            category_amount_df = filtered_df.groupby('Category')['Amount'].sum()
-
-            fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(20, 10))
-
-            # Categorized spending's for the  year
-            category_amount_df.plot(kind='bar', ax=ax1)
-            ax1.set_xlabel('Category')
-            ax1.set_ylabel('Amount / £')
-            ax1.set_title(f'Category-wise Spending for {month} {year}')
-            ax1.set_xticklabels(ax1.get_xticklabels(), rotation=360, ha='center')
-
-            # Monthly deposit for the year
-            monthly_deposit = df[df['Category'] == 'MONTHLY DEPOSIT!']
-            monthly_summary = monthly_deposit.groupby(df['Date'].dt.month)['Total'].sum()
-            monthly_summary.plot(kind='line', ax=ax2)
-            ax2.set_xlabel('Month')
-            ax2.set_ylabel('Amount / £')
-            ax2.set_title(f'Deposit Amount per Month for {year}')
-            ax2.set_xticks(range(1, 13))
-
-            # Saved per month for the year
-            saved = monthly_deposit.groupby(df['Date'].dt.month)['Available'].sum()
-            saved.plot(kind='line', ax=ax3)
-            ax3.set_xlabel('Month')
-            ax3.set_ylabel('Amount / £')
-            ax3.set_title(f'Available Amount per Month for {year}')
-            ax3.set_xticks(range(1, 13))
-
-            # Spent per month for the year
-            both_totals = monthly_deposit.groupby(df['Date'].dt.month)[['Total', 'Available']].sum()
-            spent = both_totals['Total'] - both_totals['Available']
-            spent.plot(kind='line', ax=ax4)
-            ax4.set_xlabel('Month')
-            ax4.set_ylabel('Amount / £')
-            ax4.set_title(f'Spent per Month for {year}')
-            ax4.set_xticks(range(1, 13))
-
-            fig_name = f"{year} summary.png"
-            plt.savefig(fig_name)
-
-            folder_name = f"{year}"
-            upload(folder_name, fig_name)
-
-            show_message(message_label, text=f"Yearly Summary for {year}\nSuccessfully Generated!", colour='green')
-            logging.info(f"{year} Yearly summary generated successfully!")
 
-        else:
-            show_message(message_label, text=f"Check {year} data!", colour="red")
-            logging.info(f"{month} {year} doesn't have values to create a dataframe")
+        def generated(fig_name: str | None) -> None:
+            if fig_name is not None:
+                folder_name = f"{year}"
+                upload(folder_name, fig_name, message_label)
+
+                show_message(message_label, text=f"Yearly Summary for {year}\nSuccessfully Generated!",
+                             colour='green')
+                logging.info(f"{year} Yearly summary generated successfully!")
+
+            else:
+                show_message(message_label, text=f"Check {year} data!", colour="red")
+                logging.info(f"{month} {year} doesn't have values to create a dataframe")
+
+        tasks.run_render(f'summary:Yearly:{year}', expense_reports.export_yearly, int(year), month,
+                         on_done=generated, on_error=report_failed('Yearly Summary', message_label))
 
 
 def centered(window: tk.Tk, width: int, height: int) -> None:
@@ -813,6 +389,8 @@ def gui() -> None:
     main_frame = tk.Frame(window)
     main_frame.pack(fill='both', expand=1)
     create_database()
+    # Queries run on threads, charts and spreadsheets in worker processes reading the same database
+    tasks = TaskRunner(window, render_initializer=expense_db.use_database, render_initargs=(expense_db.pool.database,))
 
     canvas = tk.Canvas(main_frame)
     vsb = tk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
@@ -921,8 +499,9 @@ def gui() -> None:
     # View fields
     view_label_date = tk.Label(view_frame, text="Select a Month: ", font=("Quicksand", 15, "italic"))
     view_dates = Calendar(view_frame, date_pattern="y-mm-dd")
-    view_box = scrolledtext.ScrolledText(view_frame, wrap=tk.WORD, width=80, height=20)
-    view_button = tk.Button(view_frame, text="View", command=lambda: view(view_dates, global_message_label, view_box),
+    view_box = VirtualList(view_frame, width=60, height=14, font=("Quicksand", 15), foreground="black")
+    view_button = tk.Button(view_frame, text="View",
+                            command=lambda: view(view_dates, global_message_label, view_box, tasks),
                             font=("Quicksand", 15, "bold"))
 
     # Convert fields
@@ -954,7 +533,7 @@ def gui() -> None:
 
     convert_button = tk.Button(convert_frame, text="Convert", command=lambda: convert(convert_selection.get(),
                                                                                       get_month_year,
-                                                                                      global_message_label),
+                                                                                      global_message_label, tasks),
                                font=("Quicksand", 15, "bold"))
 
     # Delete fields
@@ -995,7 +574,7 @@ def gui() -> None:
     # summary_box.set('Monthly')
     summary_button = tk.Button(summary_frame, text="Summary",
                                command=lambda: summary(summary_value.get(), get_month_year,
-                                                       global_message_label, toggle_summary),
+                                                       global_message_label, toggle_summary, tasks),
                                font=("Quicksand", 15, "italic"))
 
     def deducted_Category(event=None) -> str:
@@ -1094,14 +673,14 @@ def gui() -> None:
         """
         if enable:
             logging.info("Toggling view fields!")
-            view_box.delete("1.0", tk.END)
+            view_box.clear()
             view_label_date.grid(row=0, column=0, pady=10)
             view_dates.grid(row=1, column=0, pady=10)
             view_button.grid(row=2, column=0, columnspan=2, pady=10)
-            view_box.config(state='normal')
-            view_box.tag_configure("custom_font", font=("Quicksand", 15), foreground="black")
             view_frame.pack()
         else:
+            # A month requested before leaving the view is no longer wanted
+            tasks.cancel('view')
             view_frame.pack_forget()
 
     def toggle_convert(enable) -> None:
@@ -1289,8 +868,24 @@ def gui() -> None:
             window.destroy()
             messagebox.showinfo(message="EXITED SUCCESSFULLY")
 
+    def poll_uploads() -> None:
+        """Runs finished upload callbacks on the Tk thread"""
+        uploader.dispatch_callbacks()
+        window.after(250, poll_uploads)
+
     window.protocol("WM_DELETE_WINDOW", close)
-    window.mainloop()
+    poll_uploads()
+    try:
+        window.mainloop()
+    finally:
+        tasks.shutdown()
+        uploader.stop()
+        expense_db.close()
+        # Charts render in the worker processes, which release their figures as they exit; only
+        # free this process's templates if it ever loaded any
+        charts = sys.modules.get('expense_charts')
+        if charts is not None:
+            charts.release()
 
 
 def logging_function() -> None:
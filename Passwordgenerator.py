@@ -1,6 +1,11 @@
+import os
 import random
 import tkinter as tk
 import string
+from typing import Iterator, TextIO
+
+# Passwords generate_batch() draws random bytes for in one go
+BATCH_SIZE = 4096
 
 
 def generator(password_length: int, is_digit: bool = True, is_special: bool = True):
@@ -19,6 +24,69 @@ def generator(password_length: int, is_digit: bool = True, is_special: bool = Tr
     return password
 
 
+def alphabet(is_digit: bool = True, is_special: bool = True) -> str:
+    """Returns the characters generator() picks from for these options"""
+    return string.ascii_letters + (string.digits if is_digit else '') + (string.punctuation if is_special else '')
+
+
+def generate_batch(count: int, password_length: int, is_digit: bool = True, is_special: bool = True,
+                   characters: str | None = None) -> Iterator[list[str]]:
+    """
+    Generates count passwords, yielded in lists of up to BATCH_SIZE as they are made.
+
+    Instead of one SystemRandom call per character, each batch reads its random bytes from
+    os.urandom at once and maps them onto the alphabet with bytes.translate. Bytes at or above
+    the largest multiple of the alphabet size are dropped (rejection sampling), so every
+    character stays equally likely, unlike a plain byte % size.
+
+    Args:
+        count (int): Number of passwords.
+        password_length (int): Length of every password.
+        is_digit (bool, optional): Include digits. Default is True.
+        is_special (bool, optional): Include punctuation. Default is True.
+        characters (str, optional): Alphabet to use instead, at most 256 distinct ASCII characters.
+
+    Returns:
+        Iterator[list[str]]: Lists of passwords, count of them in total.
+    """
+    if password_length <= 0:
+        raise ValueError("Password length must be positive")
+    characters = characters if characters is not None else alphabet(is_digit, is_special)
+    size = len(characters)
+    if not 0 < size <= 256 or len(set(characters)) != size or not characters.isascii():
+        raise ValueError("The alphabet must have 1 to 256 distinct ASCII characters")
+    accepted = 256 - 256 % size
+    table = bytes(ord(characters[byte % size]) if byte < accepted else 0 for byte in range(256))
+    rejected = bytes(range(accepted, 256))
+
+    while count > 0:
+        batch = min(count, BATCH_SIZE)
+        needed = batch * password_length
+        # Enough bytes on average for the rejections plus a little, topped up in the rare short case
+        data = os.urandom(needed * 256 // accepted + 64).translate(table, rejected)
+        while len(data) < needed:
+            data += os.urandom(needed - len(data) + 64).translate(table, rejected)
+        text = data[:needed].decode('ascii')
+        yield [text[start:start + password_length] for start in range(0, needed, password_length)]
+        count -= batch
+
+
+def write_batch(file: TextIO, count: int, password_length: int, is_digit: bool = True,
+                is_special: bool = True) -> None:
+    """
+    Streams count passwords to a file, one per line, a batch at a time.
+
+    Args:
+        file (TextIO): Open file or stdout to write to.
+        count (int): Number of passwords.
+        password_length (int): Length of every password.
+        is_digit (bool, optional): Include digits. Default is True.
+        is_special (bool, optional): Include punctuation. Default is True.
+    """
+    for passwords in generate_batch(count, password_length, is_digit, is_special):
+        file.write('\n'.join(passwords) + '\n')
+
+
 def main():
     window = tk.Tk()
     window.title("Password generator")
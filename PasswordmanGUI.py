@@ -1,60 +1,25 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import sqlite3
-import os
+from tkinter import ttk, messagebox, simpledialog
 import logging
 from typing import Callable
 from ttkthemes import ThemedStyle
 
-from google.auth.transport.requests import Request  # type: ignore
-from google.oauth2.credentials import Credentials  # type: ignore
-from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
-from googleapiclient.http import MediaFileUpload  # type: ignore
-from googleapiclient.errors import HttpError  # type: ignore
+import password_db
+import password_policy
+import password_sync
+from drive_uploader import DriveFolder, drive_service, load_credentials
+from tk_tasks import TaskRunner
+from tk_virtual_list import VirtualList
 
+# Lines every account takes in the view and search lists, see account_details()
+ACCOUNT_LINES = 6
 
-def create_database():
-    try:
-        connection = sqlite3.connect('Passwords.db')
-        cursor = connection.cursor()
-
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS manager
-            (USERNAME      TEXT    NOT NULL,
-            ACCOUNT           TEXT    NOT NULL,
-            PASSWORD           TEXT     NOT NULL);'''
-                       )
-        connection.commit()
-        logging.info('Created database!')
-        connection.close()
-    except sqlite3.DatabaseError as error:
-        logging.info(f'Error creating database! {error}')
-
-
-def search_database(username: str, account: str) -> bool:
-    """Searches account and username in the database for add functionality"""
-    connection = sqlite3.connect("Passwords.db")
-    cursor = connection.cursor()
+TOKEN_FILE = r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json'
+CREDENTIALS_FILE = r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\Drive_Credentials.json'
+DRIVE_FOLDER = 'Hexzdrivefolder'
+drive_folder: DriveFolder | None = None
 
-    try:
-        if username and account:
-            result = cursor.execute("SELECT USERNAME, ACCOUNT FROM manager WHERE USERNAME=? AND ACCOUNT=?",
-                                    (username, account))
-        elif username:
-            result = cursor.execute("SELECT USERNAME, ACCOUNT FROM manager WHERE USERNAME=?", (username,))
-        else:
-            return False  # If neither username nor account is provided, return False
 
-        return bool(result.fetchall())
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-        return False
-    finally:
-        connection.close()
-
-
-# main funcs
 def show_message(message_label: tk.Label, text: str, color: str, duration=2000):
     """
        Display a message on the GUI.
@@ -71,6 +36,27 @@ def show_message(message_label: tk.Label, text: str, color: str, duration=2000):
     logging.info(text)
 
 
+def confirm_strength(password: str) -> str | None:
+    """
+    Warns about a weak password and asks whether to store it anyway, since an account's existing
+    password can't always be changed.
+
+    Args:
+        password (str): The password about to be stored.
+
+    Returns:
+        str | None: '' if password_policy.check finds nothing wrong, a warning to show with the result
+            if a weak password is kept, or None if the user chose not to store it.
+    """
+    problems = password_policy.check(password)
+    if not problems:
+        return ''
+    if not messagebox.askyesno(title="Weak password",
+                               message=f"This password is {', '.join(problems)}. Save it anyway?"):
+        return None
+    return f"\nWeak password: {', '.join(problems)}"
+
+
 def add(username: Callable, account: str, password: str, message_label: tk.Label, toggle_add_fields: Callable,
         reset: Callable):
     """
@@ -87,50 +73,49 @@ def add(username: Callable, account: str, password: str, message_label: tk.Label
     selected_account_value = username()
     if selected_account_value.strip() == "" or account.strip() == "" or password.strip() == "":
         show_message(message_label, "Username or Account or Password cannot be empty", "red")
+    elif (warning := confirm_strength(password)) is None:
+        show_message(message_label, "Account not added", "red")
     else:
-        if not search_database(selected_account_value.capitalize(), account.capitalize()):
-            connection = sqlite3.connect('Passwords.db')
-            cursor = connection.cursor()
-            cursor.execute("INSERT INTO manager VALUES(?, ?, ?)", (selected_account_value.capitalize(),
-                                                                   account.capitalize(), password))
-            connection.commit()
+        # The unique (USERNAME, ACCOUNT) index turns an existing pair into a failed insert, no lookup needed
+        if password_db.add_entry(selected_account_value.capitalize(), account.capitalize(), password):
             toggle_add_fields(False)
-            show_message(message_label, "Account added successfully!", "green")
+            show_message(message_label, f"Account added successfully!{warning}", "orange" if warning else "green")
         else:
             show_message(message_label, "Account Already Exists", "red")
     toggle_add_fields(False)
     reset()
 
 
-def view(view_listbox: tk.scrolledtext.ScrolledText, message_label: tk.Label, toggle_view: Callable, reset: Callable):
+def account_details(index: int, values: tuple[str, str, str]) -> str:
+    """Formats an entry as the ACCOUNT_LINES lines the view and search lists show for it"""
+    return f"Account {index}\n\nACCOUNT: {values[0]}\nUSERNAME: {values[1]}\nPASSWORD: {values[2]}\n"
+
+
+def view(view_listbox: VirtualList, message_label: tk.Label, toggle_view: Callable, reset: Callable):
     """
      Display the list of accounts stored in the database.
 
-     This function retrieves the accounts stored in the database and displays them in a scrollable listbox.
+     This function displays the accounts stored in the database in a scrollable list. Only the accounts
+     in view are read and decrypted, a page at a time as the list scrolls.
      If there are no accounts to display, an error message is shown.
 
      Args:
-         view_listbox (tk.ListBox): The listbox widget to display the accounts.
+         view_listbox (VirtualList): The list widget to display the accounts.
          message_label (tk.Label): The label widget to display messages.
          toggle_view (function): Function to toggle view fields visibility.
          reset (Function): Function to reset the main combobox.
      """
-    connection = sqlite3.connect('Passwords.db')
-    cursor = connection.cursor()
-
-    results = cursor.execute("SELECT * FROM manager ORDER BY USERNAME ASC")
-    results = results.fetchall()
-    if not results:
+    count = password_db.count()
+    if not count:
         show_message(message_label, "No Accounts To Display", 'red')
     else:
         show_message(message_label, "Showing Account / Accounts for 60 Seconds", "green", duration=60000)
-        for index, values in enumerate(results, start=1):
-            view_listbox.insert(tk.END, f"Account {index}\n\n")
-            view_listbox.insert(tk.END, f"ACCOUNT: {values[0]}\nUSERNAME: {values[1]}\nPASSWORD: {values[2]}\n\n")
+        view_listbox.set_source(count, lambda start, stop: [
+            account_details(index, values)
+            for index, values in enumerate(password_db.page(start, stop - start), start=start + 1)], ACCOUNT_LINES)
         view_listbox.pack()
         toggle_view(False)
         reset()
-    connection.close()
 
 
 def edit(search: str, search_2: str, account: str, username: str, password: str, message_label: tk.Label,
@@ -152,30 +137,26 @@ def edit(search: str, search_2: str, account: str, username: str, password: str,
     if search.strip() == "" or account.strip() == "" or username.strip() == "" or password.strip() == "":
         show_message(message_label, "Fields Cannot Be Empty", "red")
         return
-    connection = sqlite3.connect("Passwords.db")
-    cursor = connection.cursor()
-
-    existing_data = cursor.execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager WHERE USERNAME=? AND ACCOUNT=?",
-                                   (search.capitalize(), search_2.capitalize())).fetchone()
+    existing_data = password_db.find(search.capitalize(), search_2.capitalize())
 
     if not existing_data:
         show_message(message_label, "Account not found", "red")
+    elif (warning := confirm_strength(password.strip())) is None:
+        show_message(message_label, "Account not updated", "red")
     else:
         toggle_edit_2()
         new_username = username.strip() if username.strip() else existing_data[0]
         new_account = account.strip() if account.strip() else existing_data[1]
         new_password = password.strip() if password.strip() else existing_data[2]
-        if search_database(new_username.capitalize(), new_account.capitalize()):
+        # Updating to a pair another entry already has violates the unique index
+        if not password_db.update_entry(existing_data[0], existing_data[1], new_username.capitalize(),
+                                        new_account.capitalize(), new_password):
             show_message(message_label, "Account details clash", "red")
         else:
-            cursor.execute("UPDATE manager SET ACCOUNT=?, USERNAME=?, PASSWORD=? WHERE USERNAME=? AND ACCOUNT=?",
-                           (new_account.capitalize(), new_username.capitalize(), new_password, search, search_2))
-            connection.commit()
-            show_message(message_label, "Account updated", "green")
+            show_message(message_label, f"Account updated{warning}", "orange" if warning else "green")
     toggle_edit_2()
     toggle_edit(False)
     reset()
-    connection.close()
 
 
 def delete(Account: str, Username: str, message_label: tk.Label, toggle_delete: Callable, reset: Callable):
@@ -196,112 +177,53 @@ def delete(Account: str, Username: str, message_label: tk.Label, toggle_delete:
         show_message(message_label, "Please Enter An Account", "red")
         return  # Return to prevent further execution of the function
 
-    connection = sqlite3.connect('Passwords.db')
-    cursor = connection.cursor()
-    results = cursor.execute("SELECT USERNAME,ACCOUNT, PASSWORD FROM manager WHERE USERNAME=? AND ACCOUNT=?",
-                             (Account.capitalize(), Username.capitalize(),))
-    results = results.fetchall()
-
-    if not results:
+    if not password_db.delete_entry(Account.strip().capitalize(), Username.strip().capitalize()):
         show_message(message_label, "Account does not exist!", "red")
     else:
-        cursor.execute("DELETE FROM manager WHERE USERNAME=? AND ACCOUNT=?", (Account.strip().capitalize(),
-                                                                              Username.strip().capitalize()))
-        connection.commit()
         toggle_delete(False)
         show_message(message_label, "Account deleted", "green")
 
     reset()
-    connection.close()
 
 
-def upload(message_label: tk.Label, toggle_upload: Callable, reset: Callable):
+def backup_folder() -> DriveFolder:
+    """Returns the Drive folder the vault is backed up to, connecting to Drive on first use"""
+    global drive_folder
+    if drive_folder is None:
+        drive_folder = DriveFolder(drive_service(load_credentials(TOKEN_FILE, CREDENTIALS_FILE)), DRIVE_FOLDER)
+    return drive_folder
+
+
+def upload(message_label: tk.Label, toggle_upload: Callable, reset: Callable, tasks: TaskRunner):
     """
-        Upload the database file to Google Drive.
+        Back the password vault up to Google Drive.
 
-        This function uploads the database file to a designated folder in Google Drive
-        after validating a provided passcode.
+        Only the entries changed since the last upload are sent, as a small encrypted delta file,
+        and the deltas are compacted into a fresh snapshot every so often (see password_sync).
+        The upload runs on a background thread, the result is shown once it finishes.
 
         Args:
             message_label (tk.Label): The label widget to display messages.
             toggle_upload (function): Function to toggle upload fields visibility.
             reset (Function): Function to reset the main combobox
+            tasks (TaskRunner): Runs the upload off the Tk thread.
     """
-    global creds
     toggle_upload(False)
-    try:
-        SCOPES = ['https://www.googleapis.com/auth/drive']
-        creds = None
-        # The file token.json stores the user's access and refresh tokens, and is
-        # created automatically when the authorization flow completes for the first
-        # time.
-        if os.path.exists(r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json'):
-            creds = Credentials.from_authorized_user_file(
-                r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json', SCOPES)
-        # If there are no (valid) credentials available, let the user log in.
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\Drive_Credentials.json', SCOPES)
-                creds = flow.run_local_server(port=0)
-            # Save the credentials for the next run
-            with open(r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json', 'w') as token:
-                token.write(creds.to_json())
-    except Exception as error:
-        show_message(message_label, text=f"Credentials Error! {error}", color="red")
-
-    try:
-        service = build('drive', 'v3', credentials=creds)
-
-        response = service.files().list(
-            q="name='Hexzdrivefolder' and mimeType='application/vnd.google-apps.folder'",
-            spaces='drive').execute()
 
-        if not response['files']:
-            file_metadata = {
-                "name": "Hexzdrivefolder",
-                "mimeType": "application/vnd.google-apps.folder",
-            }
+    def uploaded(kind: str) -> None:
+        messages = {"snapshot": "Backup Uploaded To Google Drive", "delta": "Changes Uploaded To Google Drive",
+                    "up to date": "Backup Already Up To Date"}
+        show_message(message_label, messages[kind], "green")
 
-            file = service.files().create(body=file_metadata, fields="id").execute()
-            folder_id = file.get('id')
-        else:
-            folder_id = response['files'][0]['id']
-
-        file_metadata = {
-            "name": "MyPasswords.db",
-            "parents": [folder_id]
-        }
-
-        file_path = r"C:\Users\huzai\PycharmProjects\Python-projects-1\Passwords.db"
-        # Search for the existing file in Google Drive
-        existing_file = service.files().list(
-            q=f"name='MyPasswords.db' and parents='{folder_id}'",
-            spaces='drive').execute()
-
-        if existing_file['files']:
-            existing_file_id = existing_file['files'][0]['id']
-
-            media = MediaFileUpload(file_path, resumable=True)
-            update_file = service.files().update(fileId=existing_file_id, media_body=media).execute()
-
-            logging.info("Updated file: %s", update_file.get('name'))
-            show_message(message_label, "File Updated Successfully", "green")
-        else:
-            media = MediaFileUpload(file_path)
-            upload_file = service.files().create(body=file_metadata, media_body=media, fields='id').execute()
-            logging.info(f"Uploaded file: %s", upload_file.get('name'))
-            show_message(message_label, "File Uploaded To Google Drive", "green")
-        reset()
-    except HttpError as error:
+    def failed(error: Exception) -> None:
         logging.info(f'An error occurred: {error}')
-        reset()
         show_message(message_label, "An error occurred during upload", "red")
 
+    tasks.run_io('upload', lambda: password_sync.sync(backup_folder()), on_done=uploaded, on_error=failed)
+    reset()
+
 
-def exist(username: str, message_label: tk.Label, toggle_search: Callable, search_listbox: tk.scrolledtext.ScrolledText,
+def exist(username: str, message_label: tk.Label, toggle_search: Callable, search_listbox: VirtualList,
           reset: Callable):
     """
         Check if an account exists in the database.
@@ -313,38 +235,55 @@ def exist(username: str, message_label: tk.Label, toggle_search: Callable, searc
             username (str): The account username to search for.
             message_label (tk.Label): The label widget to display messages.
             toggle_search (function): Function to toggle search fields visibility.
-            search_listbox(tk.ListBox): Creates a Taskbox which is also scrollable
+            search_listbox (VirtualList): The list widget to display the accounts.
             reset (Function): Function to reset the main combobox
     """
     if username.strip() == "":
         show_message(message_label, "Please enter an account! ", "red")
     else:
-        connection = sqlite3.connect("Passwords.db")
-        cursor = connection.cursor()
-        res = cursor.execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager WHERE USERNAME=?",
-                             (username.capitalize(),))
-        result = res.fetchall()
+        result = password_db.find_username(username.capitalize())
         if not result:
             show_message(message_label, "Account doesnt exist", "red")
         else:
             show_message(message_label, "Showing Account / Accounts for 60 Seconds", "green", duration=60000)
-            for index, values in enumerate(result, start=1):
-                search_listbox.insert(tk.END, f"Account {index}\n\n")
-                search_listbox.insert(tk.END,
-                                      f"ACCOUNT: {values[0]}\nUSERNAME: {values[1]}\nPASSWORD: {values[2]}\n\n")
+            # Replace the suggestions with the full accounts
+            search_listbox.set_rows([account_details(index, values) for index, values in enumerate(result, start=1)],
+                                    ACCOUNT_LINES)
             search_listbox.pack()
             toggle_search(False)
         reset()
 
 
+def suggest(query: str, search_listbox: VirtualList):
+    """
+        List the accounts matching what has been typed so far in the search box.
+
+        Matches come from the in-memory search index, prefix matches first then close spellings,
+        so the list keeps up with every keystroke even on large vaults. Passwords are only shown
+        once the search is submitted.
+
+        Args:
+            query (str): The text typed in the search box so far.
+            search_listbox (VirtualList): The list widget to display the matches.
+    """
+    matches = password_db.search(query)
+    search_listbox.set_rows([f"ACCOUNT: {username}\nUSERNAME: {account}\n" for username, account in matches], 3)
+    if matches:
+        search_listbox.pack()
+    else:
+        search_listbox.pack_forget()
+
+
 def master(password: str, message_label: tk.Label, master_entry: tk.Entry, option: tk.StringVar,
            toggle_master: Callable,
            toggle_search: Callable, toggle_upload: Callable, toggle_view: Callable, toggle_Edit_2: Callable,
-           reset: Callable):
+           reset: Callable, toggle_add_fields: Callable, toggle_edit: Callable):
     """
        Validate the master password and perform corresponding actions.
 
-       This function checks if the provided password matches the stored master password.
+       This function unlocks the password vault with the provided password, the key is only derived
+       the first time, afterwards the password is checked against the unlocked session. A new vault
+       asks for the password a second time before it becomes the master password.
        If the password is correct, it performs actions based on the selected option, such as
        toggling search fields for account existence checking.
 
@@ -358,13 +297,19 @@ def master(password: str, message_label: tk.Label, master_entry: tk.Entry, optio
            toggle_upload (function): Function to toggle upload fields visibility.
            toggle_view (function): Function to toggle view fields visibility.
            reset (function): Function to reset the main combobox
+           toggle_add_fields (function): Function to toggle add fields visibility.
+           toggle_edit (function): Function to toggle edit fields visibility.
     """
-    with open("master.txt", "r") as file:
-        master_password = file.readline().strip()
     if password.strip() == "":
         show_message(message_label, "Please enter your password!", "red")
     else:
-        if password == master_password:
+        create = password_db.needs_new_master()
+        if create and simpledialog.askstring("New master password", "Enter the new master password again:",
+                                             show='*') != password:
+            master_entry.delete(0, tk.END)
+            show_message(message_label, "The passwords don't match", "red")
+            return
+        if password_db.unlock(password, create=create):
             toggle_master(False)
             show_message(message_label, "Authorization successful", "green")
             if option == "Search":
@@ -373,6 +318,10 @@ def master(password: str, message_label: tk.Label, master_entry: tk.Entry, optio
                 toggle_view(True)
             elif option == "Upload":
                 toggle_upload(True)
+            elif option == "Add":
+                toggle_add_fields(True)
+            elif option == "Edit":
+                toggle_edit(True)
             reset()
         else:
             master_entry.delete(0, tk.END)
@@ -380,7 +329,11 @@ def master(password: str, message_label: tk.Label, master_entry: tk.Entry, optio
             toggle_upload(False)
             toggle_view(False)
             toggle_master(False)
-            show_message(message_label, "Authorization failed", "red")
+            if create:
+                show_message(message_label, f"Can't set a master password over existing entries "
+                                            f"without {password_db.LEGACY_MASTER}", "red")
+            else:
+                show_message(message_label, "Authorization failed", "red")
             reset()
 
 
@@ -405,7 +358,9 @@ def gui():
     window.iconphoto(True, icon)
     style = ThemedStyle(window)
     style.set_theme("black")
-    create_database()
+    password_db.create_database()
+    # One worker, so backups never run against the Drive service side by side
+    tasks = TaskRunner(window, io_workers=1)
     # Theme Switch Function Button
     frame = ttk.Frame(window)
     frame.pack(side="top", anchor="center", pady=5)
@@ -464,18 +419,22 @@ def gui():
     master_button = tk.Button(window, text="Check",
                               command=lambda: master(master_entry.get(), master_main_label, master_entry, items.get(),
                                                      toggle_master,
-                                                     toggle_search, toggle_upload, toggle_view, toggle_edit_2, reset),
+                                                     toggle_search, toggle_upload, toggle_view, toggle_edit_2, reset,
+                                                     toggle_add_fields, toggle_edit),
                               font=("Nunito", 15))
 
     # Search Function Fields
     search_label = tk.Label(window, text="Enter Account To Search: ", font=("Nunito", 10), anchor="center")
     search_entry = tk.Entry(window, font=("Nunito", 20))
     search_main_label = tk.Label(window, text="", font=("Nunito", 14), anchor="center")
-    search_listbox = scrolledtext.ScrolledText(window, wrap=tk.WORD, width=40, height=20, font=("Nunito", 14))
+    search_listbox = VirtualList(window, width=40, height=20, font=("Nunito", 14))
     search_button = tk.Button(window, text="Search",
                               command=lambda: exist(search_entry.get(), search_main_label, toggle_search,
                                                     search_listbox, reset),
                               font=("Nunito", 15))
+    # Search as you type, until the search is submitted and the fields are put away
+    search_entry.bind('<KeyRelease>',
+                      lambda event: search_entry.winfo_ismapped() and suggest(search_entry.get(), search_listbox))
 
     # Edit Function Fields
     edit_label = tk.Label(window, text="Enter Account To Edit: ", font=("Nunito", 10), anchor="center")
@@ -510,13 +469,13 @@ def gui():
     # Upload Function Fields
     upload_label = tk.Label(window, text="Click to Upload: ", font=("Nunito", 10), anchor="center")
     upload_main_label = tk.Label(window, text="", font=("Nunito", 14))
-    upload_button = tk.Button(window, text="Upload", command=lambda: upload(upload_main_label, toggle_upload, reset),
+    upload_button = tk.Button(window, text="Upload", command=lambda: upload(upload_main_label, toggle_upload, reset, tasks),
                               font=("Nunito", 15))
 
     # View Function Fields
     view_label = tk.Label(window, text="Click To View", anchor="center")
     view_label_main = tk.Label(window, text="", font=("Nunito", 14), anchor="center")
-    view_listbox = scrolledtext.ScrolledText(window, wrap=tk.WORD, width=40, height=20, font=("Nunito", 14))
+    view_listbox = VirtualList(window, width=40, height=20, font=("Nunito", 14))
     view_button = tk.Button(window, text="View",
                             command=lambda: view(view_listbox, view_label_main, toggle_view, reset),
                             font=("Nunito", 15))
@@ -578,14 +537,12 @@ def gui():
             search_label.pack(pady=5)
             search_entry.pack(pady=5)
             search_button.pack(pady=10)
-            search_listbox.config(state='normal')
-            search_listbox.delete("1.0", tk.END)  # Clear the text in the scrolled text widget
+            search_listbox.clear()
         else:
             search_label.pack_forget()
             search_entry.pack_forget()
             search_button.pack_forget()
             search_entry.delete(0, tk.END)
-            search_listbox.config(state='disabled')
             search_listbox.after(60000, lambda: search_listbox.pack_forget())  # Pylint: disable=W0108
 
     # Used to unpack all edit fields
@@ -660,12 +617,10 @@ def gui():
         if enable:
             view_label.pack(pady=5)
             view_button.pack(pady=5)
-            view_listbox.config(state='normal')
-            view_listbox.delete("1.0", tk.END)
+            view_listbox.clear()
         else:
             view_label.pack_forget()
             view_button.pack_forget()
-            view_listbox.config(state='disabled')
             view_listbox.after(60000, lambda: view_listbox.pack_forget())
 
     # Used to get the value from the main combobox
@@ -685,12 +640,13 @@ def gui():
             toggle_search(False)
             toggle_edit_2()
         elif selected_value == "Add":
-            toggle_add_fields(True)
+            # Passwords are encrypted on the way in, the vault has to be unlocked first
+            toggle_add_fields(password_db.unlocked())
             toggle_edit(False)
             toggle_edit_2()
             toggle_delete(False)
             toggle_search(False)
-            toggle_master(False)
+            toggle_master(not password_db.unlocked())
             view_label_main.pack_forget()
             view_listbox.pack_forget()
             search_main_label.pack_forget()
@@ -726,10 +682,10 @@ def gui():
             view_listbox.pack_forget()
             search_listbox.pack_forget()
         elif selected_value == "Edit":
-            toggle_edit(True)
+            toggle_edit(password_db.unlocked())
             toggle_search(False)
             toggle_delete(False)
-            toggle_master(False)
+            toggle_master(not password_db.unlocked())
             toggle_add_fields(False)
             search_main_label.pack_forget()
             view_label_main.pack_forget()
@@ -858,7 +814,11 @@ def gui():
     theme_button.pack()
 
     # Start the tkinter main loop
-    window.mainloop()
+    try:
+        window.mainloop()
+    finally:
+        tasks.shutdown()
+        password_db.close()
 
 
 def logging_function():
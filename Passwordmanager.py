@@ -1,7 +1,8 @@
-import os
 import pwinput  # type: ignore
 import time
 
+import passwordmanager_db
+
 
 def master_password(password: str):
     with open("master.txt", 'w') as f:
@@ -18,51 +19,39 @@ def master_check(password: str):
 
 
 def add(account, username, password):
-    with open("Passwords.txt", 'a') as f:
-        f.write(f"Account: {account}, Username: {username}, Password: {password}\n")
+    if passwordmanager_db.add(account, username, password):
+        print(f"Account '{account}' added")
+    else:
+        print("Account already exists")
 
 
 def remove(account):
-    found = False
-    with open("Passwords.txt", 'r') as f, open("temp.txt", 'w') as temp:
-        for line in f:
-            if not line.startswith(f"Account: {account},"):
-                temp.write(line)
-            else:
-                found = True
-    if not found:
+    if not passwordmanager_db.remove(account):
         print(f"Account '{account}' doesn't exist")
     else:
-        print(f"Removing account '{account}'...")
-        os.replace('temp.txt', 'Passwords.txt')
         print(f"Account '{account}' successfully removed")
 
 
-
 def view():
-    with open("Passwords.txt", 'r') as f:
-        for line in f:
-            print(line.strip())
+    for account, username, password in passwordmanager_db.entries():
+        print(f"Account: {account}, Username: {username}, Password: {password}")
 
 
 def exists(account):
-    found = False
-    with open("Passwords.txt", 'r') as f:
-        for line in f:
-            if line.startswith(f"Account: {account},"):
-                found = True
-        return found
+    return passwordmanager_db.exists(account)
+
 
 def search(account):
-    with open("Passwords.txt", 'r') as f:
-        for line in f:
-            if line.startswith(f"Account: {account},"):
-                print(line)
-            else:
-                print(f"Account: {account} not found")
+    entry = passwordmanager_db.find(account)
+    if entry is None:
+        print(f"Account: {account} not found")
+    else:
+        username, password = entry
+        print(f"Account: {account}, Username: {username}, Password: {password}")
 
 
 def main():
+    passwordmanager_db.create_database()
     attempts = 3
     for count in range(3):
         pwd = pwinput.pwinput(prompt="Enter password: ", mask="X")
@@ -80,7 +69,8 @@ def main():
                                 un = str(input("Enter username: "))
                                 pw = pwinput.pwinput(prompt="Enter password: ", mask="X")
                                 add(ac, un, pw)
-                            print("Account already exists")
+                            else:
+                                print("Account already exists")
                         if op == "view":
                             view()
                         if op == "remove":
@@ -109,4 +99,7 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    try:
+        main()
+    finally:
+        passwordmanager_db.close()
@@ -12,6 +12,21 @@ import io
 import requests
 from ttkthemes.themed_style import ThemedStyle
 
+import weather_dashboard
+from tk_tasks import TaskRunner
+from weather_client import WeatherClient
+
+client: WeatherClient | None = None
+
+
+def weather_client() -> WeatherClient:
+    """Returns the cached OpenWeather client, creating it on first use"""
+    global client
+    if client is None:
+        with open("Weather_token.json", 'r') as file:
+            client = WeatherClient(json.load(file)["TOKEN"])
+    return client
+
 
 def show_message(message_label, text, colour, duration=2000):
     """
@@ -75,21 +90,17 @@ def weather(location, listbox: tk.scrolledtext.ScrolledText, message_label, weat
     Returns:
         None
     """
-    api_key = json.load(open("Weather_token.json", 'r'))["TOKEN"]
-    weather_url = "http://api.openweathermap.org/data/2.5/weather?"
-
-    params = {
-        "q": location.capitalize(),
-        "appid": api_key
-    }
-
-    response = requests.get(weather_url, params=params)
-    results = response.json()
-
     if location.strip() == "":
         show_message(message_label, text="Please Enter a City!", colour="red")
     else:
-        if results["cod"] == "404":
+        try:
+            # Served from Weather.db while fresh, see WeatherClient
+            results = weather_client().current(location.capitalize())
+        except requests.RequestException as error:
+            show_message(message_label, text="Couldn't Reach The Weather Service!", colour="red")
+            logging.error(f"Weather request failed: {error}")
+            return
+        if results is None:
             show_message(message_label, text="City Not Found!", colour="red")
             logging.info("City Not Found!")
             weather_toggle(False)
@@ -102,12 +113,11 @@ def weather(location, listbox: tk.scrolledtext.ScrolledText, message_label, weat
             feels_like = results["main"].get("feels_like", "N/A")
             feels_like_celsius, feels_like_fahrenheit = convert(feels_like)
             celsius, fahrenheit = convert(temperature)
-            icon_code = results["weather"][0]["icon"]
-            icon_url = f"http://openweathermap.org/img/wn/{icon_code}.png"
-
-            response_icon = requests.get(icon_url, stream=True)
-            if response_icon.status_code == 200:  # code for API Success
-                icon_data = response_icon.content
+            try:
+                icon_data = weather_client().icon(results["weather"][0]["icon"])
+            except requests.RequestException:
+                icon_data = None
+            if icon_data:
                 icon_image = Image.open(io.BytesIO(icon_data))
                 icon_image = icon_image.resize((70, 70))  # Adjust the size of the icon as needed
                 icon_photo = ImageTk.PhotoImage(icon_image)
@@ -144,10 +154,6 @@ def forecast(location, days, message_label, forecast_listbox: tk.scrolledtext.Sc
     Returns:
         None
     """
-    api_key = json.load(open("Weather_token.json", 'r'))["TOKEN"]
-    forecast_url = "http://api.openweathermap.org/data/2.5/forecast?"
-    weather_url = "http://api.openweathermap.org/data/2.5/weather?"
-
     if location.strip() == "":
         show_message(message_label, text="Enter a City!", colour="red")
         logging.info("Invalid Input!")
@@ -159,29 +165,21 @@ def forecast(location, days, message_label, forecast_listbox: tk.scrolledtext.Sc
     else:
         days = min(int(days), 5)  # Limit days to a maximum of 5
 
-        weather_params = {
-            "q": location.capitalize(),
-            "appid": api_key
-        }
-        response_weather = requests.get(weather_url, params=weather_params).json()
-        if response_weather['cod'] == '404':
+        try:
+            # The coordinates come from the cached geocoding, not an extra /weather call
+            results = weather_client().forecast(location.capitalize())
+        except requests.RequestException as error:
+            show_message(message_label, text="Couldn't Reach The Weather Service!", colour="red")
+            logging.error(f"Forecast request failed: {error}")
+            return
+        if results is None:
             show_message(message_label, text="City Not Found!", colour="red")
             logging.info("City Not Found!")
             forecast_toggle(False)
         else:
-            lat, lon = response_weather['coord']['lat'], response_weather['coord']['lon']
-
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "appid": api_key,
-                "cnt": days * 8  # 3 hours interval for the api for each day
-            }
-
             daily_forecast = {}
-            forecast_response = requests.get(forecast_url, params=params)
-            results = forecast_response.json()
-            for data in results['list'][1::]:
+            # 3 hours interval for the api, 8 entries for each day
+            for data in results['list'][1:days * 8]:
                 day_timestamp = data['dt']
                 day = datetime.datetime.fromtimestamp(day_timestamp).strftime("%A")
                 converted_c_min, converted_f_min = convert(data['main']['temp_min'])
@@ -232,10 +230,6 @@ def weather_and_forecast(location: str, days: int, wflistbox: tkinter.scrolledte
     Returns:
         None
     """
-    api_key = json.load(open("Weather_token.json", 'r'))["TOKEN"]
-    forecast_url = "http://api.openweathermap.org/data/2.5/forecast?"
-    weather_url = "http://api.openweathermap.org/data/2.5/weather?"
-
     if location.strip() == "":
         show_message(message_label, text="Enter a City!", colour="red")
         logging.info("Invalid Input!")
@@ -246,26 +240,18 @@ def weather_and_forecast(location: str, days: int, wflistbox: tkinter.scrolledte
         logging.info("Invalid Input!")
     else:
         days = min(int(days), 5)  # Limit days to a maximum of 5
-        weather_params = {
-            "q": location.capitalize(),
-            "appid": api_key
-        }
-
-        weather_response = requests.get(weather_url, params=weather_params).json()
-        if weather_response['cod'] == "404":
+        try:
+            weather_response = weather_client().current(location.capitalize())
+            forecast_response = weather_client().forecast(location.capitalize())
+        except requests.RequestException as error:
+            show_message(message_label, text="Couldn't Reach The Weather Service!", colour="red")
+            logging.error(f"Weather & forecast request failed: {error}")
+            toggle_wf(False)
+            return
+        if weather_response is None or forecast_response is None:
             show_message(message_label, text="City Not Found!", colour="red")
             logging.info("City Not Found!")
         else:
-            lat, lon = weather_response['coord']['lat'], weather_response['coord']['lon']
-
-            forecast_params = {
-                "appid": api_key,
-                "cnt": int(days) * 8,
-                "lat": lat,
-                "lon": lon
-            }
-
-            forecast_response = requests.get(forecast_url, params=forecast_params).json()
 
             show_message(message_label, text="Getting Weather & Forecast....", colour="green")
             logging.info("Getting Weather & Forecast From The API!")
@@ -277,7 +263,7 @@ def weather_and_forecast(location: str, days: int, wflistbox: tkinter.scrolledte
             celsius, fahrenheit = convert(temperature)
 
             forecasted_Data = {}
-            for data in forecast_response['list']:
+            for data in forecast_response['list'][:days * 8]:
                 day_timestamp = data['dt']
                 day = datetime.datetime.fromtimestamp(day_timestamp).strftime("%A")
                 converted_c_min, converted_f_min = convert(data['main']['temp_min'])
@@ -317,6 +303,62 @@ def weather_and_forecast(location: str, days: int, wflistbox: tkinter.scrolledte
         toggle_wf(False)
 
 
+def dashboard(cities: str, dashboard_box: tkinter.scrolledtext.ScrolledText, message_label: tk.Label,
+              dashboard_toggle: Callable, tasks: TaskRunner):
+    """
+    Fetch the weather and forecast of several cities at once and display them with their latency.
+
+    The cities are fetched side by side off the Tk thread, see weather_dashboard.fetch_cities.
+
+    Args:
+        cities (str): Comma separated city names.
+        dashboard_box (tkinter.scrolledtext.ScrolledText): The scrolled text box widget to display the cities.
+        message_label (tk.Label): The label widget to display messages or errors.
+        dashboard_toggle (Callable): A function used to toggle the dashboard fields.
+        tasks (TaskRunner): Runs the requests in the background.
+
+    Returns:
+        None
+    """
+    names = weather_dashboard.parse_cities(cities)
+    if not names:
+        show_message(message_label, text="Enter at Least One City!", colour="red")
+        logging.info("Invalid Input!")
+        return
+    show_message(message_label, text=f"Getting Weather For {len(names)} Cities....", colour="green")
+    client = weather_client()
+    start = datetime.datetime.now()
+
+    def fetched(results: list[tuple]) -> None:
+        elapsed = (datetime.datetime.now() - start).total_seconds()
+        dashboard_box.config(state="normal")
+        dashboard_box.delete("1.0", tk.END)
+        for city, current, forecast_response, _, seconds, error in results:
+            if error:
+                dashboard_box.insert(tk.END, f"{city}: {error} ({seconds * 1000:.0f} ms)\n\n", "custom_font")
+                continue
+            celsius, _ = convert(current["main"]["temp"])
+            lows = [convert(data["main"]["temp_min"])[0] for data in forecast_response["list"]]
+            highs = [convert(data["main"]["temp_max"])[0] for data in forecast_response["list"]]
+            dashboard_box.insert(tk.END, f"{city}: {current['weather'][0]['description']}, {celsius:.1f}°C, "
+                                         f"humidity {current['main']['humidity']}%\n"
+                                         f"Next 5 days: {min(lows):.1f}°C to {max(highs):.1f}°C "
+                                         f"({seconds * 1000:.0f} ms)\n\n", "custom_font")
+        median, p95, slowest = weather_dashboard.latency_stats(results)
+        dashboard_box.insert(tk.END, f"{len(results)} cities in {elapsed:.2f}s\nLatency per city: median "
+                                     f"{median:.0f} ms, p95 {p95:.0f} ms, max {slowest:.0f} ms\n", "custom_font")
+        dashboard_box.config(state="disabled")
+        dashboard_box.pack(pady=10)
+        logging.info("Dashboard Displayed Successfully!")
+        dashboard_toggle(False)
+
+    def failed(error: Exception) -> None:
+        show_message(message_label, text="Couldn't Get The Dashboard!", colour="red")
+        logging.error(f"Dashboard failed: {error}")
+
+    tasks.run_io('dashboard', weather_dashboard.fetch_cities, client, names, on_done=fetched, on_error=failed)
+
+
 def gui():
     window = tk.Tk()
     window.title("Weather App")
@@ -367,7 +409,19 @@ def gui():
                          weather_and_forecast_toggle)
                                             , font=("Quicksand", 15))
 
-    Options = ["", "Weather", "Forecast", "Weather & Forecast"]
+    # Dashboard fields
+    dashboard_label = tk.Label(frame_main, text="Enter cities, separated by commas: ", font=("Quicksand", 25, "italic"))
+    dashboard_entry = tk.Entry(frame_main, font=("Quicksand", 15), width=40)
+    dashboard_message = tk.Label(frame_main, text="", font=("Quicksand", 15, "italic"))
+    dashboard_box = tk.scrolledtext.ScrolledText(frame_main, wrap=tk.WORD, width=80, height=40, background="#E1E7DE",
+                                                 borderwidth=4)
+    dashboard_button = tk.Button(frame_main, text="Get", command=lambda:
+    dashboard(dashboard_entry.get(), dashboard_box, dashboard_message, dashboard_toggle, tasks),
+                                 font=("Quicksand", 15))
+    # One task at a time, the dashboard spreads its cities over its own thread pool
+    tasks = TaskRunner(window, io_workers=1)
+
+    Options = ["", "Weather", "Forecast", "Weather & Forecast", "Dashboard"]
     Options_label = tk.Label(frame_main, text="Select a Task: ", font=("Quicksand", 25, "italic"))
     option = tk.StringVar()
     Option_box = tk.ttk.Combobox(frame_main, textvariable=option, font=("Quicksand", 15))
@@ -430,34 +484,64 @@ def gui():
             weather_and_forecast_days.delete(0, tk.END)
             weather_and_forecast_box.config(state="disabled")
 
+    def dashboard_toggle(enable):
+        if enable:
+            dashboard_label.pack(pady=5)
+            dashboard_entry.pack(pady=10)
+            dashboard_button.pack(pady=10)
+            dashboard_box.config(state="normal")
+            dashboard_box.delete("1.0", tk.END)
+            dashboard_box.tag_configure("custom_font", font=("Quicksand", 18), foreground="black")
+        else:
+            dashboard_label.pack_forget()
+            dashboard_entry.pack_forget()
+            dashboard_button.pack_forget()
+            dashboard_entry.delete(0, tk.END)
+
     def get_value(event):
         selected = option.get()
         if selected == "Weather":
             weather_toggle(True)
             forecast_toggle(False)
+            dashboard_toggle(False)
             Weather_box.pack_forget()
             forecast_box.pack_forget()
             weather_and_forecast_box.pack_forget()
+            dashboard_box.pack_forget()
         elif selected == "Forecast":
             forecast_toggle(True)
             weather_toggle(False)
+            dashboard_toggle(False)
             forecast_box.pack_forget()
             Weather_box.pack_forget()
             weather_and_forecast_box.pack_forget()
+            dashboard_box.pack_forget()
         elif selected == "Weather & Forecast":
             weather_and_forecast_toggle(True)
             forecast_toggle(False)
             weather_toggle(False)
+            dashboard_toggle(False)
+            forecast_box.pack_forget()
+            Weather_box.pack_forget()
+            weather_and_forecast_box.pack_forget()
+            dashboard_box.pack_forget()
+        elif selected == "Dashboard":
+            dashboard_toggle(True)
+            weather_and_forecast_toggle(False)
+            forecast_toggle(False)
+            weather_toggle(False)
             forecast_box.pack_forget()
             Weather_box.pack_forget()
             weather_and_forecast_box.pack_forget()
+            dashboard_box.pack_forget()
 
     entry_mapping = {
         Weather_entry: Weather_button,
         forecast_entry: forecast_days_entry,
         forecast_days_entry: forecast_button,
         weather_and_forecast_entry: weather_and_forecast_days,
-        weather_and_forecast_days: weather_and_forecast_button
+        weather_and_forecast_days: weather_and_forecast_button,
+        dashboard_entry: dashboard_button
     }
 
     def widget_handler(event):
@@ -466,13 +550,13 @@ def gui():
             if widget == focused_widget:
                 next_widget.focus()
                 break
-        for buttons in [Weather_button, forecast_button, weather_and_forecast_button]:
+        for buttons in [Weather_button, forecast_button, weather_and_forecast_button, dashboard_button]:
             if focused_widget == buttons:
                 buttons.invoke()
 
     for widget in entry_mapping:
         widget.bind("<Return>", widget_handler)
-    for button in [Weather_button, forecast_button, weather_and_forecast_button]:
+    for button in [Weather_button, forecast_button, weather_and_forecast_button, dashboard_button]:
         button.bind("<Return>", widget_handler)
 
     def close():
@@ -485,7 +569,12 @@ def gui():
     Option_box.bind("<<ComboboxSelected>>", get_value)
     Option_box.pack(pady=10)
 
-    window.mainloop()
+    try:
+        window.mainloop()
+    finally:
+        tasks.shutdown()
+        if client is not None:
+            client.close()
 
 
 def logging_func():
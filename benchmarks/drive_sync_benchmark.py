@@ -0,0 +1,251 @@
+"""
+Backs a password vault up to a local fake Drive server with password_sync, first as a snapshot,
+then a delta per round of a few edits until the deltas get compacted, and restores it again.
+
+Reports the bytes and time of every sync next to the size of Passwords.db, which the old upload
+sent in full every time, and checks the restored vault matches the original.
+
+The fake server speaks enough of the Drive v3 REST API for DriveFolder (list, create, update,
+download and delete) and DriveUploader (resumable uploads, see drive_upload_benchmark), over https
+with a throwaway self-signed certificate, since the client always sends uploads over https.
+
+Usage:
+    python benchmarks/drive_sync_benchmark.py [entries] [rounds] [edits]
+"""
+import collections
+import datetime
+import email.parser
+import ipaddress
+import itertools
+import json
+import os
+import random
+import re
+import ssl
+import string
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+from google.auth.credentials import AnonymousCredentials
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_db  # noqa: E402
+import password_sync  # noqa: E402
+from drive_uploader import DriveFolder, drive_service  # noqa: E402
+
+MASTER = 'correct horse battery staple'
+FOLDER = 'Hexzdrivefolder'
+
+
+class FakeDrive(BaseHTTPRequestHandler):
+    files: dict[str, dict] = {}
+    ids = itertools.count(1)
+    received = 0
+    # Requests by kind, e.g. 'list' or 'chunk'
+    requests: collections.Counter = collections.Counter()
+    # Resumable upload sessions: the file metadata, the file it replaces, if any, and the bytes so far
+    uploads: dict[str, dict] = {}
+    # Upload chunks still to answer with 503 Service Unavailable, to exercise the client's retries
+    failures = 0
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, body: bytes = b'', content_type: str = 'application/json') -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, value: dict) -> None:
+        self._reply(200, json.dumps(value).encode())
+
+    def _body(self) -> bytes:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        FakeDrive.received += len(body)
+        return body
+
+    def _file_id(self) -> str:
+        return urllib.parse.urlparse(self.path).path.rsplit('/', 1)[1]
+
+    def _not_found(self) -> None:
+        self._reply(404, json.dumps({'error': {'code': 404, 'message': 'File not found'}}).encode())
+
+    def _start_upload(self, target: str | None) -> None:
+        """Opens a resumable upload session, answered with the URI the chunks go to"""
+        FakeDrive.requests['start upload'] += 1
+        metadata = self._body()
+        if target is not None and target not in self.files:
+            self._not_found()
+            return
+        upload_id = f'upload{next(self.ids)}'
+        self.uploads[upload_id] = {'file': json.loads(metadata) if metadata else {}, 'target': target,
+                                   'data': bytearray()}
+        self.send_response(200)
+        self.send_header('Location', f'https://{self.headers["Host"]}/upload/drive/v3/files'
+                                     f'?uploadType=resumable&upload_id={upload_id}')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_PUT(self) -> None:
+        """
+        Takes a chunk of a resumable upload, or answers a status query ('bytes */total'), with 308 and
+        the range received until the whole file is in
+        """
+        upload = self.uploads[urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)['upload_id'][0]]
+        chunk = self._body()
+        start, total = re.fullmatch(r'bytes (?:(\d+)-\d+|\*)/(\d+|\*)', self.headers['Content-Range']).groups()
+        FakeDrive.requests['chunk' if start is not None else 'status'] += 1
+        if start is not None and FakeDrive.failures:
+            FakeDrive.failures -= 1
+            self._reply(503, json.dumps({'error': {'code': 503, 'message': 'Backend Error'}}).encode())
+            return
+        if start is not None and int(start) == len(upload['data']):
+            upload['data'] += chunk
+        if total == '*' or len(upload['data']) < int(total):
+            self.send_response(308)
+            if upload['data']:
+                self.send_header('Range', f'bytes=0-{len(upload["data"]) - 1}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        file_id = upload['target'] or f'file{next(self.ids)}'
+        self.files.setdefault(file_id, upload['file'])['data'] = bytes(upload['data'])
+        self._json({'id': file_id})
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        FakeDrive.requests['download' if query.get('alt') == ['media'] else 'list'] += 1
+        if query.get('alt') == ['media']:
+            self._reply(200, self.files[self._file_id()]['data'], 'application/octet-stream')
+            return
+        terms = dict(re.findall(r"(name|mimeType)='((?:[^'\\]|\\.)*)'", query['q'][0]))
+        name = terms['name'].replace("\\'", "'").replace('\\\\', '\\')
+        parent = re.search(r"'([^']*)' in parents", query['q'][0])
+        self._json({'files': [{'id': file_id} for file_id, file in self.files.items()
+                              if file['name'] == name and file.get('mimeType') == terms.get('mimeType', file.get('mimeType'))
+                              and (parent is None or parent.group(1) in file.get('parents', []))]})
+
+    def do_POST(self) -> None:
+        if 'uploadType=resumable' in self.path:
+            self._start_upload(None)
+            return
+        FakeDrive.requests['create'] += 1
+        body = self._body()
+        if 'uploadType=multipart' in self.path:
+            message = email.parser.BytesParser().parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+            metadata, media = message.get_payload()
+            file = json.loads(metadata.get_payload())
+            file['data'] = media.get_payload(decode=True)
+        else:
+            file = json.loads(body)
+        file_id = f'file{next(self.ids)}'
+        self.files[file_id] = file
+        self._json({'id': file_id})
+
+    def do_PATCH(self) -> None:
+        if 'uploadType=resumable' in self.path:
+            self._start_upload(self._file_id())
+            return
+        FakeDrive.requests['update'] += 1
+        if self._file_id() not in self.files:
+            self._not_found()
+            return
+        self.files[self._file_id()]['data'] = self._body()
+        self._json({'id': self._file_id()})
+
+    def do_DELETE(self) -> None:
+        FakeDrive.requests['delete'] += 1
+        del self.files[self._file_id()]
+        self._reply(204)
+
+
+def certificate(directory: str) -> tuple[str, str]:
+    """Writes a self-signed certificate and key for 127.0.0.1, returning their paths"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, '127.0.0.1')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address('127.0.0.1'))]),
+                           critical=False)
+            .sign(key, hashes.SHA256()))
+    cert_file, key_file = os.path.join(directory, 'drive.pem'), os.path.join(directory, 'drive.key')
+    with open(cert_file, 'wb') as file:
+        file.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, 'wb') as file:
+        file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                     serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+def random_text(length: int) -> str:
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+def timed_sync(folder: DriveFolder, database: str) -> None:
+    before, start = FakeDrive.received, time.perf_counter()
+    kind = password_sync.sync(folder)
+    elapsed = time.perf_counter() - start
+    password_db.get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"{kind:10} {FakeDrive.received - before:>10,} bytes sent in {elapsed * 1000:7.1f} ms   "
+          f"Passwords.db: {os.path.getsize(database):>10,} bytes")
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else password_sync.COMPACT_AFTER + 2
+    edits = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file, key_file = certificate(directory)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeDrive)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        service = drive_service(AnonymousCredentials(), f'https://127.0.0.1:{server.server_port}', cert_file)
+
+        database = os.path.join(directory, 'Passwords.db')
+        password_db.LEGACY_MASTER = os.path.join(directory, 'master.txt')
+        password_db.use_database(database)
+        password_db.create_database()
+        password_db.unlock(MASTER, create=True)
+        for number in range(entries):
+            password_db.add_entry(f'User{number}', random.choice(['Gmail', 'Github', 'X']), random_text(16))
+        folder = DriveFolder(service, FOLDER)
+        timed_sync(folder, database)
+        for _ in range(rounds):
+            for username, account, _ in random.sample(password_db.entries(), edits):
+                if random.random() < 0.2:
+                    password_db.delete_entry(username, account)
+                else:
+                    password_db.update_entry(username, account, username, account, random_text(16))
+            password_db.add_entry(f'New{random_text(6)}', 'Gmail', random_text(16))
+            timed_sync(folder, database)
+        original = password_db.entries()
+        password_db.close()
+
+        start = time.perf_counter()
+        restored = password_sync.restore(DriveFolder(service, FOLDER), MASTER, os.path.join(directory, 'Restored.db'))
+        print(f"restored {restored} entries in {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{'matching' if password_db.entries() == original else 'NOT matching'} the original")
+        password_db.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
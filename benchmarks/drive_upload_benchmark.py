@@ -0,0 +1,153 @@
+"""
+Uploads report files through DriveUploader, the way ExpenseGUI's upload queue does, to the local
+fake Drive server of drive_sync_benchmark, taking it through each of its paths:
+
+- new files created with resumable chunked uploads, each file submitted a second time while still
+  queued, which coalesces into the pending upload, and once more while uploading, which doesn't,
+- every file edited and uploaded again, updating it in place under its cached id,
+- chunks the server answers with 503 Service Unavailable, retried,
+- a file deleted from Drive after its id was cached, found missing and created again,
+- stop() draining the queue, with the callbacks dispatched afterwards.
+
+Reports the time and requests of each step and checks Drive holds the local files' content.
+
+Usage:
+    python benchmarks/drive_upload_benchmark.py [files] [size_kib]
+"""
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+from google.auth.credentials import AnonymousCredentials
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drive_sync_benchmark import FakeDrive, certificate  # noqa: E402
+from drive_uploader import DriveUploader, drive_service  # noqa: E402
+
+FOLDER = 'March-2024'
+CHUNK_SIZE = 256 * 1024
+
+
+class Results:
+    """Collects upload callbacks as (filename, file_id, error)"""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str | None, Exception | None]] = []
+
+    def callback(self, filename: str):
+        return lambda file_id, error: self.calls.append((filename, file_id, error))
+
+    def wait(self, uploader: DriveUploader, count: int, timeout: float = 60) -> None:
+        """Dispatches callbacks, the way ExpenseGUI polls them, until count have run"""
+        deadline = time.monotonic() + timeout
+        while len(self.calls) < count:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{len(self.calls)} of {count} uploads finished")
+            uploader.dispatch_callbacks()
+            time.sleep(0.01)
+
+
+def write(directory: str, filename: str, size: int) -> None:
+    with open(os.path.join(directory, filename), 'wb') as file:
+        file.write(os.urandom(size))
+
+
+def stored(filename: str, directory: str) -> bool:
+    """True if the folder holds exactly one file of that name, with the local file's content"""
+    with open(os.path.join(directory, filename), 'rb') as file:
+        data = file.read()
+    folders = [file_id for file_id, file in FakeDrive.files.items() if file['name'] == FOLDER]
+    matches = [file for file in FakeDrive.files.values()
+               if file['name'] == filename and file.get('parents') == folders]
+    return len(matches) == 1 and matches[0].get('data') == data
+
+
+def step(name: str, start: float, before: dict, results: Results, filenames: list[str], directory: str) -> None:
+    requests = {kind: count - before.get(kind, 0) for kind, count in FakeDrive.requests.items()
+                if count > before.get(kind, 0)}
+    errors = sum(1 for *_, error in results.calls if error is not None)
+    matching = all(stored(filename, directory) for filename in filenames)
+    print(f"{name:30} {(time.perf_counter() - start) * 1000:8.1f} ms  {len(results.calls):3} callbacks "
+          f"{errors} errors  {'matching' if matching else 'NOT matching'}  requests: {requests}")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    size = (int(sys.argv[2]) if len(sys.argv) > 2 else 600) * 1024
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file, key_file = certificate(directory)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FakeDrive)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f'https://127.0.0.1:{server.server_port}'
+
+        # Holds the upload thread before its first upload, so the queue fills up behind it
+        started, release = threading.Event(), threading.Event()
+
+        def service():
+            started.set()
+            release.wait()
+            return drive_service(AnonymousCredentials(), endpoint, cert_file)
+
+        uploader = DriveUploader(service, directory, chunk_size=CHUNK_SIZE)
+        filenames = [f'Report{number}.xlsx' for number in range(count)]
+        for filename in filenames:
+            write(directory, filename, size)
+        print(f"{count} files of {size // 1024} KiB, {CHUNK_SIZE // 1024} KiB chunks")
+
+        results, before, start = Results(), dict(FakeDrive.requests), time.perf_counter()
+        uploader.submit(FOLDER, filenames[0], results.callback(filenames[0]))
+        started.wait()
+        for filename in filenames[1:] + filenames:
+            uploader.submit(FOLDER, filename, results.callback(filename))
+        release.set()
+        results.wait(uploader, 2 * count)
+        step(f"create, {count} resubmitted", start, before, results, filenames, directory)
+        print(f"{'':30} {FakeDrive.requests['start upload'] - before.get('start upload', 0)} uploads for "
+              f"{2 * count} submits, only {filenames[0]} was already uploading")
+
+        results, before, start = Results(), dict(FakeDrive.requests), time.perf_counter()
+        for filename in filenames:
+            write(directory, filename, size)
+            uploader.submit(FOLDER, filename, results.callback(filename))
+        results.wait(uploader, count)
+        step("update, ids cached", start, before, results, filenames, directory)
+
+        FakeDrive.failures = 2
+        results, before, start = Results(), dict(FakeDrive.requests), time.perf_counter()
+        write(directory, filenames[0], size)
+        uploader.submit(FOLDER, filenames[0], results.callback(filenames[0]))
+        results.wait(uploader, 1)
+        step("2 chunks failed with 503", start, before, results, filenames, directory)
+
+        deleted = next(file_id for file_id, file in FakeDrive.files.items() if file['name'] == filenames[-1])
+        del FakeDrive.files[deleted]
+        results, before, start = Results(), dict(FakeDrive.requests), time.perf_counter()
+        uploader.submit(FOLDER, filenames[-1], results.callback(filenames[-1]))
+        results.wait(uploader, 1)
+        step("cached file deleted (404)", start, before, results, filenames, directory)
+        print(f"{'':30} {filenames[-1]} {deleted} -> {results.calls[0][1]}")
+
+        results, before, start = Results(), dict(FakeDrive.requests), time.perf_counter()
+        for filename in filenames:
+            write(directory, filename, size)
+            uploader.submit(FOLDER, filename, results.callback(filename))
+        uploader.stop()
+        uploader.dispatch_callbacks()
+        step("stop() drains the queue", start, before, results, filenames, directory)
+        try:
+            uploader.submit(FOLDER, filenames[0])
+        except RuntimeError as error:
+            print(f"{'':30} submit after stop(): {error}")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Answers the same six analytics queries over a synthetic multi-year Expenses.db two ways: the
+per-function path (every report runs its own SQL read into pandas, then groups it) and
+expense_analytics.ExpenseStore (one read into NumPy columns, every query vectorized on them).
+
+Usage:
+    python benchmarks/expense_analytics_benchmark.py [rows] [rounds]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_db  # noqa: E402
+from expense_analytics import ExpenseStore  # noqa: E402
+
+CATEGORIES = ["Food", "Entertainment", "Business", "Shopping", "Misc"]
+MERCHANTS = [f"Merchant {number}" for number in range(500)]
+START, END = '2020-01-01', '2025-01-01'
+DEPOSIT = 100_000
+
+
+def seed(rows: int) -> None:
+    random.seed(0)
+    connection = expense_db.get_connection()
+    cursor = connection.cursor()
+    months = pd.period_range(START, '2024-12', freq='M')
+    for month in months:
+        cursor.execute("INSERT INTO Transactions (Date, Category, Amount, Available, Total) VALUES (?, ?, ?, ?, ?)",
+                       (f'{month}-01', 'MONTHLY DEPOSIT!', DEPOSIT, DEPOSIT, DEPOSIT))
+        expense_db.record_deposit(cursor, str(month), DEPOSIT)
+    days = pd.date_range(START, END, inclusive='left').strftime('%Y-%m-%d').tolist()
+    cursor.executemany(
+        "INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) VALUES (?, ?, ?, ?, ?, ?)",
+        sorted((random.choice(days), random.choice(CATEGORIES), random.choice(MERCHANTS), random.randint(1, 99),
+                0, DEPOSIT) for _ in range(rows)))
+    connection.commit()
+
+
+def read_expenses() -> pd.DataFrame:
+    frame = pd.read_sql_query("SELECT * FROM Transactions WHERE Date >= ? AND Date < ? ORDER BY Date, Id",
+                              expense_db.get_connection(), params=(START, END))  # NOQA
+    frame['Date'] = pd.to_datetime(frame['Date'])
+    return frame[frame['Category'] != 'MONTHLY DEPOSIT!']
+
+
+def per_function() -> dict:
+    results = {'by category': read_expenses().groupby('Category')['Amount'].sum(),
+               'by day': read_expenses().groupby('Date')['Amount'].sum()}
+    frame = read_expenses()
+    results['by month'] = frame.groupby(frame['Date'].dt.to_period('M'))['Amount'].sum()
+    results['rolling 7d'] = read_expenses().set_index('Date')['Amount'].resample('D').sum().rolling(7).sum()
+    frame = read_expenses()
+    results['running balance'] = DEPOSIT - frame.groupby(frame['Date'].dt.to_period('M'))['Amount'].cumsum()
+    results['top 10 merchants'] = read_expenses().groupby('Description')['Amount'].sum().nlargest(10)
+    return results
+
+
+def columnar() -> dict:
+    store = ExpenseStore.load(START, END)
+    return {'by category': store.category_totals(), 'by day': store.daily_totals(),
+            'by month': store.monthly_totals(), 'rolling 7d': store.rolling_spend(7),
+            'running balance': store.running_balance(), 'top 10 merchants': store.top_merchants(10)}
+
+
+def timed(path, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        path()
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    with tempfile.TemporaryDirectory() as directory:
+        expense_db.pool.database = os.path.join(directory, 'Expenses.db')
+        expense_db.create_database()
+        seed(rows)
+        print(f"{rows} transactions, {START} to {END}, six queries per round")
+        old, new = timed(per_function, rounds), timed(columnar, rounds)
+        print(f"per-function SQL + pandas {old * 1000:8.1f} ms/round")
+        print(f"ExpenseStore              {new * 1000:8.1f} ms/round  ({old / new:.1f}x)")
+
+        store = ExpenseStore.load(START, END)
+        for name, query in [('by category', store.category_totals), ('by day', store.daily_totals),
+                            ('by month', store.monthly_totals), ('rolling 7d', lambda: store.rolling_spend(7)),
+                            ('running balance', store.running_balance),
+                            ('top 10 merchants', lambda: store.top_merchants(10))]:
+            print(f"  {name:17} {timed(query, 20) * 1000:7.2f} ms on the loaded store")
+        expense_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Renders hundreds of monthly reports, comparing the original pyplot code (a new plt.subplots
+figure per report, never closed) with expense_charts' reusable templates.
+
+Reports the time per render and the number of live Python objects after each batch of
+renders, which keeps climbing for pyplot and stays flat for the templates.
+
+Usage:
+    python benchmarks/expense_chart_benchmark.py [renders]
+"""
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_charts  # noqa: E402
+from expense_analytics import ExpenseStore  # noqa: E402
+
+CATEGORIES = ["Food", "Entertainment", "Business", "Shopping", "Misc"]
+BATCH = 25
+
+
+def month(seed: int, rows: int = 60) -> ExpenseStore:
+    generator = np.random.default_rng(seed)
+    return ExpenseStore(np.datetime64('2024-03-01') + np.sort(generator.integers(0, 31, rows)),
+                        generator.choice(CATEGORIES[:random.Random(seed).randint(3, 5)], rows),
+                        np.full(rows, None), generator.integers(1, 100, rows).astype(float), {'2024-03': 20000})
+
+
+def pyplot_render(expenses: pd.DataFrame, path: str) -> None:
+    # The original ExpenseGUI.convert('Bar Graph') and summary('Monthly') code
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+    expenses.groupby('Category')['Amount'].sum().plot(kind='bar', ax=ax1)
+    expenses[['Day', 'Available_overtime']].set_index('Day').plot(kind='barh', ax=ax2)
+    plt.tight_layout()
+    plt.savefig(path)
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(20, 10))
+    expenses.groupby('Category')['Amount'].sum().plot(kind='bar', ax=ax1)
+    expenses.groupby('Day')['Available_overtime'].last().plot(kind='line', ax=ax2)
+    ax3.pie([20000, expenses['Available_overtime'].iloc[-1]], labels=['Utilized', 'Available'], autopct='%1.1f%%')
+    expenses.groupby('Day')['Amount'].sum().plot(kind='line', ax=ax4, linewidth=1)
+    plt.tight_layout()
+    plt.savefig(path)
+
+
+def template_render(store: ExpenseStore, path: str) -> None:
+    daily = store.daily_totals()
+    expense_charts.bar_graph(store, 'March', '2024', path)
+    expense_charts.monthly_summary(store, pd.Series(daily.values, index=daily.index.day),
+                                   (20000, store.running_balance()[-1], 0), 'March', '2024', path)
+
+
+def run(name: str, render, renders: int, directory: str) -> None:
+    # pyplot plots the DataFrame the GUI used to build, the templates take the store directly
+    frames = [month(seed) if render is template_render else month(seed).expense_frame() for seed in range(BATCH)]
+    elapsed, objects = 0.0, []
+    for number in range(renders):
+        start = time.perf_counter()
+        render(frames[number % BATCH], os.path.join(directory, f'{name}.png'))
+        elapsed += time.perf_counter() - start
+        if (number + 1) % BATCH == 0:
+            gc.collect()
+            objects.append(len(gc.get_objects()))
+    print(f"{name:9} {elapsed / renders * 1000:7.1f} ms/render  "
+          f"live objects every {BATCH} renders: {' '.join(f'{count:,}' for count in objects)}")
+
+
+def main() -> None:
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as directory:
+        run('pyplot', pyplot_render, renders, directory)
+        plt.close('all')
+        run('templates', template_render, renders, directory)
+        expense_charts.release()
+
+
+if __name__ == '__main__':
+    main()
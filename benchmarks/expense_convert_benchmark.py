@@ -0,0 +1,114 @@
+"""
+Exports all six ExpenseGUI.convert formats for one synthetic 50k-row month, comparing the old
+per-branch read + per-element currency formatting against the current pipeline: spreadsheets
+streamed through expense_export, charts drawn from the month cached by expense_reports. Both sides
+draw the same simple charts, so the difference is the reading and formatting.
+
+Usage:
+    python benchmarks/expense_convert_benchmark.py [rows]
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import pandas as pd  # noqa: E402
+from numerize import numerize  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_db  # noqa: E402
+import expense_export  # noqa: E402
+import expense_reports  # noqa: E402
+
+CATEGORIES = ["Food", "Entertainment", "Business", "Shopping", "Misc"]
+YEAR, MONTH = 2024, 3
+
+
+def seed(rows: int) -> None:
+    random.seed(0)
+    connection = expense_db.get_connection()
+    cursor = connection.cursor()
+    deposit = rows * 100
+    cursor.execute("INSERT INTO Transactions (Date, Category, Amount, Available, Total) VALUES (?, ?, ?, ?, ?)",
+                   ('2024-03-01', 'MONTHLY DEPOSIT!', deposit, deposit, deposit))
+    expense_db.record_deposit(cursor, expense_db.month_key(YEAR, MONTH), deposit)
+    days = sorted(random.randint(1, 31) for _ in range(rows))
+    cursor.executemany(
+        "INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) VALUES (?, ?, ?, ?, ?, ?)",
+        ((datetime.date(YEAR, MONTH, day).strftime('%Y-%m-%d'), random.choice(CATEGORIES), 'N/A',
+          random.randint(1, 99), deposit, deposit) for day in days))
+    connection.commit()
+
+
+def render(df: pd.DataFrame, path: str) -> None:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+    categorized = df.groupby('Category')['Amount'].sum()
+    ax1.bar(categorized.index, categorized.values)
+    ax2.plot(df['Day'], df['Available_overtime'])
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def old_path(directory: str) -> None:
+    connection = expense_db.get_connection()
+    query = "SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date"
+    for export in ['Excel', 'CSV', 'Pie Chart', 'Bar Graph', 'Line Chart', 'Histogram']:
+        df = pd.read_sql_query(query, connection, params=(f'{YEAR}-{MONTH:02d}',))
+        df['Date'] = pd.to_datetime(df['Date'])
+        if export in ('Excel', 'CSV'):
+            df['Total Spent'] = df['Amount'].iloc[1:].cumsum()
+            for column in ["Amount", "Available", "Total"]:
+                df[column] = df[column].apply(lambda x: '£' + numerize.numerize(int(x)))
+            df['Total Spent'] = df['Total Spent'].fillna(0)
+            df['Total Spent'] = df['Total Spent'].apply(lambda x: '£' + numerize.numerize(int(x)))
+            if export == 'Excel':
+                df.to_excel(os.path.join(directory, 'old.xlsx'), index=False, engine='openpyxl')
+            else:
+                df.to_csv(os.path.join(directory, 'old.csv'), index=False)
+        else:
+            df = df[df['Category'] != 'MONTHLY DEPOSIT!'].copy()
+            df['Cumulative_Amount'] = df['Amount'].cumsum()
+            df['Available_overtime'] = df['Total'] - df['Cumulative_Amount']
+            df['Day'] = df['Date'].dt.day
+            render(df, os.path.join(directory, f'old {export}.png'))
+
+
+def new_path(directory: str) -> None:
+    expense_reports.invalidate(YEAR, MONTH)
+    bounds = expense_db.month_bounds(YEAR, MONTH)
+    for export in ['Excel', 'CSV', 'Pie Chart', 'Bar Graph', 'Line Chart', 'Histogram']:
+        if export in ('Excel', 'CSV'):
+            file_format = 'xlsx' if export == 'Excel' else 'csv'
+            expense_export.export_range(file_format, os.path.join(directory, f'new.{file_format}'), *bounds)
+        else:
+            render(expense_reports.load_store(YEAR, MONTH).expense_frame(),
+                   os.path.join(directory, f'new {export}.png'))
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as directory:
+        expense_db.pool.database = os.path.join(directory, 'Expenses.db')
+        expense_db.create_database()
+        seed(rows)
+        results = {}
+        for name, path in [('old', old_path), ('new', new_path)]:
+            start = time.perf_counter()
+            path(directory)
+            results[name] = time.perf_counter() - start
+        expense_db.close()
+    print(f"{rows} rows, all six formats")
+    print(f"per-branch read + apply: {results['old']:8.2f} s")
+    print(f"streamed + cached:       {results['new']:8.2f} s")
+    print(f"speedup:                 {results['old'] / results['new']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Compares ops/sec of ExpenseGUI's old connect-per-call pattern against the pooled connection in sqlite_pool.
+
+Usage:
+    python benchmarks/expense_db_benchmark.py [operations]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_pool import ConnectionPool  # noqa: E402
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS Transactions (
+        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+        Date DATE NOT NULL,
+        Category TEXT NOT NULL,
+        Description TEXT,
+        Amount FLOAT NOT NULL,
+        Available FLOAT  NOT NULL,
+        Total FLOAT NOT NULL)
+'''
+SELECT = "SELECT Available, Total FROM Transactions WHERE strftime('%Y-%m', Date) = ? AND Category = ?"
+INSERT = "INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def seed(path: str) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute(SCHEMA)
+    connection.execute(INSERT, ('2024-01-01', 'MONTHLY DEPOSIT!', None, 1000, 1000, 1000))
+    connection.executemany(INSERT, [(f'2024-01-{day % 28 + 1:02d}', 'Food', 'N/A', 1, 999, 1000)
+                                    for day in range(500)])
+    connection.commit()
+    connection.close()
+
+
+def connect_per_call(path: str, operations: int) -> float:
+    start = time.perf_counter()
+    for index in range(operations):
+        connection = sqlite3.connect(path)
+        cursor = connection.cursor()
+        cursor.execute(SELECT, ('2024-01', 'MONTHLY DEPOSIT!'))
+        cursor.fetchone()
+        if index % 10 == 0:
+            cursor.execute(INSERT, ('2024-01-15', 'Food', 'N/A', 1, 999, 1000))
+            connection.commit()
+        connection.close()
+    return operations / (time.perf_counter() - start)
+
+
+def pooled(path: str, operations: int) -> float:
+    pool = ConnectionPool(path)
+    start = time.perf_counter()
+    for index in range(operations):
+        connection = pool.connect()
+        cursor = connection.cursor()
+        cursor.execute(SELECT, ('2024-01', 'MONTHLY DEPOSIT!'))
+        cursor.fetchone()
+        if index % 10 == 0:
+            cursor.execute(INSERT, ('2024-01-15', 'Food', 'N/A', 1, 999, 1000))
+            connection.commit()
+    elapsed = time.perf_counter() - start
+    pool.close_all()
+    return operations / elapsed
+
+
+def main() -> None:
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'Expenses.db')
+        seed(path)
+        per_call = connect_per_call(path, operations)
+        shared = pooled(path, operations)
+    print(f"connect-per-call: {per_call:10.0f} ops/sec")
+    print(f"pooled:           {shared:10.0f} ops/sec")
+    print(f"speedup:          {shared / per_call:10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Exports a synthetic multi-year ledger to CSV and xlsx, comparing the in-memory pandas export
+(read the whole range, format, to_csv/to_excel) with expense_export's chunked streaming writers.
+
+Reports wall time, rows/sec and peak traced Python memory for each.
+
+Usage:
+    python benchmarks/expense_export_benchmark.py [rows]
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_db  # noqa: E402
+import expense_export  # noqa: E402
+
+CATEGORIES = ["Food", "Entertainment", "Business", "Shopping", "Misc"]
+START, END = '2015-01-01', '2025-01-01'
+
+
+def seed(rows: int) -> None:
+    random.seed(0)
+    connection = expense_db.get_connection()
+    start = datetime.date(2015, 1, 1)
+    span = (datetime.date(2024, 12, 31) - start).days
+    days = sorted(random.randrange(span) for _ in range(rows))
+    connection.executemany(
+        "INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) VALUES (?, ?, ?, ?, ?, ?)",
+        (((start + datetime.timedelta(days=day)).strftime('%Y-%m-%d'), random.choice(CATEGORIES), 'N/A',
+          random.randint(1, 20000) / 100, 0, 0) for day in days))
+    for year in range(2015, 2025):
+        for month in range(1, 13):
+            expense_db.rebuild_month(connection.cursor(), year, month, 5000)
+    connection.commit()
+
+
+def in_memory(file_format: str, path: str) -> int:
+    frame = pd.read_sql_query(expense_export.RANGE_QUERY, expense_db.get_connection(), params=(START, END))  # NOQA
+    expenses = frame['Amount'].where(frame['Category'] != 'MONTHLY DEPOSIT!', 0)
+    frame['Total Spent'] = expenses.groupby(frame['Date'].str[:7]).cumsum()
+    for column in ["Amount", "Available", "Total", "Total Spent"]:
+        frame[column] = frame[column].astype('int64').map(expense_export.currency)
+    if file_format == 'xlsx':
+        frame.to_excel(path, index=False, engine='openpyxl')
+    else:
+        frame.to_csv(path, index=False)
+    return len(frame)
+
+
+def streaming(file_format: str, path: str) -> int:
+    return expense_export.export_range(file_format, path, START, END)
+
+
+def measure(function, file_format: str, path: str) -> tuple[int, float, float]:
+    start = time.perf_counter()
+    rows = function(file_format, path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(file_format, path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, elapsed, peak / 1024 / 1024
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        expense_db.use_database(os.path.join(directory, 'Expenses.db'))
+        expense_db.create_database()
+        seed(rows)
+        print(f"{rows} transactions, {START} to {END}")
+        for file_format in expense_export.FORMATS:
+            for name, function in [('in-memory', in_memory), ('streaming', streaming)]:
+                written, elapsed, peak = measure(function, file_format,
+                                                 os.path.join(directory, f'{name}.{file_format}'))
+                print(f"{file_format:5} {name:10} {elapsed:7.2f} s  {written / elapsed:10,.0f} rows/sec  "
+                      f"peak {peak:8.1f} MiB")
+        expense_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures expense_import throughput on a synthetic multi-year CSV statement, then imports the same
+statement again, which must skip every line as already imported.
+
+Usage:
+    python benchmarks/expense_import_benchmark.py [rows]
+"""
+import csv
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_db  # noqa: E402
+import expense_import  # noqa: E402
+
+MERCHANTS = ["TESCO STORES 2231", "AMAZON MARKETPLACE", "NETFLIX.COM", "HMRC SELF ASSESSMENT", "CORNER SHOP",
+             "DELIVEROO", "ODEON CINEMAS", "IKEA LTD", "GREGGS PLC", "TFL TRAVEL"]
+
+
+def write_statement(path: str, rows: int) -> None:
+    random.seed(0)
+    start = datetime.date(2015, 1, 1)
+    span = (datetime.date(2024, 12, 31) - start).days
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Date', 'Description', 'Amount'])
+        for day in sorted(random.randrange(span) for _ in range(rows)):
+            date = (start + datetime.timedelta(days=day)).strftime('%d/%m/%Y')
+            if random.random() < 0.01:
+                writer.writerow([date, 'SALARY', f'{random.randint(1500, 3000)}.00'])
+            else:
+                writer.writerow([date, random.choice(MERCHANTS), f'-{random.randint(1, 20000) / 100:.2f}'])
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        statement = os.path.join(directory, 'statement.csv')
+        write_statement(statement, rows)
+        expense_db.use_database(os.path.join(directory, 'Expenses.db'))
+        expense_db.create_database()
+        connection = expense_db.get_connection()
+
+        for name in ('import', 're-import'):
+            start = time.perf_counter()
+            result = expense_import.import_lines(connection,
+                                                 expense_import.read_csv(statement, date_format='%d/%m/%Y'),
+                                                 expense_import.CATEGORY_KEYWORDS)
+            elapsed = time.perf_counter() - start
+            print(f"{name:9} {rows} rows ({result['expenses']} expenses, {result['deposits']} deposits, "
+                  f"{result['skipped']} skipped, {result['months']} months) in {elapsed:.2f} s: "
+                  f"{rows / elapsed:,.0f} rows/sec")
+
+            deposited, available, spent = expense_db.get_balance(connection.cursor(), '2020-06')
+            assert abs(deposited - spent - available) < 1e-6
+        assert result['skipped'] == rows and result['months'] == 0
+        expense_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares month/year lookups on a synthetic Transactions table using the old strftime() filters
+against the indexed Date range predicates ExpenseGUI uses now.
+
+Usage:
+    python benchmarks/expense_index_benchmark.py [rows]
+"""
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_db  # noqa: E402
+
+CATEGORIES = ["Food", "Entertainment", "Business", "Shopping", "Misc"]
+QUERIES = {
+    'month': ("SELECT * FROM Transactions WHERE strftime('%Y-%m', Date) = ? ORDER BY Date",
+              "SELECT * FROM Transactions WHERE Date >= ? AND Date < ? ORDER BY Date"),
+    'deposit': ("SELECT Available, Total FROM Transactions WHERE strftime('%Y-%m', Date) = ? AND Category = ?",
+                "SELECT Available, Total FROM Transactions WHERE Date >= ? AND Date < ? AND Category = ?"),
+    'year': ("SELECT * FROM Transactions WHERE strftime('%Y', Date) = ? ORDER BY Date",
+             "SELECT * FROM Transactions WHERE Date >= ? AND Date < ? ORDER BY Date"),
+}
+
+
+def seed(connection: sqlite3.Connection, rows: int) -> None:
+    random.seed(0)
+    start = datetime.date(2000, 1, 1)
+    span = (datetime.date(2024, 12, 31) - start).days
+    days = sorted(random.randrange(span) for _ in range(rows))
+    connection.executemany(
+        "INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) VALUES (?, ?, ?, ?, ?, ?)",
+        (((start + datetime.timedelta(days=day)).strftime('%Y-%m-%d'), random.choice(CATEGORIES), 'N/A',
+          random.randint(1, 100), 1000, 1000) for day in days))
+    connection.commit()
+
+
+def timed(connection: sqlite3.Connection, query: str, params_list: list[tuple]) -> float:
+    start = time.perf_counter()
+    for params in params_list:
+        connection.execute(query, params).fetchall()
+    return (time.perf_counter() - start) / len(params_list) * 1000
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    months = [(random.Random(month).randint(2000, 2024), month % 12 + 1) for month in range(20)]
+    with tempfile.TemporaryDirectory() as directory:
+        expense_db.pool.database = os.path.join(directory, 'Expenses.db')
+        expense_db.create_database()
+        connection = expense_db.get_connection()
+        seed(connection, rows)
+        connection.execute("ANALYZE")
+
+        cases = {
+            'month': ([(f'{year}-{month:02d}',) for year, month in months],
+                      [expense_db.month_bounds(year, month) for year, month in months]),
+            'deposit': ([(f'{year}-{month:02d}', 'MONTHLY DEPOSIT!') for year, month in months],
+                        [(*expense_db.month_bounds(year, month), 'MONTHLY DEPOSIT!') for year, month in months]),
+            'year': ([(str(year),) for year, _ in months[:5]],
+                     [expense_db.year_bounds(year) for year, _ in months[:5]]),
+        }
+        print(f"{rows} rows")
+        for name, (old_params, new_params) in cases.items():
+            old_query, new_query = QUERIES[name]
+            old = timed(connection, old_query, old_params)
+            new = timed(connection, new_query, new_params)
+            print(f"{name:8} strftime: {old:9.2f} ms   range: {new:9.2f} ms   speedup: {old / new:7.1f}x")
+        expense_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Audits a password vault of many entries with password_policy.audit() and reports how long
+decrypting the entries and scoring them take, next to scoring one password at a time in Python.
+
+Also reports how fast each PasswordPolicy mode generates passwords.
+
+Usage:
+    python benchmarks/password_audit_benchmark.py [entries]
+"""
+import math
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_db  # noqa: E402
+import password_policy  # noqa: E402
+from password_policy import PasswordPolicy  # noqa: E402
+
+MASTER = 'correct horse battery staple'
+WORDS = ['summer', 'dragon', 'monkey', 'shadow', 'hunter', 'falcon', 'winter', 'coffee']
+
+
+def weak_or_strong(number: int) -> str:
+    """A mix like a real vault: random passwords, word plus digits, keyboard runs and reused ones"""
+    kind = number % 5
+    if kind == 0:
+        return random.choice(WORDS).capitalize() + str(random.randrange(100))
+    if kind == 1:
+        return 'qwerty' + str(number % 50)
+    return ''.join(random.choices(string.ascii_letters + string.digits + string.punctuation, k=random.randint(8, 20)))
+
+
+def python_entropy(password: str) -> float:
+    """The same estimate as password_policy.entropy(), a character at a time"""
+    pool = sum(size for characters, size in [(string.ascii_lowercase, 26), (string.ascii_uppercase, 26),
+                                             (string.digits, 10), (string.punctuation + ' ', 33)]
+               if any(character in characters for character in password))
+    pool += 100 if any(ord(character) > 127 or not character.isprintable() for character in password) else 0
+    predictable = sum(1 for first, second in zip(password, password[1:]) if abs(ord(second) - ord(first)) <= 1)
+    return (len(password) - predictable) * math.log2(max(pool, 1)) + predictable
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        password_db.LEGACY_MASTER = os.path.join(directory, 'master.txt')
+        password_db.use_database(os.path.join(directory, 'Passwords.db'))
+        password_db.create_database()
+        password_db.unlock(MASTER, create=True)
+        connection = password_db.get_connection()
+        with connection:
+            connection.executemany("INSERT INTO manager VALUES(?, ?, ?)",
+                                   ((f'User{number}', 'Gmail',
+                                     password_db.vault.encrypt(f'User{number}', 'Gmail', weak_or_strong(number)))
+                                    for number in range(entries)))
+
+        start = time.perf_counter()
+        rows = password_db.entries()
+        decrypted = time.perf_counter() - start
+        start = time.perf_counter()
+        findings = password_policy.audit(rows)
+        audited = time.perf_counter() - start
+        print(f"decrypt {len(rows):,} entries {decrypted * 1000:8.1f} ms")
+        print(f"audit                  {audited * 1000:8.1f} ms, {len(findings):,} flagged")
+        print(f"total                  {(decrypted + audited) * 1000:8.1f} ms")
+
+        passwords = [password for _, _, password in rows]
+        start = time.perf_counter()
+        estimates = [python_entropy(password) for password in passwords]
+        looped = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorized = password_policy.entropy(passwords)
+        scored = time.perf_counter() - start
+        same = all(math.isclose(a, b) for a, b in zip(estimates, vectorized))
+        print(f"entropy per password in Python {looped * 1000:8.1f} ms, vectorized {scored * 1000:6.1f} ms "
+              f"({looped / scored:.0f}x, {'same' if same else 'DIFFERENT'} estimates)")
+        password_db.close()
+
+    for policy in [PasswordPolicy(), PasswordPolicy(length=10, min_digits=4, exclude_ambiguous=True),
+                   PasswordPolicy(mode='pronounceable'), PasswordPolicy(mode='passphrase')]:
+        count = 50_000
+        start = time.perf_counter()
+        for _ in policy.generate(count):
+            pass
+        rate = count / (time.perf_counter() - start)
+        print(f"{policy.mode:13} length {policy.length:2} {policy.entropy():6.1f} bits {rate:>12,.0f} passwords/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares generator(), one SystemRandom call per character, with generate_batch(), which draws
+bulk bytes from os.urandom and maps them with rejection sampling, in passwords per second.
+
+Also checks the batch output stays uniform: every character of the alphabet should show up
+about equally often.
+
+Usage:
+    python benchmarks/password_generator_benchmark.py [passwords] [length]
+"""
+import collections
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Passwordgenerator import alphabet, generate_batch, generator  # noqa: E402
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    single = max(count // 20, 1)
+    start = time.perf_counter()
+    for _ in range(single):
+        generator(length)
+    per_call = single / (time.perf_counter() - start)
+    print(f"generator()      {per_call:>12,.0f} passwords/s ({single:,} passwords of {length})")
+
+    start = time.perf_counter()
+    for _ in generate_batch(count, length):
+        pass
+    batch = count / (time.perf_counter() - start)
+    print(f"generate_batch() {batch:>12,.0f} passwords/s ({count:,} passwords of {length}), "
+          f"{batch / per_call:.0f}x")
+
+    counts: collections.Counter = collections.Counter()
+    for passwords in generate_batch(count // 10, length):
+        counts.update(''.join(passwords))
+    characters = alphabet()
+    expected = sum(counts.values()) / len(characters)
+    spread = max(abs(counts[character] - expected) / expected for character in characters)
+    print(f"character frequencies within {spread:.2%} of uniform over {sum(counts.values()):,} characters")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures PasswordmanGUI's search-as-you-type: building the username/account index at unlock and
+answering every keystroke of a few typed queries (typos included), next to a LIKE '%query%' scan
+of the manager table for the same keystrokes.
+
+Usage:
+    python benchmarks/password_search_benchmark.py [entries]
+"""
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_search import EntryIndex  # noqa: E402
+
+NAMES = ["james", "mary", "john", "patricia", "robert", "jennifer", "michael", "linda", "william", "elizabeth",
+         "david", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah", "charles", "karen"]
+ACCOUNTS = ["Facebook", "X", "Instagram", "Gmail", "LinkedIn", "Github", "Hotmail", "University", "Netflix",
+            "Amazon", "Spotify", "Reddit"]
+QUERIES = ["james_k", "elizabteh", "gmial", "linkdin", "hotmail", "univesity", "rob.x1", "zzqx", "mail", "sarah"]
+
+
+def synthetic(entries: int) -> list[tuple[str, str]]:
+    random.seed(0)
+    keys = set()
+    while len(keys) < entries:
+        username = (random.choice(NAMES) + random.choice(["", ".", "_"]) +
+                    ''.join(random.choices(string.ascii_lowercase + string.digits, k=random.randint(2, 6))))
+        account = (random.choice(ACCOUNTS) if random.random() < 0.8 else
+                   ''.join(random.choices(string.ascii_lowercase, k=random.randint(4, 10))))
+        keys.add((username.capitalize(), account.capitalize()))
+    return sorted(keys)
+
+
+def keystrokes(search, repeat: int = 5) -> list[float]:
+    """Microseconds per call for every prefix of every query, best of repeat"""
+    samples = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                search(query[:end])
+                best = min(best, time.perf_counter() - start)
+            samples.append(best * 1_000_000)
+    return samples
+
+
+def report(name: str, samples: list[float]) -> None:
+    p99 = statistics.quantiles(samples, n=100, method='inclusive')[98]
+    print(f"{name:24} p50: {statistics.median(samples):9.1f} us   p99: {p99:9.1f} us   max: {max(samples):9.1f} us")
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    keys = synthetic(entries)
+    start = time.perf_counter()
+    index = EntryIndex(keys)
+    print(f"{entries} entries, index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+    report('trigram index', keystrokes(index.search))
+
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE manager (USERNAME TEXT NOT NULL, ACCOUNT TEXT NOT NULL, PASSWORD TEXT NOT NULL)")
+    connection.executemany("INSERT INTO manager VALUES(?, ?, '')", keys)
+    report("LIKE '%query%' scan", keystrokes(
+        lambda query: connection.execute("SELECT USERNAME, ACCOUNT FROM manager WHERE USERNAME LIKE ? OR ACCOUNT LIKE ? "
+                                         "LIMIT 20", (f'%{query}%', f'%{query}%')).fetchall(), repeat=1))
+
+    print("\nfirst matches:")
+    for query in QUERIES:
+        print(f"    {query:12} {index.search(query, 3)}")
+
+
+if __name__ == '__main__':
+    main()
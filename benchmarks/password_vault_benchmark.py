@@ -0,0 +1,67 @@
+"""
+Measures what the encrypted vault costs PasswordmanGUI: the scrypt unlock at a few cost settings,
+and a bulk view of every entry with the session key cached, next to what deriving the key again
+for every row would have cost.
+
+Usage:
+    python benchmarks/password_vault_benchmark.py [entries]
+"""
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_db  # noqa: E402
+from password_vault import Vault  # noqa: E402
+
+MASTER = 'correct horse battery staple'
+COSTS = [2 ** 14, 2 ** 15, 2 ** 16]
+
+
+def unlock_time(n: int) -> float:
+    salt = os.urandom(16)
+    start = time.perf_counter()
+    Vault.derive_key(MASTER, salt, n, 8, 1)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for n in COSTS:
+        print(f"unlock, scrypt n=2**{n.bit_length() - 1:<3} r=8 p=1 {unlock_time(n):9.1f} ms")
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        password_db.LEGACY_MASTER = os.path.join(directory, 'master.txt')
+        password_db.use_database(os.path.join(directory, 'Passwords.db'))
+        password_db.create_database()
+        start = time.perf_counter()
+        password_db.unlock(MASTER, create=True)
+        unlock = time.perf_counter() - start
+        connection = password_db.get_connection()
+        with connection:
+            connection.executemany("INSERT INTO manager VALUES(?, ?, ?)",
+                                   ((f'User{number}', f'Account{number}',
+                                     password_db.vault.encrypt(f'User{number}', f'Account{number}',
+                                                               ''.join(random.choices(string.ascii_letters, k=16))))
+                                    for number in range(entries)))
+
+        start = time.perf_counter()
+        rows = password_db.entries()
+        view = time.perf_counter() - start
+        print(f"view of {len(rows)} entries, cached key {view * 1000:9.1f} ms "
+              f"({len(rows) / view:,.0f} entries/s)")
+        print(f"same view deriving the key per row  {unlock * len(rows):9.1f} s (estimated from one unlock)")
+
+        start = time.perf_counter()
+        password_db.unlock(MASTER)
+        print(f"re-entering the master password     {(time.perf_counter() - start) * 1_000_000:9.1f} us")
+        password_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Compares PasswordmanGUI's entry lookups the old way, a new sqlite3 connection per call scanning an
+unindexed manager table of plain text passwords, against password_db.find: the pooled connection,
+the unique (USERNAME, ACCOUNT) index and decrypting the entry through the unlocked vault.
+
+Usage:
+    python benchmarks/passwordman_lookup_benchmark.py [entries] [lookups]
+"""
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_db  # noqa: E402
+
+LOOKUP_QUERY = "SELECT USERNAME, ACCOUNT, PASSWORD FROM manager WHERE USERNAME=? AND ACCOUNT=?"
+MASTER = 'correct horse battery staple'
+
+
+def make_entries(entries: int) -> list[tuple[str, str, str]]:
+    random.seed(0)
+    usernames = [''.join(random.choices(string.ascii_lowercase, k=8)).capitalize() for _ in range(entries // 20)]
+    keys = {(random.choice(usernames), f'Account{number}') for number in range(entries)}
+    return [(username, account, ''.join(random.choices(string.ascii_letters, k=16)))
+            for username, account in sorted(keys)]
+
+
+def old_lookup(database: str, username: str, account: str) -> tuple | None:
+    connection = sqlite3.connect(database)
+    try:
+        return connection.execute(LOOKUP_QUERY, (username, account)).fetchone()
+    finally:
+        connection.close()
+
+
+def timed(lookup, keys: list[tuple[str, str]]) -> list[float]:
+    samples = []
+    for username, account in keys:
+        start = time.perf_counter()
+        lookup(username, account)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def report(name: str, samples: list[float]) -> float:
+    p50 = statistics.median(samples)
+    p99 = statistics.quantiles(samples, n=100)[98]
+    print(f"{name:30} p50: {p50:9.1f} us   p99: {p99:9.1f} us")
+    return p50
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as directory:
+        old_database = os.path.join(directory, 'Passwords_old.db')
+        password_db.use_database(old_database)
+        password_db.create_database()
+        # The old vault has no index, drop the one create_database() just migrated in
+        connection = password_db.get_connection()
+        connection.execute("DROP INDEX idx_manager_username_account")
+        rows = make_entries(entries)
+        with connection:
+            connection.executemany("INSERT INTO manager VALUES(?, ?, ?)", rows)
+        password_db.close()
+
+        # Entries go in encrypted through the vault, the way PasswordmanGUI adds them
+        password_db.LEGACY_MASTER = os.path.join(directory, 'master.txt')
+        password_db.use_database(os.path.join(directory, 'Passwords.db'))
+        password_db.create_database()
+        password_db.unlock(MASTER, create=True)
+        for row in rows:
+            password_db.add_entry(*row)
+
+        keys = [(username, account) for username, account, _ in rows]
+
+        sample = random.Random(1).choices(keys, k=lookups)
+        print(f"{len(keys)} entries, {lookups} lookups")
+        old = report('connect per call, full scan', timed(lambda *key: old_lookup(old_database, *key), sample))
+        new = report('pooled, index, decrypted', timed(password_db.find, sample))
+        print(f"speedup: {old / new:.1f}x")
+        password_db.close()
+
+
+if __name__ == '__main__':
+    main()
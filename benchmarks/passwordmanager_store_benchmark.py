@@ -0,0 +1,82 @@
+"""
+Compares Passwordmanager.py's old Passwords.txt storage, where exists and search scan every line
+and remove rewrites the file through temp.txt, with the indexed passwordmanager_db table.
+
+Also times migrating the text file into the database.
+
+Usage:
+    python benchmarks/passwordmanager_store_benchmark.py [entries] [lookups]
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import passwordmanager_db  # noqa: E402
+
+
+def text_exists(path: str, account: str) -> bool:
+    with open(path, 'r') as file:
+        return any(line.startswith(f"Account: {account},") for line in file)
+
+
+def text_remove(path: str, account: str) -> None:
+    temp = f'{path}.tmp'
+    with open(path, 'r') as file, open(temp, 'w') as out:
+        for line in file:
+            if not line.startswith(f"Account: {account},"):
+                out.write(line)
+    os.replace(temp, path)
+
+
+def timed(function, accounts: list[str]) -> tuple[float, float]:
+    """Returns the p50 and max of function(account) over the accounts, in microseconds"""
+    times = []
+    for account in accounts:
+        start = time.perf_counter()
+        function(account)
+        times.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(times), max(times)
+
+
+def report(name: str, text: tuple[float, float], db: tuple[float, float]) -> None:
+    print(f"{name:7} text file p50 {text[0]:10.1f} us max {text[1]:10.1f} us   "
+          f"database p50 {db[0]:7.1f} us max {db[1]:7.1f} us   {text[0] / db[0]:8.0f}x")
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        text = os.path.join(directory, 'Passwords.txt')
+        accounts = [f'Account{number}' for number in range(entries)]
+        with open(text, 'w') as file:
+            for account in accounts:
+                password = ''.join(random.choices(string.ascii_letters, k=16))
+                file.write(f"Account: {account}, Username: user{random.randrange(1000)}, Password: {password}\n")
+        with open(text, 'r') as file, open(os.path.join(directory, 'copy.txt'), 'w') as copy:
+            copy.write(file.read())
+
+        passwordmanager_db.use_database(os.path.join(directory, 'Passwordmanager.db'))
+        start = time.perf_counter()
+        passwordmanager_db.create_database(os.path.join(directory, 'copy.txt'))
+        print(f"migrated {entries} entries from the text file in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        sample = random.sample(accounts, lookups)
+        report('exists', timed(lambda account: text_exists(text, account), sample),
+               timed(passwordmanager_db.exists, sample))
+        report('search', timed(lambda account: text_exists(text, account), sample),
+               timed(passwordmanager_db.find, sample))
+        report('remove', timed(lambda account: text_remove(text, account), sample),
+               timed(passwordmanager_db.remove, sample))
+        passwordmanager_db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Measures the cold-start import time of the GUI apps with python -X importtime, which is what
+the user waits through before the window can appear.
+
+Each module is imported in a fresh interpreter several times, the median total is reported
+along with the heaviest imports of the last run (cumulative time, including their own imports),
+so a dependency creeping back into startup shows up by name.
+
+Usage:
+    python benchmarks/startup_benchmark.py [runs] [modules...]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['ExpenseGUI', 'PasswordmanGUI', 'WeatherGUI']
+HEAVIEST = 8
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Imports module (nothing if empty) in a new interpreter, returning every import's cumulative microseconds"""
+    command = f'import {module}' if module else 'pass'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', command], cwd=ROOT,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module that triggered them
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    modules = sys.argv[2:] or MODULES
+    # site and whatever its .pth files pull in load before any app code, leave them out of the breakdown
+    interpreter = set(import_times(''))
+    for module in modules:
+        try:
+            samples = [import_times(module) for _ in range(runs)]
+        except RuntimeError as error:
+            print(f"{module:15} could not be imported: {error}")
+            continue
+        total = statistics.median(sample[module] for sample in samples)
+        print(f"{module:15} {total / 1000:8.1f} ms median of {runs} cold imports")
+        heaviest = sorted((cumulative, name) for name, cumulative in samples[-1].items()
+                          if name != module and name not in interpreter)
+        for cumulative, name in heaviest[-HEAVIEST:][::-1]:
+            print(f"    {name:40} {cumulative / 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
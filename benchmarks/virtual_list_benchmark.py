@@ -0,0 +1,82 @@
+"""
+Compares showing a large ledger the way ExpenseGUI.view used to, one ScrolledText insert per
+row, with tk_virtual_list.VirtualList, which only formats and renders the rows in view.
+
+Reports the time until the list is shown, the time to scroll through it a page at a time and
+the size of the Tk text buffer afterwards. Needs a display.
+
+Usage:
+    python benchmarks/virtual_list_benchmark.py [rows]
+"""
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expense_analytics import ExpenseStore  # noqa: E402
+from tk_virtual_list import VirtualList  # noqa: E402
+
+CATEGORIES = ["Food", "Entertainment", "Business", "Shopping", "Misc"]
+PAGES = 200
+
+
+def ledger(rows: int) -> ExpenseStore:
+    generator = np.random.default_rng(0)
+    return ExpenseStore(np.datetime64('2024-03-01') + np.sort(generator.integers(0, 31, rows)),
+                        generator.choice(CATEGORIES, rows), np.full(rows, None),
+                        generator.integers(1, 100, rows).astype(float), {'2024-03': 20000})
+
+
+def formatted(store: ExpenseStore, start: int = 0, stop: int | None = None) -> list[str]:
+    return [f"{index}\t{date_str}\t\t{category}\t\t\t\t£ {amount}"
+            for index, (date_str, category, amount) in enumerate(store.rows(start, stop), start=start + 1)]
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    store = ledger(rows)
+    try:
+        window = tk.Tk()
+    except tk.TclError as error:
+        print(f"Tk is not available: {error}")
+        return
+
+    text = scrolledtext.ScrolledText(window, wrap=tk.WORD, width=80, height=20)
+    text.pack()
+    start = time.perf_counter()
+    for line in formatted(store):
+        text.insert(tk.END, line + "\n")
+    window.update()
+    shown = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(PAGES):
+        text.yview_scroll(1, 'pages')
+        window.update()
+    scrolled = time.perf_counter() - start
+    print(f"ScrolledText  shown in {shown * 1000:9.1f} ms   {PAGES} pages scrolled in {scrolled * 1000:8.1f} ms   "
+          f"buffer: {len(text.get('1.0', tk.END)):>10,} chars")
+    text.destroy()
+
+    virtual = VirtualList(window, width=80, height=20)
+    virtual.pack()
+    start = time.perf_counter()
+    virtual.set_source(rows, lambda first, stop: formatted(store, first, stop))
+    window.update()
+    shown = time.perf_counter() - start
+    start = time.perf_counter()
+    for page in range(1, PAGES + 1):
+        virtual.scroll_to(virtual.visible_rows * page)
+        window.update()
+    scrolled = time.perf_counter() - start
+    print(f"VirtualList   shown in {shown * 1000:9.1f} ms   {PAGES} pages scrolled in {scrolled * 1000:8.1f} ms   "
+          f"buffer: {len(virtual.text.get('1.0', tk.END)):>10,} chars")
+    window.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Looks up the current weather and forecast of a set of cities through WeatherClient against a local
+stub of the OpenWeather API, which answers after a fixed delay and counts the requests it gets.
+
+Runs the lookups cold, warm, with the current weather stale (served at once, refreshed in the
+background), past the stale window, from a new client on the same Weather.db, and with the stub
+server down, reporting the time and the requests made for each.
+
+Usage:
+    python benchmarks/weather_cache_benchmark.py [cities] [latency_ms]
+"""
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_client import HOUR, MINUTE, RateLimiter, WeatherClient  # noqa: E402
+
+
+class StubOpenWeather(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse their connections, without Nagle holding back the body
+    # written after the headers
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0.05
+    requests: collections.Counter = collections.Counter()
+    connections = 0
+
+    def setup(self) -> None:
+        super().setup()
+        StubOpenWeather.connections += 1
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlparse(self.path)
+        query = {name: values[0] for name, values in urllib.parse.parse_qs(url.query).items()}
+        StubOpenWeather.requests[url.path.rsplit('/', 1)[0] if url.path.endswith('.png') else url.path] += 1
+        time.sleep(self.latency)
+        if url.path == '/geo/1.0/direct':
+            name = query['q']
+            seed = zlib.crc32(name.encode())
+            body = [] if name == 'Nowhere' else [{'name': name, 'lat': seed % 9000 / 100, 'lon': seed % 18000 / 100}]
+        elif url.path == '/data/2.5/weather':
+            body = {'weather': [{'description': 'clear sky', 'icon': '01d'}],
+                    'main': {'temp': 290.0, 'humidity': 40, 'feels_like': 289.0}}
+        elif url.path == '/data/2.5/forecast':
+            now = int(time.time())
+            body = {'list': [{'dt': now + step * 3 * 3600, 'main': {'temp_min': 285.0, 'temp_max': 295.0},
+                              'weather': [{'description': 'few clouds'}]} for step in range(int(query['cnt']))]}
+        elif url.path.startswith('/img/wn/'):
+            self._reply(b'\x89PNG stub icon', 'image/png')
+            return
+        else:
+            self.send_error(404)
+            return
+        self._reply(json.dumps(body).encode(), 'application/json')
+
+    def _reply(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# Measures the cache alone, the real rate limit would hold up the later rounds
+UNLIMITED = RateLimiter(1_000_000, 1)
+
+
+class Clock:
+    """A clock the benchmark moves forward by hand"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def lookups(client: WeatherClient, cities: list[str], name: str) -> None:
+    before, start = sum(StubOpenWeather.requests.values()), time.perf_counter()
+    for city in cities:
+        results = client.current(city)
+        client.icon(results['weather'][0]['icon'])
+        client.forecast(city)
+    elapsed = time.perf_counter() - start
+    print(f"{name:34} {elapsed * 1000:9.1f} ms {sum(StubOpenWeather.requests.values()) - before:4} requests   "
+          f"hits {client.hits:4} stale {client.stale_hits:4} misses {client.misses:4}")
+    client.hits = client.stale_hits = client.misses = 0
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    StubOpenWeather.latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    cities = [f'City{number}' for number in range(count)]
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenWeather)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    with tempfile.TemporaryDirectory() as directory:
+        database, clock = os.path.join(directory, 'Weather.db'), Clock()
+        client = WeatherClient('stub', base_url, f'{base_url}/img/wn', database, clock=clock,
+                               rate_limit=UNLIMITED)
+        print(f"{count} cities, current weather, icon and forecast each, {StubOpenWeather.latency * 1000:.0f} ms "
+              f"per request")
+        lookups(client, cities, "cold cache")
+        lookups(client, cities, "warm cache")
+        clock.now += 11 * MINUTE
+        lookups(client, cities, "weather stale, refreshed behind")
+        # Two refresh threads, so half this is enough for every refresh to land
+        time.sleep(StubOpenWeather.latency * count)
+        print(f"{'':34} {StubOpenWeather.requests['/data/2.5/weather']} weather requests in all, "
+              f"the second {count} in the background")
+        lookups(client, cities, "after the refresh")
+        clock.now += 8 * HOUR
+        lookups(client, cities, "weather and forecast expired")
+        print(f"{'':34} requests by path: {dict(StubOpenWeather.requests)}")
+        client.close()
+
+        client = WeatherClient('stub', base_url, f'{base_url}/img/wn', database, clock=clock,
+                               rate_limit=UNLIMITED)
+        lookups(client, cities, "new client, same Weather.db")
+        print(f"{'':34} unknown city: {client.coordinates('Nowhere')}, again: {client.coordinates('Nowhere')} "
+              f"({StubOpenWeather.requests['/geo/1.0/direct']} geocoding requests in all)")
+        server.shutdown()
+        server.server_close()
+        # Kept-alive connections outlive the server, drop them so requests really fail
+        client.session.close()
+        clock.now += 8 * HOUR
+        lookups(client, cities, "server down, expired")
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Fetches the dashboard of a list of cities from the stub OpenWeather server of
+weather_cache_benchmark, cold every time:
+
+- one city after another with a bare requests.get per call, like WeatherGUI used to,
+- one after another over a pooled Session,
+- side by side with weather_dashboard.fetch_cities,
+- side by side under a tight rate limit, which the request rate has to stay under.
+
+Reports the wall time, connections opened and the per-city latency of each.
+
+Usage:
+    python benchmarks/weather_dashboard_benchmark.py [cities] [latency_ms] [workers]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import weather_dashboard  # noqa: E402
+from weather_cache_benchmark import UNLIMITED, StubOpenWeather  # noqa: E402
+from weather_client import RateLimiter, WeatherClient  # noqa: E402
+
+
+class Unpooled:
+    """Stands in for a Session, opening a new connection for every request"""
+
+    @staticmethod
+    def get(url: str, **kwargs) -> requests.Response:
+        return requests.get(url, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+
+def run(name: str, base_url: str, cities: list[str], workers: int, session=None,
+        rate_limit: RateLimiter = UNLIMITED) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        client = WeatherClient('stub', base_url, f'{base_url}/img/wn', os.path.join(directory, 'Weather.db'),
+                               session=session, rate_limit=rate_limit)
+        requests_before, connections_before = sum(StubOpenWeather.requests.values()), StubOpenWeather.connections
+        start = time.perf_counter()
+        results = weather_dashboard.fetch_cities(client, cities, workers)
+        elapsed = time.perf_counter() - start
+        client.close()
+    sent = sum(StubOpenWeather.requests.values()) - requests_before
+    median, p95, slowest = weather_dashboard.latency_stats(results)
+    failed = sum(1 for *_, error in results if error)
+    print(f"{name:26} {elapsed:6.2f} s {sent:4} requests ({sent / elapsed:5.1f}/s) "
+          f"{StubOpenWeather.connections - connections_before:4} connections   per city p50 {median:6.0f} ms "
+          f"p95 {p95:6.0f} ms max {slowest:6.0f} ms" + (f"   {failed} failed" if failed else ''))
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    StubOpenWeather.latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else weather_dashboard.WORKERS
+    cities = [f'City{number}' for number in range(count)]
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenWeather)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    print(f"{count} cities, geocoding, current weather, forecast and icon each, "
+          f"{StubOpenWeather.latency * 1000:.0f} ms per request")
+
+    run("sequential, requests.get", base_url, cities, 1, session=Unpooled())
+    run("sequential, Session", base_url, cities, 1)
+    run(f"{workers} threads, Session", base_url, cities, workers)
+    calls = 20
+    run(f"{workers} threads, {calls} calls/s", base_url, cities, workers, rate_limit=RateLimiter(calls, 1))
+    print(f"(the limiter lets a burst of {calls} through first, which lifts the average above {calls}/s)")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+import collections
+import io
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+# The Google client libraries take a quarter of a second to import, so they are only loaded by
+# the functions that talk to Drive, on the uploader thread, instead of when the GUI starts
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials  # type: ignore
+
+SCOPES = ['https://www.googleapis.com/auth/drive']
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+CHUNK_SIZE = 1024 * 1024  # Resumable chunks must be a multiple of 256 KiB
+
+
+def load_credentials(token_file: str, credentials_file: str) -> 'Credentials':
+    """
+    Loads the saved Drive token, refreshing it or running the OAuth flow when needed.
+
+    Args:
+        token_file (str): Where the authorized user token is stored.
+        credentials_file (str): The OAuth client secrets used when no valid token exists.
+
+    Returns:
+        Credentials: Valid Drive credentials.
+    """
+    from google.auth.transport.requests import Request  # type: ignore
+    from google.oauth2.credentials import Credentials  # type: ignore
+    from google_auth_oauthlib.flow import InstalledAppFlow  # type: ignore
+
+    creds = None
+    if os.path.exists(token_file):
+        creds = Credentials.from_authorized_user_file(token_file, SCOPES)
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(credentials_file, SCOPES)
+            creds = flow.run_local_server(port=0)
+        with open(token_file, 'w') as token:
+            token.write(creds.to_json())
+    return creds
+
+
+def drive_service(creds, api_endpoint: str | None = None, ca_certs: str | None = None):
+    """
+    Builds a Drive v3 service.
+
+    Args:
+        creds: The credentials to authorize requests with.
+        api_endpoint (str | None, optional): Overrides https://www.googleapis.com, e.g. a local fake Drive server.
+        ca_certs (str | None, optional): CA bundle to verify the endpoint with instead of the default one,
+            e.g. a fake server's self-signed certificate. Uploads always go over https.
+    """
+    from googleapiclient.discovery import build  # type: ignore
+
+    client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+    if ca_certs is None:
+        return build('drive', 'v3', credentials=creds, client_options=client_options)
+    import google_auth_httplib2  # type: ignore
+    import httplib2  # type: ignore
+
+    http = httplib2.Http(ca_certs=ca_certs)
+    # Drive answers every chunk of a resumable upload but the last with 308 Resume Incomplete, which
+    # httplib2 would follow as a redirect; googleapiclient's own Http drops it the same way
+    http.redirect_codes = http.redirect_codes - {308}
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=http)
+    return build('drive', 'v3', http=http, client_options=client_options)
+
+
+def _quoted(value: str) -> str:
+    """Escapes a value for use inside a quoted Drive search term"""
+    return value.replace('\\', '\\\\').replace("'", "\\'")
+
+
+class DriveUploader:
+    """
+    Uploads files to Google Drive from a background thread.
+
+    The Drive service is built once and reused, folder and file ids are cached after the first
+    lookup, and files are sent as resumable chunked uploads with retries. Submitting a file
+    that is still waiting in the queue coalesces into the pending upload instead of sending it
+    twice. Completion callbacks are queued and run by dispatch_callbacks() on the caller's
+    thread, so a Tk window can poll them from its own event loop.
+
+    Args:
+        service_factory (Callable): Returns a Drive v3 service, called once on the upload thread.
+        local_root (str, optional): Directory relative filenames are resolved against. Default is the working directory.
+        chunk_size (int, optional): Bytes sent per resumable chunk. Default is 1 MiB.
+        retries (int, optional): Retries per chunk for transient errors. Default is 5.
+    """
+
+    def __init__(self, service_factory: Callable, local_root: str = '', chunk_size: int = CHUNK_SIZE,
+                 retries: int = 5):
+        self.service_factory = service_factory
+        self.local_root = local_root
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self._service = None
+        self._folder_ids: dict[str, str] = {}
+        self._file_ids: dict[tuple[str, str], str] = {}
+        self._pending: collections.OrderedDict[tuple[str, str], list[Callable]] = collections.OrderedDict()
+        self._completed: queue.Queue = queue.Queue()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def submit(self, folder_name: str, filename: str, callback: Callable | None = None) -> None:
+        """
+        Queues a file for upload into a Drive folder.
+
+        Args:
+            folder_name (str): The Drive folder to upload into, created if missing.
+            filename (str): The local file, relative to local_root.
+            callback (Callable | None, optional): Called as callback(file_id, error) once the upload finishes.
+        """
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError("Uploader has been stopped")
+            callbacks = self._pending.setdefault((folder_name, filename), [])
+            if callback is not None:
+                callbacks.append(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='drive-uploader', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        logging.info(f"Queued upload {filename} --> {folder_name}")
+
+    def dispatch_callbacks(self) -> None:
+        """Runs every queued completion callback on the calling thread"""
+        while True:
+            try:
+                callback, file_id, error = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            callback(file_id, error)
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stops accepting uploads and optionally waits for the queue to drain.
+
+        Callbacks of uploads finished during the wait stay queued for dispatch_callbacks().
+
+        Args:
+            wait (bool, optional): Block until queued uploads finish. Default is True.
+        """
+        with self._condition:
+            self._stopping = True
+            if not wait:
+                self._pending.clear()
+            self._condition.notify()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopping:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                (folder_name, filename), callbacks = self._pending.popitem(last=False)
+            file_id, error = None, None
+            try:
+                file_id = self._upload(folder_name, filename)
+                logging.info(f"Uploaded file to drive {filename} --> {folder_name} {file_id}")
+            except Exception as exc:  # Reported to the callbacks rather than killing the upload thread
+                error = exc
+                logging.info(f"An error occurred uploading {filename}: {error}")
+            for callback in callbacks:
+                self._completed.put((callback, file_id, error))
+
+    def _upload(self, folder_name: str, filename: str) -> str:
+        from googleapiclient.errors import HttpError  # type: ignore
+
+        if self._service is None:
+            self._service = self.service_factory()
+        try:
+            return self._send(folder_name, filename)
+        except HttpError as error:
+            if error.resp.status != 404:
+                raise
+            # A cached folder or file was removed from Drive, look everything up again once
+            self._folder_ids.clear()
+            self._file_ids.clear()
+            return self._send(folder_name, filename)
+
+    def _send(self, folder_name: str, filename: str) -> str:
+        from googleapiclient.errors import HttpError  # type: ignore
+        from googleapiclient.http import MediaFileUpload  # type: ignore
+
+        folder_id = self._folder_id(folder_name)
+        name = os.path.basename(filename)
+        file_id = self._file_id(folder_id, name)
+        media = MediaFileUpload(os.path.join(self.local_root, filename), chunksize=self.chunk_size, resumable=True)
+        if file_id:
+            request = self._service.files().update(fileId=file_id, media_body=media, fields='id')
+        else:
+            request = self._service.files().create(body={"name": name, "parents": [folder_id]}, media_body=media,
+                                                   fields='id')
+        response, failures = None, 0
+        while response is None:
+            # next_chunk's own retries resend the chunk's file slice after the failed attempt read it,
+            # so retry here: the next call asks Drive how much arrived and resumes from there
+            try:
+                _, response = request.next_chunk()
+                failures = 0
+            except (HttpError, OSError) as error:
+                status = error.resp.status if isinstance(error, HttpError) else None
+                if failures == self.retries or (status is not None and status != 429 and status < 500):
+                    raise
+                failures += 1
+                logging.info(f"Retrying {filename} upload after {error}")
+                time.sleep(random.random() * 2 ** failures)
+        self._file_ids[(folder_id, name)] = response['id']
+        return response['id']
+
+    def _folder_id(self, folder_name: str) -> str:
+        if folder_name not in self._folder_ids:
+            response = self._service.files().list(
+                q=f"name='{_quoted(folder_name)}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+                spaces='drive', fields='files(id)').execute(num_retries=self.retries)
+            if response['files']:
+                self._folder_ids[folder_name] = response['files'][0]['id']
+            else:
+                folder = self._service.files().create(body={"name": folder_name, "mimeType": FOLDER_MIME_TYPE},
+                                                      fields='id').execute(num_retries=self.retries)
+                self._folder_ids[folder_name] = folder['id']
+        return self._folder_ids[folder_name]
+
+    def _file_id(self, folder_id: str, name: str) -> str | None:
+        if (folder_id, name) not in self._file_ids:
+            response = self._service.files().list(
+                q=f"name='{_quoted(name)}' and '{folder_id}' in parents and trashed=false",
+                spaces='drive', fields='files(id)').execute(num_retries=self.retries)
+            if not response['files']:
+                return None
+            self._file_ids[(folder_id, name)] = response['files'][0]['id']
+        return self._file_ids[(folder_id, name)]
+
+
+class DriveFolder:
+    """
+    Reads, writes and deletes small files by name in one Drive folder, e.g. backup files.
+
+    Calls run on the caller's thread. The folder is created on first use if missing and folder and
+    file ids are cached, so rewriting a file costs one request.
+
+    Args:
+        service: A Drive v3 service, see drive_service().
+        folder_name (str): The folder holding the files.
+        retries (int, optional): Retries per request for transient errors. Default is 5.
+    """
+
+    def __init__(self, service, folder_name: str, retries: int = 5):
+        self.service = service
+        self.folder_name = folder_name
+        self.retries = retries
+        self._folder_id: str | None = None
+        self._file_ids: dict[str, str] = {}
+
+    def read(self, name: str) -> bytes | None:
+        """Returns a file's content, None if the folder has no such file"""
+        file_id = self._file_id(name)
+        if file_id is None:
+            return None
+        return self.service.files().get_media(fileId=file_id).execute(num_retries=self.retries)
+
+    def write(self, name: str, data: bytes) -> str:
+        """Creates or replaces a file, returning its id"""
+        from googleapiclient.http import MediaIoBaseUpload  # type: ignore
+
+        media = MediaIoBaseUpload(io.BytesIO(data), mimetype='application/octet-stream')
+        file_id = self._file_id(name)
+        if file_id:
+            request = self.service.files().update(fileId=file_id, media_body=media, fields='id')
+        else:
+            request = self.service.files().create(body={"name": name, "parents": [self._folder()]},
+                                                  media_body=media, fields='id')
+        self._file_ids[name] = request.execute(num_retries=self.retries)['id']
+        logging.info(f"Wrote {len(data)} bytes to drive {self.folder_name}/{name}")
+        return self._file_ids[name]
+
+    def delete(self, name: str) -> None:
+        """Deletes a file if it exists"""
+        file_id = self._file_id(name)
+        if file_id is not None:
+            self.service.files().delete(fileId=file_id).execute(num_retries=self.retries)
+            del self._file_ids[name]
+
+    def _folder(self) -> str:
+        if self._folder_id is None:
+            response = self.service.files().list(
+                q=f"name='{_quoted(self.folder_name)}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+                spaces='drive', fields='files(id)').execute(num_retries=self.retries)
+            if response['files']:
+                self._folder_id = response['files'][0]['id']
+            else:
+                self._folder_id = self.service.files().create(
+                    body={"name": self.folder_name, "mimeType": FOLDER_MIME_TYPE},
+                    fields='id').execute(num_retries=self.retries)['id']
+        return self._folder_id
+
+    def _file_id(self, name: str) -> str | None:
+        if name not in self._file_ids:
+            response = self.service.files().list(
+                q=f"name='{_quoted(name)}' and '{self._folder()}' in parents and trashed=false",
+                spaces='drive', fields='files(id)').execute(num_retries=self.retries)
+            if not response['files']:
+                return None
+            self._file_ids[name] = response['files'][0]['id']
+        return self._file_ids[name]
@@ -0,0 +1,177 @@
+import csv
+import datetime
+import sqlite3
+import sys
+import time
+
+import click
+from numerize import numerize
+
+import expense_db
+import expense_forecast
+import expense_ops
+import expense_reports
+
+REPORTS = [report for report in expense_reports.REPORT_FILES if report != 'Monthly']
+BATCH_OPERATIONS = ['deposit', 'deduct', 'delete']
+date_type = click.DateTime(formats=['%Y-%m-%d'])
+
+
+@click.group(name='expenses', help="Headless ExpenseGUI: record, view and export expenses without a display")
+@click.option('-d', '--database', default=expense_db.DATABASE, type=click.Path(dir_okay=False),
+              help='Expenses database to use')
+def expenses(database):
+    expense_db.use_database(database)
+    expense_db.create_database()
+
+
+@expenses.result_callback()
+def close(*args, **kwargs):
+    expense_db.close()
+    # convert and summary render in this process
+    charts = sys.modules.get('expense_charts')
+    if charts is not None:
+        charts.release()
+
+
+@expenses.command(name='deposit', help="Deposit AMOUNT for the month of DATE (YYYY-MM-DD)")
+@click.argument('date', type=date_type)
+@click.argument('amount', type=float)
+def deposit(date, amount):
+    try:
+        available, total = expense_ops.deposit(date.date(), amount)
+        click.echo(f"Deposited £{amount} for {date:%B %Y}, available £{available} of £{total}")
+    except (ValueError, sqlite3.Error) as error:
+        expense_db.get_connection().rollback()
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='deduct', help="Spend AMOUNT on CATEGORY on DATE (YYYY-MM-DD)")
+@click.argument('date', type=date_type)
+@click.argument('category')
+@click.argument('amount', type=float)
+@click.option('-m', '--description', default='', help='What the money was spent on')
+def deduct(date, category, amount, description):
+    try:
+        available = expense_ops.deduct(date.date(), category, amount, description)
+        click.echo(f"Deducted £{amount} for {category}, £{available} left for {date:%B %Y}")
+    except (ValueError, sqlite3.Error) as error:
+        expense_db.get_connection().rollback()
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='delete', help="Delete DATE's CATEGORY expenses, or the month's 'MONTHLY DEPOSIT!'")
+@click.argument('date', type=date_type)
+@click.argument('category')
+def delete(date, category):
+    try:
+        deleted = expense_ops.delete(date.date(), category)
+        click.echo(f"Deleted {deleted} transactions")
+    except (ValueError, sqlite3.Error) as error:
+        expense_db.get_connection().rollback()
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='view', help="List the transactions from DATE (YYYY-MM-DD) to the end of its month")
+@click.argument('date', type=date_type)
+def view(date):
+    try:
+        store, (deposited, available, _) = expense_ops.month_view(date.date())
+        if store.empty:
+            raise click.ClickException(f"No results found for the month of {date:%B %Y}")
+        click.echo("S.NO\tDATE\t\tCATEGORY\tSPENT")
+        for index, (date_str, category, amount) in enumerate(store.rows(), start=1):
+            click.echo(f"{index}\t{date_str}\t{category:<18}£ {amount}")
+        click.echo(f"\nTOTAL AVAILABLE: £{numerize.numerize(available)}\n"
+                   f"TOTAL SPENT: £{numerize.numerize(store.total_spent())}\n"
+                   f"TOTAL DEPOSITED: £{numerize.numerize(deposited)}")
+    except (sqlite3.Error, click.ClickException) as error:
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='convert', help="Export one month as REPORT (an Excel/CSV sheet or a chart)")
+@click.argument('report', type=click.Choice(REPORTS))
+@click.argument('month', type=click.DateTime(formats=['%Y-%m']))
+@click.option('-o', '--output', default='', type=click.Path(file_okay=False), help='Directory to write to')
+def convert(report, month, output):
+    try:
+        path = expense_reports.export_report(report, month.year, month.month, output)
+        if path is None:
+            raise click.ClickException(f"Check {month:%B %Y} data!")
+        click.echo(path)
+    except (OSError, sqlite3.Error, click.ClickException) as error:
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='summary', help="Draw the Monthly summary of PERIOD (YYYY-MM) or the Yearly one (YYYY)")
+@click.argument('period')
+@click.option('-o', '--output', default='', type=click.Path(file_okay=False), help='Directory to write to')
+def summary(period, output):
+    try:
+        if len(period) == 4 and period.isdigit():
+            path = expense_reports.export_yearly(int(period), directory=output)
+        else:
+            month = datetime.datetime.strptime(period, '%Y-%m')
+            path = expense_reports.export_report('Monthly', month.year, month.month, output)
+        if path is None:
+            raise click.ClickException(f"Check {period} data!")
+        click.echo(path)
+    except (ValueError, OSError, sqlite3.Error, click.ClickException) as error:
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='forecast', help="Project each category's spending and the Available left at the end "
+                                        "of MONTH (YYYY-MM, default this month)")
+@click.argument('month', required=False, type=click.DateTime(formats=['%Y-%m']))
+def forecast(month):
+    try:
+        month = month or datetime.datetime.today()
+        projection, (available, expected, projected) = expense_forecast.project_month(month.year, month.month)
+        if projection.empty:
+            raise click.ClickException("No spending history to forecast from")
+        click.echo("CATEGORY\t\tSPENT\tFORECAST\tPROJECTED")
+        for category, (spent, forecast_amount, projected_amount) in projection.iterrows():
+            click.echo(f"{category:<16}£{spent:,.2f}\t£{forecast_amount:,.2f}\t£{projected_amount:,.2f}")
+        click.echo(f"\nAVAILABLE NOW: £{available:,.2f}\nSTILL EXPECTED: £{expected:,.2f}\n"
+                   f"PROJECTED AVAILABLE AT {month:%B %Y}'S END: £{projected:,.2f}")
+    except (sqlite3.Error, click.ClickException) as error:
+        click.echo(f"An error occurred: {error}")
+
+
+@expenses.command(name='batch', help="Run deposit/deduct/delete rows from a CSV FILE ('-' for stdin) "
+                                     "as one transaction: operation,date,category,amount,description")
+@click.argument('file', type=click.File('r', encoding='utf-8'))
+def batch(file):
+    connection = expense_db.get_connection()
+    applied, refused, started = 0, 0, time.perf_counter()
+    try:
+        for line, row in enumerate(csv.reader(file), start=1):
+            if not row:
+                continue
+            operation, date, category, amount, description = (row + [''] * 5)[:5]
+            try:
+                date = datetime.date.fromisoformat(date)
+                if operation == 'deposit':
+                    expense_ops.deposit(date, float(amount), commit=False)
+                elif operation == 'deduct':
+                    expense_ops.deduct(date, category, float(amount), description, commit=False)
+                elif operation == 'delete':
+                    expense_ops.delete(date, category, commit=False)
+                else:
+                    raise expense_ops.ExpenseError(f"Unknown operation {operation!r}, "
+                                                   f"choose from {','.join(BATCH_OPERATIONS)}")
+                applied += 1
+            except ValueError as error:
+                refused += 1
+                click.echo(f"Line {line}: {error}", err=True)
+        connection.commit()
+        elapsed = time.perf_counter() - started
+        click.echo(f"Applied {applied} operations, refused {refused} "
+                   f"({applied / max(elapsed, 1e-9):,.0f} operations/sec)")
+    except sqlite3.Error as error:
+        connection.rollback()
+        click.echo(f"An error occurred: {error}")
+
+
+if __name__ == '__main__':
+    expenses()
@@ -0,0 +1,182 @@
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+import expense_db
+
+DEPOSIT = 'MONTHLY DEPOSIT!'
+RANGE_QUERY = "SELECT Date, Category, Description, Amount FROM Transactions WHERE Date >= ? AND Date < ? ORDER BY Date, Id"
+LEDGER_QUERY = "SELECT Month, Deposited FROM MonthlyBalances WHERE Month >= ? AND Month <= ?"
+
+
+class ExpenseStore:
+    """
+    A date range of Expenses.db held as NumPy columns, queried with vectorized operations.
+
+    Rows are kept in date order. Categories and descriptions are factorized into integer
+    codes, so grouping is a np.bincount over codes instead of a hash lookup per row, and the
+    per-month running balance is a cumulative sum offset at each month boundary. Deposits stay
+    in the store (for view) but every spending query only looks at expenses.
+
+    Args:
+        dates (np.ndarray): datetime64[D] date of every transaction, in ascending order.
+        categories (np.ndarray): Category of every transaction.
+        descriptions (np.ndarray): Description of every transaction, None where missing.
+        amounts (np.ndarray): Amount of every transaction.
+        deposited (dict[str, float], optional): Amount deposited per 'YYYY-MM' month, from the ledger.
+    """
+
+    def __init__(self, dates: np.ndarray, categories: np.ndarray, descriptions: np.ndarray, amounts: np.ndarray,
+                 deposited: dict[str, float] | None = None):
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.amounts = np.asarray(amounts, dtype=float)
+        self.category_codes, self.categories = pd.factorize(np.asarray(categories, dtype=object))
+        self.description_codes, self.descriptions = pd.factorize(np.asarray(descriptions, dtype=object))
+        self.deposited = deposited or {}
+        self.is_deposit = np.asarray(categories, dtype=object) == DEPOSIT
+        self._spend = ~self.is_deposit
+
+    @classmethod
+    def load(cls, start_date: str, end_date: str) -> 'ExpenseStore':
+        """
+        Reads every transaction in [start_date, end_date) with one query, plus the months' ledger deposits.
+
+        Args:
+            start_date (str): The first day to load, as 'YYYY-MM-DD'.
+            end_date (str): The day after the last one to load, as 'YYYY-MM-DD'.
+
+        Returns:
+            ExpenseStore: The loaded range.
+        """
+        cursor = expense_db.get_connection().cursor()
+        rows = cursor.execute(RANGE_QUERY, (start_date, end_date)).fetchall()
+        last_month = str(np.datetime64(end_date) - 1)[:7]
+        ledger = cursor.execute(LEDGER_QUERY, (start_date[:7], last_month)).fetchall()
+        dates, categories, descriptions, amounts = zip(*rows) if rows else ((), (), (), ())
+        return cls(np.array(dates, dtype='datetime64[D]'), np.array(categories, dtype=object),
+                   np.array(descriptions, dtype=object), np.array(amounts, dtype=float), dict(ledger))
+
+    @property
+    def empty(self) -> bool:
+        """Whether the range has no transactions at all, deposits included"""
+        return len(self.dates) == 0
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[str, str, float]]:
+        """Yields (date, category, amount) for the transactions from start to stop, deposits included, in date order"""
+        window = slice(start, stop)
+        return zip(np.datetime_as_string(self.dates[window]), self.categories[self.category_codes[window]],
+                   self.amounts[window].tolist())
+
+    def total_spent(self) -> float:
+        """Returns the sum of every expense"""
+        return float(self.amounts[self._spend].sum())
+
+    def expense_amounts(self) -> np.ndarray:
+        """Returns the amount of every expense, in date order"""
+        return self.amounts[self._spend]
+
+    def expense_days(self) -> np.ndarray:
+        """Returns the day of the month of every expense, in date order"""
+        dates = self.dates[self._spend]
+        return (dates - dates.astype('datetime64[M]')).astype(int) + 1
+
+    def category_totals(self) -> pd.Series:
+        """Returns the amount spent per category, ordered by category"""
+        return self._totals(self.category_codes, self.categories).sort_index()
+
+    def top_merchants(self, n: int = 10) -> pd.Series:
+        """
+        Returns the n descriptions (merchants) with the most spent, largest first.
+
+        Args:
+            n (int, optional): How many merchants to return. Default is 10.
+        """
+        totals = self._totals(self.description_codes, self.descriptions)
+        if len(totals) > n:
+            totals = totals.iloc[np.argpartition(-totals.values, n - 1)[:n]]
+        return totals.sort_values(ascending=False, kind='stable')
+
+    def daily_totals(self) -> pd.Series:
+        """Returns the amount spent on each day with expenses, indexed by date"""
+        days, inverse = np.unique(self.dates[self._spend], return_inverse=True)
+        return pd.Series(np.bincount(inverse, weights=self.amounts[self._spend], minlength=len(days)),
+                         index=pd.DatetimeIndex(days, name='Date'), name='Amount')
+
+    def monthly_totals(self) -> pd.DataFrame:
+        """Returns Deposited, Spent and Available per 'YYYY-MM' month of the range"""
+        months, inverse = np.unique(self.dates.astype('datetime64[M]'), return_inverse=True)
+        spent = np.bincount(inverse, weights=np.where(self._spend, self.amounts, 0), minlength=len(months))
+        keys = np.datetime_as_string(months)
+        deposited = np.array([self.deposited.get(key, 0.0) for key in keys])
+        return pd.DataFrame({'Deposited': deposited, 'Spent': spent, 'Available': deposited - spent},
+                            index=pd.Index(keys, name='Month'))
+
+    def rolling_spend(self, days: int) -> pd.Series:
+        """
+        Returns the amount spent over the trailing window of days, for every calendar day of the range.
+
+        Args:
+            days (int): The window length in days.
+        """
+        if self.empty:
+            return pd.Series(dtype=float, name='Amount')
+        start = self.dates[0]
+        offsets = (self.dates[self._spend] - start).astype(int)
+        span = int((self.dates[-1] - start).astype(int)) + 1
+        daily = np.bincount(offsets, weights=self.amounts[self._spend], minlength=span)
+        cumulative = np.concatenate([[0.0], np.cumsum(daily)])
+        window = cumulative[1:] - cumulative[np.maximum(np.arange(1, span + 1) - days, 0)]
+        return pd.Series(window, index=pd.date_range(str(start), periods=span, freq='D', name='Date'), name='Amount')
+
+    def running_balance(self) -> np.ndarray:
+        """
+        Returns what was left of each expense's month deposit right after that expense, in date order.
+
+        Returns:
+            np.ndarray: The month's deposit minus everything spent in the month up to and including each expense.
+        """
+        amounts = self.amounts[self._spend]
+        if not len(amounts):
+            return np.array([], dtype=float)
+        months = self.dates[self._spend].astype('datetime64[M]')
+        cumulative = np.cumsum(amounts)
+        # Rows are date ordered, so every month is one contiguous run; restart the sum at each run
+        starts = np.flatnonzero(np.concatenate([[True], months[1:] != months[:-1]]))
+        lengths = np.diff(np.append(starts, len(months)))
+        before = np.repeat(np.concatenate([[0.0], cumulative])[starts], lengths)
+        deposits = np.repeat([self.deposited.get(key, 0.0) for key in np.datetime_as_string(months[starts])],
+                             lengths)
+        return deposits - (cumulative - before)
+
+    def daily_balance(self) -> pd.Series:
+        """Returns the running balance left at the end of each day with expenses, indexed by day of the month"""
+        days = self.expense_days()
+        balance = self.running_balance()
+        last = np.flatnonzero(np.append(days[1:] != days[:-1], True)) if len(days) else np.array([], dtype=int)
+        return pd.Series(balance[last], index=days[last], name='Available_overtime')
+
+    def expense_frame(self) -> pd.DataFrame:
+        """
+        Returns the expenses (deposits excluded) as a DataFrame with the columns the charts used to compute.
+
+        Returns:
+            pd.DataFrame: Date, Category, Description, Amount, Day, Cumulative_Amount and Available_overtime.
+        """
+        amounts = self.expense_amounts()
+        return pd.DataFrame({
+            'Date': pd.DatetimeIndex(self.dates[self._spend]),
+            'Category': self.categories[self.category_codes[self._spend]],
+            # Missing descriptions factorize to -1, which picks the None appended past the labels
+            'Description': np.append(self.descriptions, None)[self.description_codes[self._spend]],
+            'Amount': amounts,
+            'Day': self.expense_days(),
+            'Cumulative_Amount': np.cumsum(amounts),
+            'Available_overtime': self.running_balance(),
+        })
+
+    def _totals(self, codes: np.ndarray, labels: np.ndarray) -> pd.Series:
+        spend = self._spend & (codes >= 0)
+        sums = np.bincount(codes[spend], weights=self.amounts[spend], minlength=len(labels))
+        present = np.bincount(codes[spend], minlength=len(labels)) > 0
+        return pd.Series(sums[present], index=pd.Index(labels[present]), name='Amount')
@@ -0,0 +1,154 @@
+import matplotlib
+
+matplotlib.use('Agg')  # Headless: workers never open a window
+
+import calendar  # noqa: E402
+import datetime  # noqa: E402
+import logging  # noqa: E402
+import os  # noqa: E402
+from concurrent.futures import ProcessPoolExecutor, as_completed  # noqa: E402
+
+import click  # noqa: E402
+
+import expense_db  # noqa: E402
+import expense_reports  # noqa: E402
+
+MONTHLY_REPORTS = ['Excel', 'CSV', 'Pie Chart', 'Bar Graph', 'Line Chart', 'Histogram', 'Monthly']
+REPORTS = MONTHLY_REPORTS + ['Yearly']
+SPREADSHEETS = ['Excel', 'CSV']
+
+
+def months_between(start: datetime.date, end: datetime.date) -> list[tuple[int, int]]:
+    """Returns every (year, month) from start's month up to and including end's month"""
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def export_month(year: int, month: int, reports: list[str], output: str) -> tuple[list[str], list[str]]:
+    """
+    Renders the selected monthly reports into output/{month}-{year}, the folder layout upload() uses.
+
+    Charts are skipped for a month with no expenses, only a deposit. A report that fails is logged
+    and counted without stopping the month's other reports.
+
+    Runs inside a worker process, so the month is read once and every chart reuses that
+    worker's figures from expense_charts, which are released when the batch ends and the
+    worker exits.
+
+    Args:
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+        reports (list[str]): The MONTHLY_REPORTS to render.
+        output (str): The root output directory.
+
+    Returns:
+        tuple[list[str], list[str]]: The files written, empty if the month has no transactions, and
+            the reports that failed.
+    """
+    store = expense_reports.load_store(year, month)
+    if store.empty:
+        return [], []
+    if not len(store.expense_amounts()):
+        reports = [report for report in reports if report in SPREADSHEETS]
+    folder = os.path.join(output, f"{calendar.month_name[month]}-{year}")
+    os.makedirs(folder, exist_ok=True)
+    written, failed = [], []
+    for report in reports:
+        try:
+            written.append(expense_reports.export_report(report, year, month, folder))
+        except Exception as error:  # One broken report shouldn't cost the rest of the batch
+            logging.error(f"{report} for {calendar.month_name[month]} {year} failed: {error}")
+            failed.append(f"{report} {year}-{month:02d}")
+    return written, failed
+
+
+def export_year(year: int, output: str) -> tuple[list[str], list[str]]:
+    """Renders the yearly summary into output/{year}, returning the files written and the reports that failed"""
+    folder = os.path.join(output, str(year))
+    os.makedirs(folder, exist_ok=True)
+    try:
+        path = expense_reports.export_yearly(year, directory=folder)
+    except Exception as error:  # One broken report shouldn't cost the rest of the batch
+        logging.error(f"Yearly summary for {year} failed: {error}")
+        path, failed = None, [f"Yearly {year}"]
+    else:
+        failed = []
+    if path is None:
+        if not os.listdir(folder):
+            os.rmdir(folder)
+        return [], failed
+    return [path], failed
+
+
+def run_batch(start: datetime.date, end: datetime.date, reports: list[str], output: str,
+              database: str = expense_db.DATABASE,
+              workers: int | None = None) -> tuple[list[str], list[str]]:
+    """
+    Renders every selected report for each month (and year) in a date range across worker processes.
+
+    Args:
+        start (datetime.date): Any day in the first month to export.
+        end (datetime.date): Any day in the last month to export.
+        reports (list[str]): The REPORTS to render.
+        output (str): The root output directory.
+        database (str, optional): The expenses database to read. Default is Expenses.db.
+        workers (int | None, optional): Number of worker processes. Default is one per CPU.
+
+    Returns:
+        tuple[list[str], list[str]]: Every file written, and every report that failed, which the
+            other months and reports are still written without.
+    """
+    monthly = [report for report in reports if report in MONTHLY_REPORTS]
+    written, failed = [], []
+    # Bring the schema up to date once, before the workers start reading
+    expense_db.use_database(database)
+    expense_db.create_database()
+    expense_db.close()
+    with ProcessPoolExecutor(max_workers=workers, initializer=expense_db.use_database, initargs=(database,)) as executor:
+        futures = {}
+        if monthly:
+            futures.update({executor.submit(export_month, year, month, monthly, output): f"{year}-{month:02d}"
+                            for year, month in months_between(start, end)})
+        if 'Yearly' in reports:
+            futures.update({executor.submit(export_year, year, output): str(year)
+                            for year in range(start.year, end.year + 1)})
+        for future in as_completed(futures):
+            try:
+                files, errors = future.result()
+            except Exception as error:  # e.g. the worker died, the other periods still finish
+                logging.error(f"Batch export of {futures[future]} failed: {error}")
+                failed.append(futures[future])
+                continue
+            written += files
+            failed += errors
+    logging.info(f"Batch export wrote {len(written)} files to {output}, {len(failed)} failed")
+    return written, failed
+
+
+@click.command(name='expense-batch', help="Render ExpenseGUI reports for every month from START to END (YYYY-MM)")
+@click.argument('start', type=click.DateTime(formats=['%Y-%m']))
+@click.argument('end', type=click.DateTime(formats=['%Y-%m']))
+@click.option('-r', '--report', 'reports', multiple=True, type=click.Choice(REPORTS),
+              help='Report to render, repeat for several (default: all)')
+@click.option('-o', '--output', default='reports', type=click.Path(file_okay=False), help='Output directory')
+@click.option('-d', '--database', default=expense_db.DATABASE, type=click.Path(exists=True, dir_okay=False),
+              help='Expenses database to read')
+@click.option('-w', '--workers', type=int, default=None, help='Worker processes (default: one per CPU)')
+def batch(start, end, reports, output, database, workers):
+    try:
+        if start > end:
+            raise click.ClickException("START must not be after END")
+        written, failed = run_batch(start.date(), end.date(), list(reports) or REPORTS, output, database, workers)
+        click.echo(f"Wrote {len(written)} files to {output}")
+        if failed:
+            click.echo(f"{len(failed)} failed, see the log: {', '.join(sorted(failed))}")
+    except click.ClickException as error:
+        click.echo(f"An error occurred: {error}")
+
+
+if __name__ == '__main__':
+    batch()
@@ -0,0 +1,364 @@
+import multiprocessing.util
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from expense_analytics import ExpenseStore
+
+FIGURE_SIZES = {
+    'Pie Chart': (18, 6),
+    'Bar Graph': (12, 6),
+    'Line Chart': (12, 6),
+    'Histogram': (12, 6),
+    'Monthly': (20, 10),
+    'Yearly': (20, 10),
+}
+HISTOGRAM_BINS = 10
+
+
+class ChartTemplate:
+    """
+    A report's figure, laid out once and refreshed with new data for every render.
+
+    The axes, labels and layout are built on first use and kept, each render only swaps the
+    data of the existing artists (bar heights, line data, histogram bins). Artists whose
+    shape changes, like pie wedges or a bar chart with a different number of categories, are
+    removed and redrawn on their own axes without touching the rest of the figure. Figures
+    are built directly rather than through pyplot, so they never register with an
+    interactive backend, and release() frees them.
+
+    Subclasses set report and grid, label the axes in setup() and fill them in update().
+    """
+    report = ''
+    grid = (1, 2)
+    tight = True
+
+    def __init__(self):
+        self.figure = Figure(figsize=FIGURE_SIZES[self.report])
+        self.axes = list(np.ravel(self.figure.subplots(*self.grid)))
+        self._artists: dict[str, object] = {}
+        self._laid_out = False
+        self.setup()
+
+    def setup(self) -> None:
+        """Sets the labels that stay the same across renders"""
+
+    def update(self, *data) -> None:
+        """Swaps the plotted data for a new report"""
+        raise NotImplementedError
+
+    def render(self, path: str, *data) -> None:
+        """
+        Updates the figure with data and saves it.
+
+        Args:
+            path (str): Where to save the chart.
+            *data: The report's data, as taken by update().
+        """
+        self.update(*data)
+        if self.tight and not self._laid_out:
+            # Layout is solved once per template, later renders reuse the subplot positions
+            self.figure.tight_layout()
+            self._laid_out = True
+        self.figure.savefig(path)
+
+    def release(self) -> None:
+        """Drops every artist and the figure itself"""
+        self._artists.clear()
+        self.figure.clf()
+        self.axes = []
+
+    def bars(self, key: str, ax, labels, heights, width: float = 0.8, horizontal: bool = False) -> None:
+        """Draws one bar per label, resizing the existing bars when the number of labels is unchanged"""
+        heights = np.asarray(heights, dtype=float)
+        container = self._artists.get(key)
+        if container is not None and len(container) == len(heights):
+            for patch, height in zip(container, heights):
+                if horizontal:
+                    patch.set_width(height)
+                else:
+                    patch.set_height(height)
+        else:
+            if container is not None:
+                container.remove()
+                ax.set_prop_cycle(None)  # Redrawn bars keep the first colour of the cycle
+            positions = np.arange(len(heights))
+            plot = ax.barh if horizontal else ax.bar
+            container = plot(positions, heights, width, label=key)
+            self._artists[key] = container
+        ticks = np.arange(len(heights))
+        if horizontal:
+            ax.set_yticks(ticks, [str(label) for label in labels])
+        else:
+            ax.set_xticks(ticks, [str(label) for label in labels], rotation=0, ha='center')
+        ax.relim()
+        ax.autoscale_view()
+
+    def line(self, key: str, ax, x, y, **style) -> None:
+        """Plots a line, moving the existing one to the new data"""
+        artist = self._artists.get(key)
+        if artist is None:
+            artist, = ax.plot(x, y, **style)
+            self._artists[key] = artist
+        else:
+            artist.set_data(x, y)
+        ax.relim()
+        ax.autoscale_view()
+
+    def category_line(self, key: str, ax, categorized: pd.Series, **style) -> None:
+        """Plots a line over categories, placed at fixed positions so categories never pile up on the axis"""
+        self.line(key, ax, np.arange(len(categorized)), categorized.values, **style)
+        ax.set_xticks(np.arange(len(categorized)), [str(label) for label in categorized.index], rotation=0)
+
+    def pie(self, key: str, ax, values, labels) -> None:
+        """Redraws a pie, wedges can't be resized in place when their number changes"""
+        for artist in self._artists.pop(key, []):
+            artist.remove()
+        if not np.asarray(values, dtype=float).sum():
+            # Nothing to split, e.g. the categories of a month with only a deposit
+            self._artists[key] = [ax.text(0.5, 0.5, 'Nothing to show', ha='center', va='center',
+                                          transform=ax.transAxes)]
+            return
+        ax.set_prop_cycle(None)  # Start the wedge colours over instead of continuing from the last pie
+        wedges, texts, autotexts = ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
+        self._artists[key] = [*wedges, *texts, *autotexts]
+
+
+class PieChart(ChartTemplate):
+    """Spending by category next to the month's deposited vs available split"""
+    report = 'Pie Chart'
+
+    def update(self, store: ExpenseStore, balance: tuple[float, float, float], month: str, year: str) -> None:
+        deposited, available, _ = balance
+        ax1, ax2 = self.axes
+        category_amount_df = store.category_totals()
+        self.pie('categories', ax1, category_amount_df, category_amount_df.index)
+        ax1.set_title(f'Spending by Category for {month} {year}')
+        self.pie('balance', ax2, [deposited, available], ['Total', 'Available'])
+        ax2.set_title(f'Total and Available Amount for {month} {year}')
+
+
+class BarGraph(ChartTemplate):
+    """Category-wise spending next to the available balance after each expense"""
+    report = 'Bar Graph'
+
+    def setup(self) -> None:
+        ax1, ax2 = self.axes
+        ax1.set_xlabel('Category')
+        ax1.set_ylabel('Amount / £')
+        ax2.set_xlabel('Amount / £')
+        ax2.set_ylabel('Day')
+
+    def update(self, store: ExpenseStore, month: str, year: str) -> None:
+        ax1, ax2 = self.axes
+        category_amount_df = store.category_totals()
+        self.bars('categories', ax1, category_amount_df.index, category_amount_df.values, width=0.5)
+        self.bars('Available_overtime', ax2, store.expense_days(), store.running_balance(), width=0.5,
+                  horizontal=True)
+        if ax2.get_legend() is None:
+            ax2.legend()
+        ax1.set_title(f'Category-wise Spending for {month} {year}')
+        ax2.set_title(f'Available for {month} {year} per date')
+
+
+class LineChart(ChartTemplate):
+    """Expenses by category next to the available balance over the month"""
+    report = 'Line Chart'
+    tight = False
+
+    def setup(self) -> None:
+        ax1, ax2 = self.axes
+        ax1.set_xlabel('Categories')
+        ax1.set_ylabel('Total Amount')
+        ax1.set_title('Expenses by Category')
+        ax2.set_xlabel('Date')
+        ax2.set_ylabel('Amount / £')
+
+    def update(self, store: ExpenseStore, month: str, year: str) -> None:
+        ax1, ax2 = self.axes
+        self.category_line('categories', ax1, store.category_totals())
+        self.line('available', ax2, store.expense_days(), store.running_balance())
+        ax2.set_title(f'Available for {month} {year} per date')
+
+
+class Histogram(ChartTemplate):
+    """Distribution of expense amounts next to expenses by category"""
+    report = 'Histogram'
+
+    def setup(self) -> None:
+        ax1, ax2 = self.axes
+        ax1.set_xlabel('Amount')
+        ax1.set_ylabel('Frequency')
+        ax1.set_title('Expense Amount Histogram')
+        ax2.set_xlabel('Categories')
+        ax2.set_ylabel('Total Amount')
+        ax2.set_title('Expenses by Category')
+
+    def update(self, store: ExpenseStore) -> None:
+        ax1, ax2 = self.axes
+        amounts = store.expense_amounts()
+        counts, edges = np.histogram(amounts, bins=HISTOGRAM_BINS)
+        patches = self._artists.get('histogram')
+        if patches is None:
+            _, _, patches = ax1.hist(amounts, bins=edges)
+            self._artists['histogram'] = patches
+        else:
+            # The bin count is fixed, so the bars are only moved and resized
+            for patch, count, left, right in zip(patches, counts, edges[:-1], edges[1:]):
+                patch.set_x(left)
+                patch.set_width(right - left)
+                patch.set_height(count)
+            ax1.relim()
+            ax1.autoscale_view()
+        categorized = store.category_totals()
+        self.bars('categories', ax2, categorized.index, categorized.values)
+
+
+class MonthlySummary(ChartTemplate):
+    """Four panel summary of a month's spending and balance"""
+    report = 'Monthly'
+    grid = (2, 2)
+
+    def setup(self) -> None:
+        ax1, ax2, ax3, ax4 = self.axes
+        ax1.set_xlabel('Category')
+        ax1.set_ylabel('Amount / £')
+        ax2.set_xlabel('Date')
+        ax2.set_ylabel('Amount / £')
+        ax4.set_xlabel('Date')
+        ax4.set_ylabel('Amount / £')
+
+    def update(self, store: ExpenseStore, daily_spending: pd.Series, balance: tuple[float, float, float],
+               month: str, year: str) -> None:
+        deposited, available_amount, _ = balance
+        ax1, ax2, ax3, ax4 = self.axes
+
+        # Categorized spending's for the month
+        categorized = store.category_totals()
+        self.bars('categories', ax1, categorized.index, categorized.values, width=0.5)
+        ax1.set_title(f'Category-wise Spending for {month} {year}')
+
+        # Available over the month
+        available = store.daily_balance()
+        self.line('available', ax2, available.index, available.values)
+        ax2.set_title(f'Available for {month} {year} per date')
+
+        # Total vs available over the month
+        self.pie('balance', ax3, [deposited, available_amount], ['Utilized', 'Available'])
+        ax3.set_title(f'Total and Available Amount for {month} {year}')
+
+        # Spending's over the month
+        self.line('daily', ax4, daily_spending.index, daily_spending.values, linewidth=1)
+        ax4.set_title(f"Spending's for {month} {year} per day")
+
+
+class YearlySummary(ChartTemplate):
+    """Four panel summary of a year: spending by category and deposited, available and spent per month"""
+    report = 'Yearly'
+    grid = (2, 2)
+    tight = False
+
+    def setup(self) -> None:
+        ax1, *panels = self.axes
+        ax1.set_xlabel('Category')
+        ax1.set_ylabel('Amount / £')
+        for ax in panels:
+            ax.set_xlabel('Month')
+            ax.set_ylabel('Amount / £')
+            ax.set_xticks(range(1, 13))
+
+    def update(self, category_totals: pd.Series, balances: pd.DataFrame, month: str, year: str) -> None:
+        ax1, ax2, ax3, ax4 = self.axes
+
+        # Categorized spending's for the year
+        self.bars('categories', ax1, category_totals.index, category_totals.values, width=0.5)
+        ax1.set_title(f'Category-wise Spending for {month} {year}')
+
+        for ax, column, title in [(ax2, 'Deposited', f'Deposit Amount per Month for {year}'),
+                                  (ax3, 'Available', f'Available Amount per Month for {year}'),
+                                  (ax4, 'Spent', f'Spent per Month for {year}')]:
+            self.line(column, ax, balances.index, balances[column])
+            ax.set_title(title)
+
+
+TEMPLATES = {template.report: template for template in
+             [PieChart, BarGraph, LineChart, Histogram, MonthlySummary, YearlySummary]}
+_templates: dict[str, ChartTemplate] = {}
+
+
+def template_for(report: str) -> ChartTemplate:
+    """
+    Returns the report type's template, building it on first use.
+
+    Args:
+        report (str): One of the FIGURE_SIZES report types.
+
+    Returns:
+        ChartTemplate: The reusable template.
+    """
+    template = _templates.get(report)
+    if template is None:
+        template = TEMPLATES[report]()
+        _templates[report] = template
+    return template
+
+
+def release(report: str | None = None) -> None:
+    """
+    Frees a report type's template, or every template, e.g. when a long session closes.
+
+    Args:
+        report (str | None, optional): The report type to release. Default releases all of them.
+    """
+    for name in [report] if report else list(_templates):
+        template = _templates.pop(name, None)
+        if template is not None:
+            template.release()
+
+
+def pie_chart(store: ExpenseStore, balance: tuple[float, float, float], month: str, year: str,
+              path: str) -> None:
+    """Spending by category next to the month's deposited vs available split"""
+    template_for('Pie Chart').render(path, store, balance, month, year)
+
+
+def bar_graph(store: ExpenseStore, month: str, year: str, path: str) -> None:
+    """Category-wise spending next to the available balance after each expense"""
+    template_for('Bar Graph').render(path, store, month, year)
+
+
+def line_chart(store: ExpenseStore, month: str, year: str, path: str) -> None:
+    """Expenses by category next to the available balance over the month"""
+    template_for('Line Chart').render(path, store, month, year)
+
+
+def histogram(store: ExpenseStore, path: str) -> None:
+    """Distribution of expense amounts next to expenses by category"""
+    template_for('Histogram').render(path, store)
+
+
+def monthly_summary(store: ExpenseStore, daily_spending: pd.Series, balance: tuple[float, float, float],
+                    month: str, year: str, path: str) -> None:
+    """Four panel summary of a month's spending and balance"""
+    template_for('Monthly').render(path, store, daily_spending, balance, month, year)
+
+
+def yearly_summary(category_totals: pd.Series, balances: pd.DataFrame, month: str, year: str, path: str) -> None:
+    """
+    Four panel summary of a year: spending by category and deposited, available and spent per month.
+
+    Args:
+        category_totals (pd.Series): Amount spent per category over the year.
+        balances (pd.DataFrame): Deposited, Available and Spent columns indexed by month number.
+        month (str): The month selected in the GUI, only used in the first title.
+        year (str): The summarised year.
+        path (str): Where to save the chart.
+    """
+    template_for('Yearly').render(path, category_totals, balances, month, year)
+
+
+# Render workers (ExpenseGUI's render pool, expense_batch's workers) keep their templates across
+# every task they run, this releases them when the process exits. Processes that render in the
+# foreground also call release() themselves when they shut down.
+multiprocessing.util.Finalize(None, release, exitpriority=0)
@@ -0,0 +1,271 @@
+import datetime
+import logging
+import sqlite3
+
+import sqlite_pool
+from sqlite_pool import ConnectionPool
+
+DATABASE = 'Expenses.db'
+
+pool = ConnectionPool(DATABASE)
+
+# Every query filters Transactions by a date range (and usually a category), so the
+# composite index lets SQLite seek straight to the month instead of scanning the ledger.
+MIGRATIONS = [
+    ["CREATE INDEX IF NOT EXISTS idx_transactions_date_category ON Transactions (Date, Category)"],
+    # Per-month running balances, so a write touches one ledger row instead of every row of the month.
+    ['''
+        CREATE TABLE IF NOT EXISTS MonthlyBalances (
+            Month TEXT PRIMARY KEY,
+            Deposited FLOAT NOT NULL,
+            Available FLOAT NOT NULL,
+            Spent FLOAT NOT NULL)
+    ''',
+     "INSERT OR IGNORE INTO MonthlyBalances (Month, Deposited, Available, Spent) "
+     "SELECT substr(Date, 1, 7), Total, Available, Total - Available FROM Transactions "
+     "WHERE Category = 'MONTHLY DEPOSIT!'"],
+    # Per-month spending by category and per-day spending, kept in step with every write so
+    # summaries aggregate a few small rows instead of rescanning the transactions.
+    ['''
+        CREATE TABLE IF NOT EXISTS CategoryTotals (
+            Month TEXT NOT NULL,
+            Category TEXT NOT NULL,
+            Amount FLOAT NOT NULL,
+            Count INTEGER NOT NULL,
+            PRIMARY KEY (Month, Category))
+    ''',
+     '''
+        CREATE TABLE IF NOT EXISTS DailySpend (
+            Date DATE PRIMARY KEY,
+            Amount FLOAT NOT NULL,
+            Count INTEGER NOT NULL)
+    ''',
+     "INSERT OR IGNORE INTO CategoryTotals (Month, Category, Amount, Count) "
+     "SELECT substr(Date, 1, 7), Category, SUM(Amount), COUNT(*) FROM Transactions "
+     "WHERE Category != 'MONTHLY DEPOSIT!' GROUP BY substr(Date, 1, 7), Category",
+     "INSERT OR IGNORE INTO DailySpend (Date, Amount, Count) "
+     "SELECT Date, SUM(Amount), COUNT(*) FROM Transactions WHERE Category != 'MONTHLY DEPOSIT!' GROUP BY Date"],
+    # Statement credits are folded into the month's deposit rather than stored as rows, so they are
+    # recorded here to let a later import of an overlapping statement skip the ones already added.
+    ['''
+        CREATE TABLE IF NOT EXISTS ImportedCredits (
+            Date DATE NOT NULL,
+            Description TEXT NOT NULL,
+            Amount FLOAT NOT NULL)
+    ''',
+     "CREATE INDEX IF NOT EXISTS idx_imported_credits ON ImportedCredits (Date, Description, Amount)"],
+]
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns the current thread's long-lived connection to Expenses.db"""
+    return pool.connect()
+
+
+def close() -> None:
+    """Closes every pooled connection to Expenses.db"""
+    pool.close_all()
+
+
+def use_database(database: str) -> None:
+    """
+    Points the connection pool at another database file.
+
+    Also used as the initializer of worker processes, which start with the default path.
+
+    Args:
+        database (str): Path to the SQLite database file.
+    """
+    pool.database = database
+
+
+def month_bounds(year: int, month: int) -> tuple[str, str]:
+    """
+    Returns the half-open [start, end) date range covering a month.
+
+    Queries compare Date against these bounds instead of strftime('%Y-%m', Date) so the
+    Date index can be used.
+
+    Args:
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+
+    Returns:
+        tuple[str, str]: The first day of the month and the first day of the following month.
+    """
+    start = datetime.date(year, month, 1)
+    end = datetime.date(year + month // 12, month % 12 + 1, 1)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+
+def year_bounds(year: int) -> tuple[str, str]:
+    """Returns the half-open [start, end) date range covering a year"""
+    return datetime.date(year, 1, 1).strftime('%Y-%m-%d'), datetime.date(year + 1, 1, 1).strftime('%Y-%m-%d')
+
+
+def month_key(year: int, month: int) -> str:
+    """Returns the 'YYYY-MM' key used by the MonthlyBalances ledger"""
+    return f'{year:04d}-{month:02d}'
+
+
+def get_balance(cursor: sqlite3.Cursor, month: str) -> tuple[float, float, float] | None:
+    """
+    Reads a month's balances from the MonthlyBalances ledger.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to query with.
+        month (str): The 'YYYY-MM' month key.
+
+    Returns:
+        tuple[float, float, float] | None: Deposited, available and spent amounts, or None if no deposit exists.
+    """
+    cursor.execute("SELECT Deposited, Available, Spent FROM MonthlyBalances WHERE Month = ?", (month,))
+    return cursor.fetchone()
+
+
+def get_balances(cursor: sqlite3.Cursor, year: int) -> list[tuple[str, float, float, float]]:
+    """Returns every (Month, Deposited, Available, Spent) ledger row for a year, ordered by month"""
+    cursor.execute("SELECT Month, Deposited, Available, Spent FROM MonthlyBalances WHERE Month >= ? AND Month < ? "
+                   "ORDER BY Month", (month_key(year, 1), month_key(year + 1, 1)))
+    return cursor.fetchall()
+
+
+def record_deposit(cursor: sqlite3.Cursor, month: str, value: float) -> None:
+    """Adds a deposit to the month's ledger row, creating it if this is the month's first deposit"""
+    cursor.execute("INSERT INTO MonthlyBalances (Month, Deposited, Available, Spent) VALUES (?, ?, ?, 0) "
+                   "ON CONFLICT(Month) DO UPDATE SET Deposited = Deposited + excluded.Deposited, "
+                   "Available = Available + excluded.Available",
+                   (month, value, value))
+
+
+def record_expense(cursor: sqlite3.Cursor, date: str, category: str, value: float, count: int = 1) -> None:
+    """
+    Records spending in the month's ledger row and the CategoryTotals and DailySpend aggregates.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to write with, inside the caller's transaction.
+        date (str): The 'YYYY-MM-DD' date of the expense.
+        category (str): The expense's category.
+        value (float): The amount spent, negative to refund deleted expenses.
+        count (int, optional): Transactions added, negative when deleting. Default is 1.
+    """
+    month = date[:7]
+    cursor.execute("UPDATE MonthlyBalances SET Available = Available - ?, Spent = Spent + ? WHERE Month = ?",
+                   (value, value, month))
+    cursor.execute("INSERT INTO CategoryTotals (Month, Category, Amount, Count) VALUES (?, ?, ?, ?) "
+                   "ON CONFLICT(Month, Category) DO UPDATE SET Amount = Amount + excluded.Amount, "
+                   "Count = Count + excluded.Count",
+                   (month, category, value, count))
+    cursor.execute("INSERT INTO DailySpend (Date, Amount, Count) VALUES (?, ?, ?) "
+                   "ON CONFLICT(Date) DO UPDATE SET Amount = Amount + excluded.Amount, Count = Count + excluded.Count",
+                   (date, value, count))
+    if count < 0:
+        cursor.execute("DELETE FROM CategoryTotals WHERE Month = ? AND Category = ? AND Count <= 0", (month, category))
+        cursor.execute("DELETE FROM DailySpend WHERE Date = ? AND Count <= 0", (date,))
+
+
+def get_category_totals(cursor: sqlite3.Cursor, year: int) -> list[tuple[str, float]]:
+    """Returns (Category, Amount) spent over a year from the CategoryTotals aggregate, ordered by category"""
+    cursor.execute("SELECT Category, SUM(Amount) FROM CategoryTotals WHERE Month >= ? AND Month < ? "
+                   "GROUP BY Category ORDER BY Category", (month_key(year, 1), month_key(year + 1, 1)))
+    return cursor.fetchall()
+
+
+def get_daily_spend(cursor: sqlite3.Cursor, year: int, month: int) -> list[tuple[str, float]]:
+    """Returns (Date, Amount) spent per day of a month from the DailySpend aggregate, ordered by date"""
+    cursor.execute("SELECT Date, Amount FROM DailySpend WHERE Date >= ? AND Date < ? ORDER BY Date",
+                   month_bounds(year, month))
+    return cursor.fetchall()
+
+
+def remove_month(cursor: sqlite3.Cursor, month: str) -> None:
+    """Drops the month's ledger row when its deposit is deleted"""
+    cursor.execute("DELETE FROM MonthlyBalances WHERE Month = ?", (month,))
+
+
+def rebuild_month(cursor: sqlite3.Cursor, year: int, month: int, credited: float = 0) -> tuple[float, float, float]:
+    """
+    Recomputes a month's running balances after rows were written without them, e.g. by a bulk import.
+
+    Adds credited to the month's deposit (creating the deposit row on the 1st if the month has
+    none), then sets every expense's Total to the deposited amount and Available to what was
+    left after it, in date order, and rewrites the month's ledger row and aggregates.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to write with, inside the caller's transaction.
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+        credited (float, optional): Newly deposited money for the month. Default is 0.
+
+    Returns:
+        tuple[float, float, float]: The month's new deposited, available and spent amounts.
+    """
+    month_start, month_end = month_bounds(year, month)
+    deposit = cursor.execute("SELECT Id, Total FROM Transactions WHERE Date >= ? AND Date < ? AND Category = ?",
+                             (month_start, month_end, "MONTHLY DEPOSIT!")).fetchone()
+    if deposit is None:
+        deposited = credited
+        cursor.execute("INSERT INTO Transactions (Date, Category, Amount, Available, Total) VALUES (?, ?, ?, ?, ?)",
+                       (month_start, "MONTHLY DEPOSIT!", credited, credited, credited))
+    else:
+        deposited = deposit[1] + credited
+        if credited:
+            cursor.execute("UPDATE Transactions SET Amount = ?, Available = ?, Total = ? WHERE Id = ?",
+                           (credited, deposited, deposited, deposit[0]))
+
+    cursor.execute("""
+        UPDATE Transactions SET Available = ? - running.Spent, Total = ?
+        FROM (SELECT Id, SUM(Amount) OVER (ORDER BY Date, Id) AS Spent FROM Transactions
+              WHERE Date >= ? AND Date < ? AND Category != 'MONTHLY DEPOSIT!') AS running
+        WHERE Transactions.Id = running.Id
+    """, (deposited, deposited, month_start, month_end))
+    spent = cursor.execute("SELECT COALESCE(SUM(Amount), 0) FROM Transactions "
+                           "WHERE Date >= ? AND Date < ? AND Category != 'MONTHLY DEPOSIT!'",
+                           (month_start, month_end)).fetchone()[0]
+    cursor.execute("DELETE FROM CategoryTotals WHERE Month = ?", (month_key(year, month),))
+    cursor.execute("INSERT INTO CategoryTotals (Month, Category, Amount, Count) "
+                   "SELECT ?, Category, SUM(Amount), COUNT(*) FROM Transactions "
+                   "WHERE Date >= ? AND Date < ? AND Category != 'MONTHLY DEPOSIT!' GROUP BY Category",
+                   (month_key(year, month), month_start, month_end))
+    cursor.execute("DELETE FROM DailySpend WHERE Date >= ? AND Date < ?", (month_start, month_end))
+    cursor.execute("INSERT INTO DailySpend (Date, Amount, Count) "
+                   "SELECT Date, SUM(Amount), COUNT(*) FROM Transactions "
+                   "WHERE Date >= ? AND Date < ? AND Category != 'MONTHLY DEPOSIT!' GROUP BY Date",
+                   (month_start, month_end))
+    cursor.execute("INSERT INTO MonthlyBalances (Month, Deposited, Available, Spent) VALUES (?, ?, ?, ?) "
+                   "ON CONFLICT(Month) DO UPDATE SET Deposited = excluded.Deposited, "
+                   "Available = excluded.Available, Spent = excluded.Spent",
+                   (month_key(year, month), deposited, deposited - spent, spent))
+    return deposited, deposited - spent, spent
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """
+    Applies any schema migrations newer than the database's user_version.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+    """
+    sqlite_pool.migrate(connection, MIGRATIONS)
+
+
+def create_database():
+    try:
+        connection = get_connection()
+        cursor = connection.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS Transactions (
+                Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                Date DATE NOT NULL,
+                Category TEXT NOT NULL,
+                Description TEXT,
+                Amount FLOAT NOT NULL,
+                Available FLOAT  NOT NULL,
+                Total FLOAT NOT NULL)
+        ''')
+        connection.commit()
+        migrate(connection)
+        logging.info('Created database!')
+    except sqlite3.DatabaseError as error:
+        logging.info(f'Error creating database! {error}')
@@ -0,0 +1,163 @@
+import csv
+import functools
+import logging
+import os
+import sqlite3
+import time
+from typing import Iterator
+
+import click
+from numerize import numerize
+from openpyxl import Workbook
+
+import expense_db
+
+HEADER = ['Id', 'Date', 'Category', 'Description', 'Amount', 'Available', 'Total', 'Total Spent']
+RANGE_QUERY = ("SELECT Id, Date, Category, Description, Amount, Available, Total FROM Transactions "
+               "WHERE Date >= ? AND Date < ? ORDER BY Date")
+CHUNK_ROWS = 10_000
+FORMATS = ['csv', 'xlsx']
+
+
+@functools.lru_cache(maxsize=65536)
+def currency(amount: int) -> str:
+    """Formats a whole amount as '£' + numerize(amount), memoised since whole amounts repeat a lot"""
+    return '£' + numerize.numerize(amount)
+
+
+def spreadsheet_rows(start_date: str, end_date: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[list[list]]:
+    """
+    Streams the spreadsheet rows of a date range from the database in fixed-size chunks.
+
+    Rows carry the HEADER columns with amounts formatted as currency. 'Total Spent' is the
+    running total of the month's expenses up to that row, restarting every month, so only
+    one chunk is ever held in memory however long the range is.
+
+    Args:
+        start_date (str): The first day to export, as 'YYYY-MM-DD'.
+        end_date (str): The day after the last one to export, as 'YYYY-MM-DD'.
+        chunk_rows (int, optional): Rows fetched from the cursor at a time. Default is 10,000.
+
+    Yields:
+        list[list]: The next chunk of rows.
+    """
+    cursor = expense_db.get_connection().cursor()
+    cursor.execute(RANGE_QUERY, (start_date, end_date))
+    month, spent = None, 0.0
+    label = currency
+    while rows := cursor.fetchmany(chunk_rows):
+        chunk = []
+        for row_id, date, category, description, amount, available, total in rows:
+            if date[:7] != month:
+                month, spent = date[:7], 0.0
+            if category != 'MONTHLY DEPOSIT!':
+                spent += amount
+            chunk.append([row_id, date, category, description, label(int(amount)), label(int(available)),
+                          label(int(total)), label(int(spent))])
+        yield chunk
+
+
+def write_csv(path: str, start_date: str, end_date: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Writes a date range to a CSV file chunk by chunk.
+
+    Args:
+        path (str): The file to write.
+        start_date (str): The first day to export, as 'YYYY-MM-DD'.
+        end_date (str): The day after the last one to export, as 'YYYY-MM-DD'.
+        chunk_rows (int, optional): Rows fetched and written at a time. Default is 10,000.
+
+    Returns:
+        int: The number of rows written.
+    """
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADER)
+        for chunk in spreadsheet_rows(start_date, end_date, chunk_rows):
+            writer.writerows(chunk)
+            written += len(chunk)
+    return written
+
+
+def write_excel(path: str, start_date: str, end_date: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Writes a date range to an xlsx workbook using openpyxl's write-only mode.
+
+    Write-only worksheets stream every appended row to a temporary file instead of keeping
+    the cells in memory, so the workbook size doesn't bound what can be exported.
+
+    Args:
+        path (str): The file to write.
+        start_date (str): The first day to export, as 'YYYY-MM-DD'.
+        end_date (str): The day after the last one to export, as 'YYYY-MM-DD'.
+        chunk_rows (int, optional): Rows fetched at a time. Default is 10,000.
+
+    Returns:
+        int: The number of rows written.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append(HEADER)
+    written = 0
+    for chunk in spreadsheet_rows(start_date, end_date, chunk_rows):
+        for row in chunk:
+            sheet.append(row)
+        written += len(chunk)
+    workbook.save(path)
+    return written
+
+
+def export_range(file_format: str, path: str, start_date: str, end_date: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """
+    Streams a date range to a CSV or xlsx file, removing the file again if the range has no transactions.
+
+    Args:
+        file_format (str): One of FORMATS.
+        path (str): The file to write.
+        start_date (str): The first day to export, as 'YYYY-MM-DD'.
+        end_date (str): The day after the last one to export, as 'YYYY-MM-DD'.
+        chunk_rows (int, optional): Rows fetched at a time. Default is 10,000.
+
+    Returns:
+        int: The number of rows written.
+    """
+    writer = write_excel if file_format == 'xlsx' else write_csv
+    written = writer(path, start_date, end_date, chunk_rows)
+    if not written:
+        os.remove(path)
+    logging.info(f"Exported {written} transactions from {start_date} to {end_date} into {path}")
+    return written
+
+
+@click.command(name='expense-export', help="Export every transaction from START to END (YYYY-MM, inclusive)")
+@click.argument('start', type=click.DateTime(formats=['%Y-%m']))
+@click.argument('end', type=click.DateTime(formats=['%Y-%m']))
+@click.option('-f', '--format', 'file_format', default='xlsx', type=click.Choice(FORMATS), help='Output format')
+@click.option('-o', '--output', default=None, type=click.Path(dir_okay=False),
+              help='File to write (default: START_END.FORMAT)')
+@click.option('-d', '--database', default=expense_db.DATABASE, type=click.Path(exists=True, dir_okay=False),
+              help='Expenses database to read')
+def export(start, end, file_format, output, database):
+    try:
+        if start > end:
+            raise click.ClickException("START must not be after END")
+        output = output or f"{start:%Y-%m}_{end:%Y-%m}.{file_format}"
+        expense_db.use_database(database)
+        began = time.perf_counter()
+        start_date = expense_db.month_bounds(start.year, start.month)[0]
+        end_date = expense_db.month_bounds(end.year, end.month)[1]
+        written = export_range(file_format, output, start_date, end_date)
+        elapsed = time.perf_counter() - began
+        if written:
+            click.echo(f"Wrote {written} transactions to {output} ({written / elapsed:,.0f} rows/sec)")
+        else:
+            click.echo("No transactions in that range")
+    except (OSError, sqlite3.Error, click.ClickException) as error:
+        click.echo(f"An error occurred: {error}")
+    finally:
+        expense_db.close()
+
+
+if __name__ == '__main__':
+    export()
@@ -0,0 +1,152 @@
+import calendar
+import datetime
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+import expense_db
+
+SEASON_MONTHS = 12
+# Cheap per-category summary of the fitted history, any insert or delete changes it
+FINGERPRINT_QUERY = ("SELECT Category, SUM(Count), SUM(Amount), MIN(Month), MAX(Month) FROM CategoryTotals "
+                     "WHERE Month < ? GROUP BY Category")
+HISTORY_QUERY = "SELECT Category, Month, Amount FROM CategoryTotals WHERE Month < ? AND Category IN ({})"
+MONTH_QUERY = "SELECT Category, Amount FROM CategoryTotals WHERE Month = ?"
+
+# (category, 'YYYY-MM') -> (fingerprint, (trend, seasonal, forecast))
+_fits: dict[tuple[str, str], tuple[tuple, tuple[float, float, float]]] = {}
+_fits_lock = threading.Lock()
+
+
+def month_number(month: str) -> int:
+    """Converts a 'YYYY-MM' key to a running month count, so consecutive months differ by one"""
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def fit(months: np.ndarray, history: np.ndarray, observed: np.ndarray, target: int) -> np.ndarray:
+    """
+    Fits every category's monthly spending at once and predicts the target month.
+
+    Each row gets a least squares line over the months it has been in use (the same slope and
+    intercept scipy's linregress gives, computed for all rows together), plus a seasonal term:
+    the mean residual of the target's calendar month, once a category spans a full year.
+
+    Args:
+        months (np.ndarray): Running month number of each column (see month_number()).
+        history (np.ndarray): Amount spent per category (row) and month (column), 0 where nothing was spent.
+        observed (np.ndarray): Which cells count towards each row's fit, False before a category's first month.
+        target (int): Running month number to predict.
+
+    Returns:
+        np.ndarray: (categories, 3) array of trend, seasonal and forecast (their sum, never negative).
+    """
+    weights = observed.astype(float)
+    counts = np.maximum(weights.sum(axis=1), 1)
+    x_mean = (weights * months).sum(axis=1) / counts
+    y_mean = (weights * history).sum(axis=1) / counts
+    x_centered = (months - x_mean[:, None]) * weights
+    spread = (x_centered * x_centered).sum(axis=1)
+    slope = np.divide((x_centered * (history - y_mean[:, None])).sum(axis=1), spread,
+                      out=np.zeros_like(spread), where=spread > 0)
+    intercept = y_mean - slope * x_mean
+    trend = intercept + slope * target
+
+    residuals = (history - (intercept[:, None] + slope[:, None] * months)) * weights
+    same_month = (months % SEASON_MONTHS) == (target % SEASON_MONTHS)
+    seasons = (weights[:, same_month]).sum(axis=1)
+    seasonal = np.divide(residuals[:, same_month].sum(axis=1), seasons, out=np.zeros_like(seasons),
+                         where=seasons > 0)
+    # A seasonal average needs the category to have been around for at least a year
+    seasonal[counts < SEASON_MONTHS] = 0
+    return np.column_stack([trend, seasonal, np.maximum(trend + seasonal, 0)])
+
+
+def _refit(cursor, categories: list[str], month: str) -> dict[str, tuple[float, float, float]]:
+    """Reads the stale categories' history before month from CategoryTotals and fits them together"""
+    rows = cursor.execute(HISTORY_QUERY.format(', '.join('?' * len(categories))), (month, *categories)).fetchall()
+    names, keys, amounts = zip(*rows)
+    row = pd.Index(categories).get_indexer(names)
+    numbers = np.array([month_number(key) for key in keys])
+    first = numbers.min()
+    months = np.arange(first, month_number(month))
+    history = np.zeros((len(categories), len(months)))
+    np.add.at(history, (row, numbers - first), amounts)
+    # A category only counts from the month it first appears
+    starts = np.full(len(categories), len(months))
+    np.minimum.at(starts, row, numbers - first)
+    observed = np.arange(len(months)) >= starts[:, None]
+    fitted = fit(months, history, observed, month_number(month))
+    logging.info(f"Fitted {len(categories)} categories over {len(months)} months for {month}")
+    return {category: tuple(values) for category, values in zip(categories, fitted.tolist())}
+
+
+def category_forecasts(year: int, month: int) -> pd.DataFrame:
+    """
+    Forecasts each category's spending for a month from every earlier month in Expenses.db.
+
+    Fits are cached per (category, month) and a category is only refitted when its history
+    before the month changed, so repeated calls only cost one GROUP BY over CategoryTotals.
+
+    Args:
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+
+    Returns:
+        pd.DataFrame: Trend, Seasonal and Forecast columns indexed by Category.
+    """
+    key = expense_db.month_key(year, month)
+    cursor = expense_db.get_connection().cursor()
+    fingerprints = {category: tuple(values) for category, *values in cursor.execute(FINGERPRINT_QUERY, (key,))}
+    with _fits_lock:
+        cached = {category: _fits.get((category, key)) for category in fingerprints}
+    stale = [category for category, entry in cached.items() if entry is None or entry[0] != fingerprints[category]]
+    fitted = {category: entry[1] for category, entry in cached.items() if category not in stale}
+    if stale:
+        refitted = _refit(cursor, stale, key)
+        fitted.update(refitted)
+        with _fits_lock:
+            for category, values in refitted.items():
+                _fits[(category, key)] = (fingerprints[category], values)
+    return pd.DataFrame.from_dict(fitted, orient='index', columns=['Trend', 'Seasonal', 'Forecast'],
+                                  dtype=float).rename_axis('Category').sort_index()
+
+
+def project_month(year: int, month: int, today: datetime.date | None = None) -> tuple[pd.DataFrame,
+                                                                                        tuple[float, float, float]]:
+    """
+    Projects a month's spending per category and the Available left at its end.
+
+    The days still to come are expected to follow each category's forecast pace, on top of what
+    was already spent: Projected = Spent + Forecast * days left / days in month.
+
+    Args:
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+        today (datetime.date | None, optional): The day the month is projected from. Default is today.
+
+    Returns:
+        tuple: Spent, Forecast and Projected per category, and the month's (available now, spending still
+        expected, projected end-of-month available).
+    """
+    today = today or datetime.date.today()
+    days = calendar.monthrange(year, month)[1]
+    if (today.year, today.month) == (year, month):
+        remaining = (days - today.day) / days
+    else:
+        remaining = 1.0 if (today.year, today.month) < (year, month) else 0.0
+    key = expense_db.month_key(year, month)
+    cursor = expense_db.get_connection().cursor()
+    spent = pd.Series(dict(cursor.execute(MONTH_QUERY, (key,)).fetchall()), name='Spent', dtype=float)
+    projection = category_forecasts(year, month).join(spent, how='outer').fillna(0)
+    projection['Projected'] = projection['Spent'] + projection['Forecast'] * remaining
+    available = (expense_db.get_balance(cursor, key) or (0, 0, 0))[1]
+    expected = float((projection['Projected'] - projection['Spent']).sum())
+    return projection[['Spent', 'Forecast', 'Projected']], (available, expected, available - expected)
+
+
+def clear() -> None:
+    """Drops every cached fit"""
+    with _fits_lock:
+        _fits.clear()
@@ -0,0 +1,300 @@
+import csv
+import datetime
+import functools
+import itertools
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Iterator
+
+import click
+
+import expense_db
+
+# Lower case keywords looked up in a statement line's description, first match wins
+CATEGORY_KEYWORDS = {
+    'Food': ['tesco', 'sainsbury', 'asda', 'aldi', 'lidl', 'morrisons', 'waitrose', 'restaurant', 'cafe', 'coffee',
+             'deliveroo', 'just eat', 'uber eats', 'mcdonald', 'greggs', 'pizza'],
+    'Entertainment': ['netflix', 'spotify', 'disney', 'cinema', 'odeon', 'vue', 'steam', 'playstation', 'xbox',
+                      'ticketmaster'],
+    'Business': ['hmrc', 'companies house', 'invoice', 'office', 'aws', 'google cloud', 'github'],
+    'Shopping': ['amazon', 'ebay', 'argos', 'ikea', 'primark', 'john lewis', 'currys', 'boots'],
+}
+DEFAULT_CATEGORY = 'Misc'
+CHUNK_ROWS = 50_000
+IMPORT_CACHE_SIZE = -256 * 1024  # KiB, negative values are a size rather than a page count
+
+STAGE_EXPENSES = "CREATE TEMP TABLE StagedExpenses (Date DATE, Category TEXT, Description TEXT, Amount FLOAT)"
+STAGE_CREDITS = "CREATE TEMP TABLE StagedCredits (Date DATE, Description TEXT, Amount FLOAT)"
+# Numbers the copies of each identical line in the statement and keeps the copies beyond those already
+# stored, so a line repeated within one statement (two coffees on the same day) is still imported twice.
+# What is stored is counted once over the statement's dates and joined, rather than counted per line.
+INSERT_NEW_EXPENSES = """
+    INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total)
+    WITH staged AS (
+        SELECT rowid, *, ROW_NUMBER() OVER (PARTITION BY Date, Category, Description, Amount ORDER BY rowid) AS Copy
+        FROM temp.StagedExpenses),
+    stored AS (
+        SELECT Date, Category, Description, Amount, COUNT(*) AS Copies FROM Transactions
+        WHERE Date BETWEEN (SELECT MIN(Date) FROM temp.StagedExpenses) AND (SELECT MAX(Date) FROM temp.StagedExpenses)
+        GROUP BY Date, Category, Description, Amount)
+    SELECT Date, Category, Description, Amount, 0, 0
+    FROM staged LEFT JOIN stored USING (Date, Category, Description, Amount)
+    WHERE Copy > COALESCE(Copies, 0)
+    ORDER BY rowid
+"""
+INSERT_NEW_CREDITS = """
+    INSERT INTO ImportedCredits (Date, Description, Amount)
+    WITH staged AS (
+        SELECT rowid, *, ROW_NUMBER() OVER (PARTITION BY Date, Description, Amount ORDER BY rowid) AS Copy
+        FROM temp.StagedCredits),
+    stored AS (
+        SELECT Date, Description, Amount, COUNT(*) AS Copies FROM ImportedCredits
+        WHERE Date BETWEEN (SELECT MIN(Date) FROM temp.StagedCredits) AND (SELECT MAX(Date) FROM temp.StagedCredits)
+        GROUP BY Date, Description, Amount)
+    SELECT Date, Description, Amount FROM staged LEFT JOIN stored USING (Date, Description, Amount)
+    WHERE Copy > COALESCE(Copies, 0)
+    ORDER BY rowid
+"""
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+# A statement line: ('YYYY-MM-DD', category or None, description, signed amount), negative amounts are spending
+Line = tuple[str, str | None, str, float]
+
+
+def date_parser(date_format: str):
+    """
+    Returns a function turning statement dates into the 'YYYY-MM-DD' strings stored in Transactions.
+
+    Statements repeat the same few hundred dates, so results are memoised instead of calling strptime per row.
+
+    Args:
+        date_format (str): The strptime format the statement uses, e.g. '%d/%m/%Y'.
+    """
+    @functools.lru_cache(maxsize=8192)
+    def parse(text: str) -> str:
+        return datetime.datetime.strptime(text.strip(), date_format).strftime('%Y-%m-%d')
+    return parse
+
+
+def parse_amount(text: str) -> float:
+    """Parses amounts such as '-1,234.50' or '£12.00', empty cells count as 0"""
+    text = text.replace(',', '').replace('£', '').strip()
+    return float(text) if text else 0.0
+
+
+def categorizer(rules: dict[str, list[str]]):
+    """
+    Returns a function mapping a description to a category using keyword rules.
+
+    Args:
+        rules (dict[str, list[str]]): Category to lower case keywords, checked in order.
+    """
+    keywords = [(keyword.lower(), category) for category, words in rules.items() for keyword in words]
+
+    @functools.lru_cache(maxsize=65536)
+    def categorize(description: str) -> str:
+        lowered = description.lower()
+        for keyword, category in keywords:
+            if keyword in lowered:
+                return category
+        return DEFAULT_CATEGORY
+    return categorize
+
+
+def read_csv(path: str, date_column: str = 'Date', amount_column: str = 'Amount',
+             description_column: str = 'Description', category_column: str | None = None,
+             date_format: str = '%Y-%m-%d', chunk_rows: int = CHUNK_ROWS) -> Iterator[list[Line]]:
+    """
+    Streams a CSV bank statement in chunks of statement lines.
+
+    Args:
+        path (str): The CSV file, with a header row.
+        date_column (str, optional): Header of the date column. Default is 'Date'.
+        amount_column (str, optional): Header of the signed amount column. Default is 'Amount'.
+        description_column (str, optional): Header of the description column. Default is 'Description'.
+        category_column (str | None, optional): Header of a category column, if the bank provides one.
+        date_format (str, optional): strptime format of the dates. Default is '%Y-%m-%d'.
+        chunk_rows (int, optional): Lines per chunk. Default is 50,000.
+
+    Yields:
+        list[Line]: The next chunk of statement lines.
+    """
+    parse_date = date_parser(date_format)
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        header = [column.strip() for column in next(reader)]
+        try:
+            date_index = header.index(date_column)
+            amount_index = header.index(amount_column)
+            description_index = header.index(description_column)
+            category_index = header.index(category_column) if category_column else None
+        except ValueError as error:
+            raise ValueError(f"{path}: {error}, columns are {header}") from None
+        while chunk := list(itertools.islice(reader, chunk_rows)):
+            yield [(parse_date(row[date_index]),
+                    (row[category_index].strip() or None) if category_index is not None else None,
+                    row[description_index].strip(),
+                    parse_amount(row[amount_index])) for row in chunk if row]
+
+
+def _ofx_tags(file, block_size: int = 1 << 20) -> Iterator[tuple[bool, str, str]]:
+    """Yields (is_closing, tag, value) for every tag, reading the file in blocks so single line OFX files stream too"""
+    buffer = ''
+    while block := file.read(block_size):
+        buffer += block
+        # A tag's value runs up to the next '<', so only the text before the last '<' is complete
+        cut = buffer.rfind('<')
+        for match in OFX_TAG.finditer(buffer, 0, cut):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+    for match in OFX_TAG.finditer(buffer):
+        yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+
+
+def read_ofx(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[list[Line]]:
+    """
+    Streams the <STMTTRN> entries of an OFX (1.x SGML or 2.x XML) statement in chunks of statement lines.
+
+    Args:
+        path (str): The OFX file.
+        chunk_rows (int, optional): Lines per chunk. Default is 50,000.
+
+    Yields:
+        list[Line]: The next chunk of statement lines.
+    """
+    chunk: list[Line] = []
+    entry: dict[str, str] | None = None
+    with open(path, encoding='utf-8', errors='replace') as file:
+        for closing, tag, value in _ofx_tags(file):
+            if tag == 'STMTTRN':
+                if not closing:
+                    entry = {}
+                elif entry is not None:
+                    posted = entry['DTPOSTED']
+                    chunk.append((f'{posted[:4]}-{posted[4:6]}-{posted[6:8]}', None,
+                                  entry.get('NAME') or entry.get('MEMO', ''), parse_amount(entry['TRNAMT'])))
+                    entry = None
+                    if len(chunk) >= chunk_rows:
+                        yield chunk
+                        chunk = []
+            elif entry is not None and not closing and value:
+                entry[tag] = value
+    if chunk:
+        yield chunk
+
+
+def import_lines(connection: sqlite3.Connection, chunks: Iterator[list[Line]], rules: dict[str, list[str]]) -> dict:
+    """
+    Inserts statement lines into Transactions in one transaction and rebuilds every month they touched.
+
+    Lines are staged chunk by chunk with executemany, then only those not already imported are
+    written, so statements that overlap a previous import can be imported again. A line counts as
+    already imported when as many identical (Date, Category, Description, Amount) expenses, or
+    identical credits, are already stored as the statement holds. Spending is inserted without
+    balances, money coming in is recorded in ImportedCredits and added to the month's deposit.
+    Once everything is in, each month that gained lines has its running balances and ledger row
+    recomputed once.
+
+    Args:
+        connection (sqlite3.Connection): The Expenses.db connection to write with.
+        chunks (Iterator[list[Line]]): Statement lines from read_csv() or read_ofx().
+        rules (dict[str, list[str]]): Keyword rules for lines without a category.
+
+    Returns:
+        dict: 'expenses' and 'deposits' imported, lines 'skipped' as already imported and the 'months' rebuilt.
+    """
+    categorize = categorizer(rules)
+    staged = 0
+    cursor = connection.cursor()
+    # Keep the pages written by the inserts in memory so rebuilding the months doesn't reread them
+    cache_size = cursor.execute('PRAGMA cache_size').fetchone()[0]
+    cursor.execute(f'PRAGMA cache_size = {IMPORT_CACHE_SIZE}')
+    try:
+        cursor.execute(STAGE_EXPENSES)
+        cursor.execute(STAGE_CREDITS)
+        for chunk in chunks:
+            expenses, credits = [], []
+            for date, category, description, amount in chunk:
+                if amount > 0:
+                    credits.append((date, description, amount))
+                elif amount < 0:
+                    expenses.append((date, category or categorize(description), description or 'N/A', -amount))
+            cursor.executemany("INSERT INTO temp.StagedExpenses VALUES (?, ?, ?, ?)", expenses)
+            cursor.executemany("INSERT INTO temp.StagedCredits VALUES (?, ?, ?)", credits)
+            staged += len(expenses) + len(credits)
+            logging.info(f"Staged {staged} statement lines so far")
+
+        last_id = cursor.execute("SELECT COALESCE(MAX(Id), 0) FROM Transactions").fetchone()[0]
+        last_credit = cursor.execute("SELECT COALESCE(MAX(rowid), 0) FROM ImportedCredits").fetchone()[0]
+        expenses = cursor.execute(INSERT_NEW_EXPENSES).rowcount
+        deposits = cursor.execute(INSERT_NEW_CREDITS).rowcount
+        months = dict(cursor.execute("SELECT substr(Date, 1, 7), 0 FROM Transactions WHERE Id > ? GROUP BY 1",
+                                     (last_id,)).fetchall())
+        months.update(cursor.execute("SELECT substr(Date, 1, 7), SUM(Amount) FROM ImportedCredits WHERE rowid > ? "
+                                     "GROUP BY 1", (last_credit,)).fetchall())
+        for month, credited in sorted(months.items()):
+            expense_db.rebuild_month(cursor, int(month[:4]), int(month[5:]), credited)
+        connection.commit()
+    except sqlite3.Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS temp.StagedExpenses")
+        cursor.execute("DROP TABLE IF EXISTS temp.StagedCredits")
+        cursor.execute(f'PRAGMA cache_size = {cache_size}')
+    skipped = staged - expenses - deposits
+    logging.info(f"Imported {expenses} expenses and {deposits} deposits across {len(months)} months, "
+                 f"skipped {skipped} lines already imported")
+    return {'expenses': expenses, 'deposits': deposits, 'skipped': skipped, 'months': len(months)}
+
+
+@click.command(name='expense-import', help="Import CSV/OFX bank statements into Expenses.db")
+@click.argument('files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('-f', '--format', 'file_format', default='auto', type=click.Choice(['auto', 'csv', 'ofx']),
+              help='Statement format (default: from the file extension)')
+@click.option('--date-column', default='Date', help='CSV header of the date column')
+@click.option('--amount-column', default='Amount', help='CSV header of the signed amount column')
+@click.option('--description-column', default='Description', help='CSV header of the description column')
+@click.option('--category-column', default=None, help='CSV header of a category column, if any')
+@click.option('--date-format', default='%Y-%m-%d', help='strptime format of CSV dates')
+@click.option('-r', '--rules', type=click.Path(exists=True, dir_okay=False),
+              help='JSON file of {"Category": ["keyword", ...]} replacing the built in rules')
+@click.option('-d', '--database', default=expense_db.DATABASE, type=click.Path(dir_okay=False),
+              help='Expenses database to import into')
+def import_statements(files, file_format, date_column, amount_column, description_column, category_column,
+                      date_format, rules, database):
+    try:
+        keyword_rules = CATEGORY_KEYWORDS
+        if rules:
+            with open(rules) as file:
+                keyword_rules = json.load(file)
+        expense_db.use_database(database)
+        expense_db.create_database()
+        connection = expense_db.get_connection()
+        for path in files:
+            kind = file_format if file_format != 'auto' else os.path.splitext(path)[1].lower().lstrip('.')
+            if kind == 'ofx':
+                chunks = read_ofx(path)
+            elif kind == 'csv':
+                chunks = read_csv(path, date_column, amount_column, description_column, category_column, date_format)
+            else:
+                raise click.ClickException(f"Can't tell the format of {path}, pass --format")
+            start = time.perf_counter()
+            result = import_lines(connection, chunks, keyword_rules)
+            elapsed = time.perf_counter() - start
+            rows = result['expenses'] + result['deposits'] + result['skipped']
+            click.echo(f"{path}: {result['expenses']} expenses, {result['deposits']} deposits, "
+                       f"{result['skipped']} already imported, {result['months']} months rebuilt "
+                       f"({rows / elapsed:,.0f} rows/sec)")
+    except (OSError, ValueError, KeyError, sqlite3.Error, click.ClickException) as error:
+        click.echo(f"An error occurred: {error}")
+    finally:
+        expense_db.close()
+
+
+if __name__ == '__main__':
+    import_statements()
@@ -0,0 +1,152 @@
+import datetime
+import logging
+import sqlite3
+import sys
+from typing import TYPE_CHECKING
+
+import expense_db
+
+if TYPE_CHECKING:
+    from expense_analytics import ExpenseStore
+
+DEPOSIT = 'MONTHLY DEPOSIT!'
+
+
+class ExpenseError(ValueError):
+    """An operation the ledger refuses, e.g. a deduction with no deposit or not enough left for it"""
+
+
+def _written(connection: sqlite3.Connection, date: datetime.date, commit: bool) -> None:
+    """Commits a write unless the caller batches several, and drops the month's cached reports"""
+    if commit:
+        connection.commit()
+    # Reports are imported lazily, a process that never loaded them has no cache to drop
+    reports = sys.modules.get('expense_reports')
+    if reports is not None:
+        reports.invalidate(date.year, date.month)
+
+
+def deposit(date: datetime.date, value: float, commit: bool = True) -> tuple[float, float]:
+    """
+    Adds a deposit to a month, topping up the month's deposit when it already has one.
+
+    Args:
+        date (datetime.date): The date of the deposit.
+        value (float): The amount deposited.
+        commit (bool, optional): Commit straight away. Default is True, batches pass False and commit once.
+
+    Returns:
+        tuple[float, float]: The month's new available and total deposited amounts.
+    """
+    if value <= 0:
+        raise ExpenseError("Amount should be greater than 0!")
+    connection = expense_db.get_connection()
+    cursor = connection.cursor()
+    month_start, month_end = expense_db.month_bounds(date.year, date.month)
+    month = expense_db.month_key(date.year, date.month)
+    existing_values = expense_db.get_balance(cursor, month)
+    if existing_values:
+        initial_amount, existing_available, _ = existing_values
+        new_available, new_total = existing_available + value, initial_amount + value
+        # Update the existing deposit record
+        cursor.execute("UPDATE Transactions SET Date = ?, Amount = ?, Available = ?, Total = ? "
+                       "WHERE Date >= ? AND Date < ? AND Category = ?",
+                       (date.strftime('%Y-%m-%d'), value, new_available, new_total, month_start, month_end, DEPOSIT))
+    else:
+        new_available = new_total = value
+        cursor.execute("INSERT INTO Transactions (Date, Category, Amount, Available, Total) VALUES (?, ?, ?, ?, ?)",
+                       (date.strftime('%Y-%m-%d'), DEPOSIT, value, value, value))
+    expense_db.record_deposit(cursor, month, value)
+    _written(connection, date, commit)
+    logging.info(f"Deposited {value} for {month}")
+    return new_available, new_total
+
+
+def deduct(date: datetime.date, category: str, value: float, description: str = '', commit: bool = True) -> float:
+    """
+    Records an expense against its month's deposit.
+
+    Args:
+        date (datetime.date): The date of the expense.
+        category (str): The expense category.
+        value (float): The amount spent.
+        description (str, optional): What it was spent on. Default is 'N/A'.
+        commit (bool, optional): Commit straight away. Default is True, batches pass False and commit once.
+
+    Returns:
+        float: What is left of the month's deposit.
+    """
+    if value <= 0 or category.strip() == "":
+        raise ExpenseError("Invalid Entry!\n(check value > 0 & category is not empty)")
+    connection = expense_db.get_connection()
+    cursor = connection.cursor()
+    existing_values = expense_db.get_balance(cursor, expense_db.month_key(date.year, date.month))
+    if existing_values is None:
+        raise ExpenseError(f"No deposit made for the month {date.strftime('%B')}")
+    existing_total, existing_available, _ = existing_values
+    if value > existing_available:
+        raise ExpenseError("Insufficient Funds!")
+    new_available = existing_available - value
+    date_str = date.strftime('%Y-%m-%d')
+    cursor.execute("INSERT INTO Transactions (Date, Category, Description, Amount, Available, Total) "
+                   "VALUES (?, ?, ?, ?, ?, ?)",
+                   (date_str, category, description.strip() or "N/A", value, new_available, existing_total))
+    expense_db.record_expense(cursor, date_str, category, value)
+    _written(connection, date, commit)
+    logging.info(f"Deducted {value} for {category} on {date_str}")
+    return new_available
+
+
+def delete(date: datetime.date, category: str, commit: bool = True) -> int:
+    """
+    Deletes a day's expenses of one category, refunding them, or the month's deposit with its ledger.
+
+    Args:
+        date (datetime.date): The day to delete from, any day of the month for the deposit.
+        category (str): The category to delete, or 'MONTHLY DEPOSIT!'.
+        commit (bool, optional): Commit straight away. Default is True, batches pass False and commit once.
+
+    Returns:
+        int: The number of transactions deleted.
+    """
+    connection = expense_db.get_connection()
+    cursor = connection.cursor()
+    if category == DEPOSIT:
+        month_start, month_end = expense_db.month_bounds(date.year, date.month)
+        deleted = cursor.execute("DELETE FROM Transactions WHERE Date >= ? AND Date < ? AND Category = ?",
+                                 (month_start, month_end, DEPOSIT)).rowcount
+        if deleted:
+            expense_db.remove_month(cursor, expense_db.month_key(date.year, date.month))
+    else:
+        date_str, category = date.strftime('%Y-%m-%d'), category.capitalize()
+        amount, deleted = cursor.execute(
+            "SELECT SUM(Amount), COUNT(*) FROM Transactions WHERE Date = ? AND Category = ?",
+            (date_str, category)).fetchone()
+        if deleted:
+            cursor.execute("DELETE FROM Transactions WHERE Date = ? AND Category = ?", (date_str, category))
+            # Refund the deleted expenses to the month's balance
+            expense_db.record_expense(cursor, date_str, category, -amount, -deleted)
+    if not deleted:
+        raise ExpenseError(f"{date} data not found!")
+    _written(connection, date, commit)
+    logging.info(f"Deleted {deleted} {category} transactions for {date}")
+    return deleted
+
+
+def month_view(date: datetime.date) -> tuple['ExpenseStore', tuple[float, float, float]]:
+    """
+    Loads what view lists: the transactions from a day to the end of its month, with the month's balance.
+
+    Args:
+        date (datetime.date): The first day to include.
+
+    Returns:
+        tuple: The ExpenseStore of the range and the month's deposited, available and spent
+        amounts (zeros if nothing was deposited).
+    """
+    from expense_analytics import ExpenseStore
+
+    month_end = expense_db.month_bounds(date.year, date.month)[1]
+    store = ExpenseStore.load(date.strftime('%Y-%m-%d'), month_end)
+    cursor = expense_db.get_connection().cursor()
+    return store, expense_db.get_balance(cursor, expense_db.month_key(date.year, date.month)) or (0, 0, 0)
@@ -0,0 +1,169 @@
+import calendar
+import logging
+import os
+import threading
+
+import pandas as pd
+
+import expense_db
+import expense_export
+from expense_analytics import ExpenseStore
+
+# File names each report is saved under, matching what the GUI has always uploaded
+REPORT_FILES = {
+    'Excel': '{month}_sheet.xlsx',
+    'Pandas': '{month}_pandas_file.csv',
+    'CSV': '{month}_pandas_file.csv',
+    'Pie Chart': '{month}_Pie_Chart.png',
+    'Bar Graph': '{month}_Bar_Graph.png',
+    'Line Chart': '{month}_Line_Chart.png',
+    'Histogram': '{month}_Histogram.png',
+    'Monthly': '{month} {year} summary.png',
+}
+YEARLY_FILE = '{year} summary.png'
+
+_month_cache: dict[tuple[int, int], tuple[ExpenseStore, tuple[float, float, float]]] = {}
+_cache_lock = threading.Lock()
+_seen = threading.local()
+
+
+def _check_data_version(connection) -> None:
+    """
+    Empties the cache if another connection committed since this thread last read.
+
+    PRAGMA data_version only changes for commits made through other connections, which
+    covers worker threads and processes reading while the GUI writes. Writes through the
+    reading connection itself still go through invalidate().
+    """
+    version = connection.execute('PRAGMA data_version').fetchone()[0]
+    if getattr(_seen, 'connection', None) is not connection or _seen.version != version:
+        with _cache_lock:
+            _month_cache.clear()
+        _seen.connection, _seen.version = connection, version
+
+
+def _load(year: int, month: int) -> tuple[ExpenseStore, tuple[float, float, float]]:
+    """Reads a month into an ExpenseStore along with its ledger balance once, cached until the month is written to"""
+    key = (year, month)
+    connection = expense_db.get_connection()
+    _check_data_version(connection)
+    with _cache_lock:
+        cached = _month_cache.get(key)
+    if cached is None:
+        store = ExpenseStore.load(*expense_db.month_bounds(year, month))
+        balance = expense_db.get_balance(connection.cursor(), expense_db.month_key(year, month)) or (0, 0, 0)
+        cached = (store, balance)
+        with _cache_lock:
+            _month_cache[key] = cached
+        logging.info(f"Loaded {len(store.dates)} transactions for {year}-{month:02d}")
+    return cached
+
+
+def load_store(year: int, month: int) -> ExpenseStore:
+    """
+    Returns the month's transactions as a columnar ExpenseStore, which every monthly report queries.
+
+    Args:
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+
+    Returns:
+        ExpenseStore: The cached month, shared between callers and never modified.
+    """
+    return _load(year, month)[0]
+
+
+def load_balance(year: int, month: int) -> tuple[float, float, float]:
+    """Returns the month's (Deposited, Available, Spent) ledger balance, zeros if nothing was deposited"""
+    return _load(year, month)[1]
+
+
+def invalidate(year: int, month: int) -> None:
+    """Drops a month from the cache, called after every write to that month"""
+    with _cache_lock:
+        _month_cache.pop((year, month), None)
+
+
+def yearly_category_totals(year: int) -> pd.Series:
+    """Returns the amount spent per category over a year, summed from the per-month CategoryTotals"""
+    totals = expense_db.get_category_totals(expense_db.get_connection().cursor(), year)
+    return pd.Series(dict(totals), name='Amount', dtype='float64').rename_axis('Category')
+
+
+def daily_spending(year: int, month: int) -> pd.Series:
+    """Returns the amount spent per day of a month, indexed by day number, from the DailySpend aggregate"""
+    daily = expense_db.get_daily_spend(expense_db.get_connection().cursor(), year, month)
+    return pd.Series({int(date[8:10]): amount for date, amount in daily}, name='Amount', dtype='float64')
+
+
+def yearly_balances(year: int) -> pd.DataFrame:
+    """Returns the year's ledger rows as Deposited, Available and Spent columns indexed by month number"""
+    balances = pd.DataFrame(expense_db.get_balances(expense_db.get_connection().cursor(), year),
+                            columns=['Month', 'Deposited', 'Available', 'Spent'])
+    balances.index = balances['Month'].str[5:].astype(int)
+    return balances
+
+
+def export_report(report: str, year: int, month: int, directory: str = '') -> str | None:
+    """
+    Writes one monthly report (spreadsheet, chart or monthly summary) to a directory.
+
+    Args:
+        report (str): One of the REPORT_FILES report types.
+        year (int): The year of the month.
+        month (int): The month number (1-12).
+        directory (str, optional): Where to write the file. Default is the working directory.
+
+    Returns:
+        str | None: The path written, or None if the month has no transactions.
+    """
+    month_name = calendar.month_name[month]
+    path = os.path.join(directory, REPORT_FILES[report].format(month=month_name, year=year))
+
+    if report in ('Excel', 'CSV', 'Pandas'):
+        # Spreadsheets stream straight from the database instead of going through the cached frame
+        if not expense_export.export_range('xlsx' if report == 'Excel' else 'csv', path,
+                                           *expense_db.month_bounds(year, month)):
+            return None
+    elif (store := load_store(year, month)).empty:
+        return None
+    else:
+        import expense_charts  # Only charts need matplotlib, headless spreadsheet exports never load it
+
+        if report == 'Pie Chart':
+            expense_charts.pie_chart(store, load_balance(year, month), month_name, year, path)
+        elif report == 'Bar Graph':
+            expense_charts.bar_graph(store, month_name, year, path)
+        elif report == 'Line Chart':
+            expense_charts.line_chart(store, month_name, year, path)
+        elif report == 'Histogram':
+            expense_charts.histogram(store, path)
+        elif report == 'Monthly':
+            expense_charts.monthly_summary(store, daily_spending(year, month), load_balance(year, month),
+                                           month_name, year, path)
+    logging.info(f"{report} for {month_name} {year} written to {path}")
+    return path
+
+
+def export_yearly(year: int, month: str = '', directory: str = '') -> str | None:
+    """
+    Writes the yearly summary chart to a directory.
+
+    Args:
+        year (int): The year to summarise.
+        month (str, optional): The month selected in the GUI, shown in the category chart title.
+        directory (str, optional): Where to write the file. Default is the working directory.
+
+    Returns:
+        str | None: The path written, or None if the year has no transactions.
+    """
+    category_totals = yearly_category_totals(year)
+    balances = yearly_balances(year)
+    if category_totals.empty and balances.empty:
+        return None
+    import expense_charts
+
+    path = os.path.join(directory, YEARLY_FILE.format(year=year))
+    expense_charts.yearly_summary(category_totals, balances, month, year, path)
+    logging.info(f"Yearly summary for {year} written to {path}")
+    return path
@@ -0,0 +1,275 @@
+import logging
+import os
+import sqlite3
+
+import sqlite_pool
+from password_search import EntryIndex
+from password_vault import Vault
+from sqlite_pool import ConnectionPool
+
+DATABASE = 'Passwords.db'
+# Where the master password lived in plain text before the vault, read once to create the vault
+LEGACY_MASTER = 'master.txt'
+
+pool = ConnectionPool(DATABASE)
+vault = Vault()
+# Built when the vault is unlocked and kept in step by add, update and delete
+index = EntryIndex()
+
+# add, edit, delete and search all look entries up by (USERNAME, ACCOUNT), or USERNAME alone,
+# which the unique index answers with a seek instead of a full scan of the vault. Duplicates
+# from before the index existed are dropped first, keeping the oldest entry.
+MIGRATIONS = [
+    ["DELETE FROM manager WHERE rowid NOT IN (SELECT MIN(rowid) FROM manager GROUP BY USERNAME, ACCOUNT)",
+     "CREATE UNIQUE INDEX IF NOT EXISTS idx_manager_username_account ON manager (USERNAME, ACCOUNT)"],
+    # PASSWORD holds nonce + AES-GCM ciphertext blobs from here on, the vault row keeps the KDF parameters
+    ["CREATE TABLE IF NOT EXISTS vault (Salt BLOB NOT NULL, N INTEGER NOT NULL, R INTEGER NOT NULL, "
+     "P INTEGER NOT NULL, Verifier BLOB NOT NULL)"],
+    # Change log for incremental backups (see password_sync): every key an insert, update or delete
+    # touched, in order. sync_state keeps what was last backed up.
+    ["CREATE TABLE IF NOT EXISTS changes (Seq INTEGER PRIMARY KEY AUTOINCREMENT, USERNAME TEXT NOT NULL, "
+     "ACCOUNT TEXT NOT NULL)",
+     "CREATE TABLE IF NOT EXISTS sync_state (Name TEXT PRIMARY KEY, Value)",
+     "CREATE TRIGGER IF NOT EXISTS manager_insert AFTER INSERT ON manager BEGIN "
+     "INSERT INTO changes (USERNAME, ACCOUNT) VALUES (NEW.USERNAME, NEW.ACCOUNT); END",
+     "CREATE TRIGGER IF NOT EXISTS manager_update AFTER UPDATE ON manager BEGIN "
+     "INSERT INTO changes (USERNAME, ACCOUNT) VALUES (OLD.USERNAME, OLD.ACCOUNT), (NEW.USERNAME, NEW.ACCOUNT); END",
+     "CREATE TRIGGER IF NOT EXISTS manager_delete AFTER DELETE ON manager BEGIN "
+     "INSERT INTO changes (USERNAME, ACCOUNT) VALUES (OLD.USERNAME, OLD.ACCOUNT); END"],
+]
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns the current thread's long-lived connection to Passwords.db"""
+    return pool.connect()
+
+
+def close() -> None:
+    """Closes every pooled connection to Passwords.db and locks the vault"""
+    vault.lock()
+    index.clear()
+    pool.close_all()
+
+
+def use_database(database: str) -> None:
+    """
+    Points the connection pool at another database file.
+
+    Args:
+        database (str): Path to the SQLite database file.
+    """
+    pool.database = database
+
+
+def unlock(password: str, create: bool = False) -> bool:
+    """
+    Unlocks the vault for the session with the master password.
+
+    The first unlock creates the vault. With master.txt present the password has to match it, and
+    the file is deleted afterwards. Without it, a vault is only created for a database with no
+    entries yet and when create says the caller had the new master password confirmed, so
+    existing entries are never encrypted under an unverified password. Any entries still stored
+    in plain text are encrypted on unlock, and the search index is built from the usernames and
+    accounts.
+
+    Args:
+        password (str): The master password.
+        create (bool, optional): Set a new master password if there is no vault. Default is False.
+
+    Returns:
+        bool: True if the password is correct and the vault is unlocked.
+    """
+    connection = get_connection()
+    already_unlocked = vault.unlocked
+    stored = connection.execute("SELECT Salt, N, R, P, Verifier FROM vault").fetchone()
+    legacy = stored is None and os.path.exists(LEGACY_MASTER)
+    if stored is None:
+        if legacy:
+            with open(LEGACY_MASTER, "r") as file:
+                if password != file.readline().strip():
+                    return False
+        elif not create:
+            return False
+        elif connection.execute("SELECT 1 FROM manager LIMIT 1").fetchone():
+            logging.error(f"Not creating a vault over existing entries without {LEGACY_MASTER} to verify the "
+                          f"master password against")
+            return False
+        with connection:
+            connection.execute("INSERT INTO vault VALUES (?, ?, ?, ?, ?)", vault.create(password))
+    elif not vault.unlock(password, *stored):
+        return False
+    if already_unlocked:
+        return True
+    _encrypt_plaintext(connection)
+    index.rebuild(connection.execute("SELECT USERNAME, ACCOUNT FROM manager"))
+    if legacy:
+        os.remove(LEGACY_MASTER)
+        logging.info(f"Moved the master password from {LEGACY_MASTER} into the vault")
+    return True
+
+
+def needs_new_master() -> bool:
+    """Returns True when there is no vault and no master.txt, so unlock() needs a confirmed new master password"""
+    return get_connection().execute("SELECT 1 FROM vault").fetchone() is None and not os.path.exists(LEGACY_MASTER)
+
+
+def unlocked() -> bool:
+    """Returns True once the vault was unlocked this session"""
+    return vault.unlocked
+
+
+def _encrypt_plaintext(connection: sqlite3.Connection) -> None:
+    """Encrypts entries written before the vault existed"""
+    rows = connection.execute("SELECT rowid, USERNAME, ACCOUNT, PASSWORD FROM manager "
+                              "WHERE typeof(PASSWORD) = 'text'").fetchall()
+    if rows:
+        with connection:
+            connection.executemany("UPDATE manager SET PASSWORD=? WHERE rowid=?",
+                                   ((vault.encrypt(username, account, password), rowid)
+                                    for rowid, username, account, password in rows))
+        logging.info(f"Encrypted {len(rows)} plain text entries")
+
+
+def _decrypted(rows: list[tuple[str, str, bytes]]) -> list[tuple[str, str, str]]:
+    return [(username, account, vault.decrypt(username, account, token)) for username, account, token in rows]
+
+
+def search(query: str, limit: int = 20) -> list[tuple[str, str]]:
+    """
+    Finds entries by a partly typed, possibly misspelled username or account, for search-as-you-type.
+
+    Args:
+        query (str): What was typed so far.
+        limit (int, optional): Most entries to return. Default is 20.
+
+    Returns:
+        list[tuple[str, str]]: Matching (username, account) pairs, best first, empty while the vault is locked.
+    """
+    return index.search(query, limit)
+
+
+def find(username: str, account: str) -> tuple[str, str, str] | None:
+    """Returns the decrypted (USERNAME, ACCOUNT, PASSWORD) entry for a username and account, None if there is none"""
+    row = get_connection().execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager WHERE USERNAME=? AND ACCOUNT=?",
+                                   (username, account)).fetchone()
+    return row and _decrypted([row])[0]
+
+
+def find_username(username: str) -> list[tuple[str, str, str]]:
+    """Returns every decrypted (USERNAME, ACCOUNT, PASSWORD) entry saved under a username"""
+    return _decrypted(get_connection().execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager WHERE USERNAME=?",
+                                               (username,)).fetchall())
+
+
+def entries() -> list[tuple[str, str, str]]:
+    """Returns every decrypted (USERNAME, ACCOUNT, PASSWORD) entry ordered by username"""
+    return _decrypted(get_connection().execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager "
+                                               "ORDER BY USERNAME ASC, ACCOUNT ASC").fetchall())
+
+
+def count() -> int:
+    """Returns how many entries the vault holds"""
+    return get_connection().execute("SELECT COUNT(*) FROM manager").fetchone()[0]
+
+
+def page(offset: int, limit: int) -> list[tuple[str, str, str]]:
+    """
+    Returns one page of decrypted entries in the order entries() lists them, for views that scroll lazily.
+
+    Args:
+        offset (int): How many entries to skip.
+        limit (int): Most entries to return.
+
+    Returns:
+        list[tuple[str, str, str]]: The (USERNAME, ACCOUNT, PASSWORD) entries of the page.
+    """
+    return _decrypted(get_connection().execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager "
+                                               "ORDER BY USERNAME ASC, ACCOUNT ASC LIMIT ? OFFSET ?",
+                                               (limit, offset)).fetchall())
+
+
+def add_entry(username: str, account: str, password: str) -> bool:
+    """
+    Encrypts and saves a new entry, the vault has to be unlocked.
+
+    Args:
+        username (str): The entry's username.
+        account (str): The entry's account.
+        password (str): The entry's password.
+
+    Returns:
+        bool: True if it was added, False if the (username, account) pair already exists.
+    """
+    connection = get_connection()
+    try:
+        with connection:
+            connection.execute("INSERT INTO manager VALUES(?, ?, ?)",
+                               (username, account, vault.encrypt(username, account, password)))
+        index.add(username, account)
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+
+def update_entry(username: str, account: str, new_username: str, new_account: str, new_password: str) -> bool:
+    """
+    Replaces an entry's username, account and password, re-encrypting the password for the new pair.
+
+    Args:
+        username (str): The username of the entry to update.
+        account (str): The account of the entry to update.
+        new_username (str): The new username.
+        new_account (str): The new account.
+        new_password (str): The new password.
+
+    Returns:
+        bool: True if the entry was updated, False if it doesn't exist or the new pair belongs to another entry.
+    """
+    connection = get_connection()
+    try:
+        with connection:
+            cursor = connection.execute("UPDATE manager SET ACCOUNT=?, USERNAME=?, PASSWORD=? "
+                                        "WHERE USERNAME=? AND ACCOUNT=?",
+                                        (new_account, new_username,
+                                         vault.encrypt(new_username, new_account, new_password), username, account))
+        if not cursor.rowcount:
+            return False
+        index.remove(username, account)
+        index.add(new_username, new_account)
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+
+def delete_entry(username: str, account: str) -> bool:
+    """Deletes the entry for a username and account, returning False if there was none"""
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute("DELETE FROM manager WHERE USERNAME=? AND ACCOUNT=?", (username, account))
+    if not cursor.rowcount:
+        return False
+    index.remove(username, account)
+    return True
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """Applies any of MIGRATIONS newer than the database's user_version"""
+    sqlite_pool.migrate(connection, MIGRATIONS)
+
+
+def create_database():
+    try:
+        connection = get_connection()
+        cursor = connection.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS manager
+            (USERNAME      TEXT    NOT NULL,
+            ACCOUNT           TEXT    NOT NULL,
+            PASSWORD           TEXT     NOT NULL);'''
+                       )
+        connection.commit()
+        migrate(connection)
+        logging.info('Created database!')
+    except sqlite3.DatabaseError as error:
+        logging.info(f'Error creating database! {error}')
@@ -0,0 +1,292 @@
+import collections
+import logging
+import math
+import random
+import secrets
+import string
+from typing import Iterator
+
+import numpy as np
+
+from Passwordgenerator import BATCH_SIZE, generate_batch
+
+# Characters easily mistaken for one another when read out or typed from a printout
+AMBIGUOUS = "Il1|O0o`'\".,;:"
+CONSONANTS = 'bcdfghjklmnprstvz'
+VOWELS = 'aeiou'
+MODES = ['random', 'pronounceable', 'passphrase']
+# Below this share of passwords meeting the minimums, random mode stops drawing and discarding
+# whole passwords and builds them class by class instead
+MIN_ACCEPTANCE = 0.05
+
+MIN_LENGTH = 8
+LOW_ENTROPY = 50
+# Characters of each password entropy() looks at, anything longer is strong either way and would
+# only widen the array every other password is padded to
+SCORED_LENGTH = 64
+# The most common leaked passwords, lower case
+COMMON_PASSWORDS = frozenset([
+    '123456', '123456789', '12345678', '12345', '1234567', '1234567890', '111111', '000000', '123123',
+    '654321', '666666', '121212', '112233', 'password', 'password1', 'password123', 'passw0rd', 'qwerty',
+    'qwerty123', 'qwertyuiop', '1q2w3e4r', '1qaz2wsx', 'abc123', 'iloveyou', 'admin', 'welcome', 'letmein',
+    'monkey', 'dragon', 'football', 'baseball', 'sunshine', 'princess', 'master', 'shadow', 'superman',
+    'trustno1', 'michael', 'charlie', 'login', 'starwars', 'whatever', 'zaq12wsx', 'asdfghjkl', 'hello123',
+])
+
+# Class of every ASCII code point: 0 padding, 1 lower, 2 upper, 3 digit, 4 special, 5 anything else
+# (control characters and everything past ASCII), with the size of each class's alphabet
+CLASS_TABLE = np.full(128, 5, dtype=np.uint8)
+CLASS_TABLE[0] = 0
+for _code, _characters in enumerate([string.ascii_lowercase, string.ascii_uppercase, string.digits,
+                                     string.punctuation + ' '], start=1):
+    CLASS_TABLE[[ord(character) for character in _characters]] = _code
+CLASS_SIZES = np.array([0, 26, 26, 10, 33, 100])
+
+
+class PasswordPolicy:
+    """
+    Describes the passwords to generate and how strong they come out.
+
+    random mode picks every character from the allowed classes and guarantees the minimum count
+    of each, uniformly among all passwords meeting the minimums. pronounceable mode alternates
+    consonants and vowels, then capitalises min_upper letters and appends the required digits and
+    special characters. passphrase mode joins words from a word list, or made-up pronounceable words
+    without one, with the digits and special characters as a last word.
+
+    Args:
+        length (int, optional): Characters per password, random and pronounceable modes. Default is 16.
+        min_lower (int, optional): Minimum lower case letters, random mode. Default is 1.
+        min_upper (int, optional): Minimum upper case letters, or capitalised words. Default is 1.
+        min_digits (int, optional): Minimum digits. Default is 1.
+        min_special (int, optional): Minimum special characters. Default is 1.
+        digits (bool, optional): Allow digits at all. Default is True.
+        special (bool, optional): Allow special characters at all. Default is True.
+        exclude_ambiguous (bool, optional): Leave out AMBIGUOUS characters. Default is False.
+        mode (str, optional): One of MODES. Default is 'random'.
+        words (int, optional): Words per passphrase. Default is 5.
+        separator (str, optional): Between passphrase words. Default is '-'.
+        wordlist (str, optional): File of passphrase words, one per line, e.g. the EFF list.
+    """
+
+    def __init__(self, length: int = 16, min_lower: int = 1, min_upper: int = 1, min_digits: int = 1,
+                 min_special: int = 1, digits: bool = True, special: bool = True, exclude_ambiguous: bool = False,
+                 mode: str = 'random', words: int = 5, separator: str = '-', wordlist: str | None = None):
+        if mode not in MODES:
+            raise ValueError(f"Mode must be one of {', '.join(MODES)}")
+        if not digits:
+            min_digits = 0
+        if not special:
+            min_special = 0
+        if min(length, words) <= 0 or min(min_lower, min_upper, min_digits, min_special) < 0:
+            raise ValueError("Lengths must be positive and minimums can't be negative")
+        self.length, self.mode, self.words, self.separator = length, mode, words, separator
+        excluded = set(AMBIGUOUS) if exclude_ambiguous else set()
+        self.classes = [(''.join(c for c in characters if c not in excluded), minimum) for characters, minimum in
+                        [(string.ascii_lowercase, min_lower), (string.ascii_uppercase, min_upper),
+                         (string.digits if digits else '', min_digits),
+                         (string.punctuation if special else '', min_special)]]
+        self.consonants = ''.join(c for c in CONSONANTS if c not in excluded)
+        self.vowels = ''.join(c for c in VOWELS if c not in excluded)
+        self.wordlist = self._read_words(wordlist) if wordlist else None
+        # Letters of a pronounceable password, the rest is the required digits and special characters
+        self.letters = length - min_digits - min_special
+
+        if mode == 'random' and sum(minimum for _, minimum in self.classes) > length:
+            raise ValueError(f"The minimums add up to more than {length} characters")
+        if mode == 'pronounceable' and self.letters < min_upper:
+            raise ValueError(f"{length} characters leave too few letters for the minimums")
+        if mode == 'passphrase' and words < min_upper:
+            raise ValueError(f"{words} words can't have {min_upper} capitalised")
+        # ways[i][n]: how many strings of n characters drawn from classes i onwards meet their minimums
+        self._ways = self._count_ways()
+        self.acceptance = self._ways[0][length] / len(self.alphabet) ** length
+
+    @property
+    def alphabet(self) -> str:
+        return ''.join(characters for characters, _ in self.classes)
+
+    def entropy(self) -> float:
+        """Returns the bits of entropy of a password from this policy, log2 of how many it picks from"""
+        (_, min_upper), (digits, min_digits), (special, min_special) = self.classes[1:]
+        extras = min_digits * math.log2(len(digits) or 1) + min_special * math.log2(len(special) or 1)
+        if self.mode == 'random':
+            return math.log2(self._ways[0][self.length])
+        if self.mode == 'pronounceable':
+            consonants, vowels = (self.letters + 1) // 2, self.letters // 2
+            return (consonants * math.log2(len(self.consonants)) + vowels * math.log2(len(self.vowels))
+                    + math.log2(math.comb(self.letters, min_upper)) + extras)
+        vocabulary = len(self.wordlist) if self.wordlist else len(self.consonants) ** 3 * len(self.vowels) ** 2
+        return self.words * math.log2(vocabulary) + math.log2(math.comb(self.words, min_upper)) + extras
+
+    def generate(self, count: int) -> Iterator[list[str]]:
+        """
+        Generates count passwords, yielded in lists of up to BATCH_SIZE.
+
+        Args:
+            count (int): Number of passwords.
+
+        Returns:
+            Iterator[list[str]]: Lists of passwords, count of them in total.
+        """
+        if self.mode != 'random':
+            make = self._pronounceable if self.mode == 'pronounceable' else self._passphrase
+            for start in range(0, count, BATCH_SIZE):
+                yield [make() for _ in range(min(BATCH_SIZE, count - start))]
+        elif self.acceptance >= MIN_ACCEPTANCE:
+            yield from self._rejection_sampled(count)
+        else:
+            for start in range(0, count, BATCH_SIZE):
+                yield [self._constructed() for _ in range(min(BATCH_SIZE, count - start))]
+
+    def _rejection_sampled(self, count: int) -> Iterator[list[str]]:
+        """Draws whole passwords from the full alphabet and drops the ones short of a minimum"""
+        # Deleting every other character leaves just a class, its length is the class count
+        others = [(str.maketrans('', '', ''.join(c for c in self.alphabet if c not in characters)), minimum)
+                  for characters, minimum in self.classes if minimum]
+        while count > 0:
+            drawn = min(BATCH_SIZE, math.ceil(count / self.acceptance * 1.1))
+            kept = [password for passwords in generate_batch(drawn, self.length, characters=self.alphabet)
+                    for password in passwords
+                    if all(len(password.translate(table)) >= minimum for table, minimum in others)][:count]
+            count -= len(kept)
+            if kept:
+                yield kept
+
+    def _constructed(self) -> str:
+        """Picks how many characters of each class with their share of compliant passwords, then shuffles"""
+        remaining, characters = self.length, []
+        for number, (alphabet, minimum) in enumerate(self.classes):
+            if number == len(self.classes) - 1:
+                taken = remaining
+            else:
+                after = self._ways[number + 1]
+                weights = [math.comb(remaining, taken) * len(alphabet) ** taken * after[remaining - taken]
+                           for taken in range(minimum, remaining + 1)]
+                pick = secrets.randbelow(sum(weights))
+                for taken, weight in enumerate(weights, start=minimum):
+                    if pick < weight:
+                        break
+                    pick -= weight
+            characters += [secrets.choice(alphabet) for _ in range(taken)]
+            remaining -= taken
+        random.SystemRandom().shuffle(characters)
+        return ''.join(characters)
+
+    def _pronounceable(self) -> str:
+        letters = [secrets.choice(self.vowels if position % 2 else self.consonants) for position in range(self.letters)]
+        for position in random.SystemRandom().sample(range(self.letters), self.classes[1][1]):
+            letters[position] = letters[position].upper()
+        return ''.join(letters) + self._extras()
+
+    def _passphrase(self) -> str:
+        if self.wordlist:
+            words = [secrets.choice(self.wordlist) for _ in range(self.words)]
+        else:
+            words = [''.join(secrets.choice(self.vowels if position % 2 else self.consonants) for position in range(5))
+                     for _ in range(self.words)]
+        for position in random.SystemRandom().sample(range(self.words), self.classes[1][1]):
+            words[position] = words[position].capitalize()
+        extras = self._extras()
+        return self.separator.join(words + [extras] if extras else words)
+
+    def _extras(self) -> str:
+        """The required digits then special characters, which pronounceable passwords end with"""
+        (digits, min_digits), (special, min_special) = self.classes[2:]
+        return ''.join(secrets.choice(digits) for _ in range(min_digits)) + ''.join(
+            secrets.choice(special) for _ in range(min_special))
+
+    def _count_ways(self) -> list[list[int]]:
+        ways = [[1] + [0] * self.length]
+        for alphabet, minimum in reversed(self.classes):
+            after = ways[0]
+            ways.insert(0, [sum(math.comb(total, taken) * len(alphabet) ** taken * after[total - taken]
+                                for taken in range(minimum, total + 1)) for total in range(self.length + 1)])
+        return ways
+
+    @staticmethod
+    def _read_words(path: str) -> list[str]:
+        """Reads a word list, taking the last field of each line so dice-numbered lists work too"""
+        with open(path, 'r') as file:
+            words = sorted({line.split()[-1] for line in file if line.strip()})
+        if len(words) < 2:
+            raise ValueError(f"{path} needs at least two words")
+        logging.info(f"Loaded {len(words)} passphrase words from {path}")
+        return words
+
+
+def entropy(passwords: list[str]) -> np.ndarray:
+    """
+    Estimates the bits of entropy of many passwords at once.
+
+    Every password counts log2 of the combined size of the character classes it uses per character,
+    except characters repeating or continuing a run from the one before ('aaa', 'abc', '321'), which
+    count a bit each. The passwords are laid out as one array of code points and classified through
+    CLASS_TABLE, so the estimate runs in numpy rather than a Python loop per character.
+
+    Args:
+        passwords (list[str]): The passwords to score.
+
+    Returns:
+        np.ndarray: Estimated bits of entropy, in the same order.
+    """
+    if not passwords:
+        return np.zeros(0)
+    width = max(min(max(map(len, passwords)), SCORED_LENGTH), 1)
+    text = np.array(passwords, dtype=f'<U{width}')
+    codes = text.view(np.uint32).reshape(len(passwords), -1)
+    classes = np.where(codes < 128, CLASS_TABLE[np.minimum(codes, 127)], 5)
+    present = np.zeros((len(passwords), len(CLASS_SIZES)), dtype=bool)
+    present[np.arange(len(passwords))[:, None], classes] = True
+    pool = present[:, 1:] @ CLASS_SIZES[1:]
+    lengths = (codes != 0).sum(axis=1)
+    steps = np.abs(np.diff(codes.astype(np.int64), axis=1))
+    predictable = ((steps <= 1) & (codes[:, 1:] != 0)).sum(axis=1)
+    return (lengths - predictable) * np.log2(np.maximum(pool, 1)) + predictable
+
+
+def check(password: str) -> list[str]:
+    """
+    Returns what makes a single password weak, an empty list if nothing does.
+
+    Args:
+        password (str): The password to check.
+
+    Returns:
+        list[str]: Any of 'common', 'short' and 'low entropy'.
+    """
+    problems = []
+    if password.lower() in COMMON_PASSWORDS:
+        problems.append('common')
+    if len(password) < MIN_LENGTH:
+        problems.append('short')
+    if entropy([password])[0] < LOW_ENTROPY:
+        problems.append('low entropy')
+    return problems
+
+
+def audit(entries: list[tuple[str, str, str]]) -> list[tuple[str, str, float, list[str]]]:
+    """
+    Finds the weak, reused and low entropy passwords among a vault's entries.
+
+    Args:
+        entries (list[tuple[str, str, str]]): (username, account, password) of every entry.
+
+    Returns:
+        list[tuple]: (username, account, bits, problems) of every entry with a problem, problems
+            being any of 'common', 'short', 'low entropy' and 'reused'.
+    """
+    if not entries:
+        return []
+    passwords = [password for _, _, password in entries]
+    bits = entropy(passwords)
+    uses = collections.Counter(passwords)
+    reused = np.fromiter((uses[password] > 1 for password in passwords), dtype=bool, count=len(passwords))
+    short = np.fromiter((len(password) < MIN_LENGTH for password in passwords), dtype=bool, count=len(passwords))
+    common = np.fromiter((password.lower() in COMMON_PASSWORDS for password in passwords), dtype=bool,
+                         count=len(passwords))
+    low = bits < LOW_ENTROPY
+    flags = [(common, 'common'), (short, 'short'), (low, 'low entropy'), (reused, 'reused')]
+    flagged = np.flatnonzero(common | short | low | reused)
+    logging.info(f"Audited {len(entries)} passwords, {len(flagged)} have problems")
+    return [(entries[row][0], entries[row][1], float(bits[row]), [name for mask, name in flags if mask[row]])
+            for row in flagged]
@@ -0,0 +1,145 @@
+import bisect
+import heapq
+import itertools
+import math
+from collections import defaultdict
+from typing import Iterable
+
+# Share of the query's trigrams a term needs to count as a fuzzy match, pg_trgm's default
+SIMILARITY = 0.3
+# Most terms a fuzzy query scores, taken from its rarest trigrams first, keeps every keystroke well under 1 ms
+CANDIDATES = 300
+
+
+def trigrams(term: str) -> frozenset[str]:
+    """Returns the trigrams of a lowercase term, padded so its first and last letters get their own"""
+    padded = f'  {term} '
+    return frozenset(map(''.join, zip(padded, padded[1:], padded[2:])))
+
+
+class EntryIndex:
+    """
+    In-memory search index over the usernames and accounts of the vault, for search-as-you-type.
+
+    Every distinct lowercase username or account is a term. Terms are kept sorted, so prefix
+    matches are a bisect away, and in a trigram inverted index for fuzzy matches that tolerate
+    typos and match inside a term. Queries only score a bounded number of the terms sharing the
+    query's rarest trigrams, never the whole vault.
+
+    Args:
+        entries (Iterable[tuple[str, str]], optional): The (username, account) pairs to index.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = ()):
+        # Each term's entries stay sorted, so a query takes the first few without sorting
+        self._entries: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        self._sorted: list[str] = []
+        self._grams: dict[str, set[str]] = defaultdict(set)
+        self._term_grams: dict[str, frozenset[str]] = {}
+        self.rebuild(entries)
+
+    def rebuild(self, entries: Iterable[tuple[str, str]]) -> None:
+        """Replaces the index with the given (username, account) pairs"""
+        self.clear()
+        for username, account in entries:
+            for term in (username.lower(), account.lower()):
+                self._entries[term].append((username, account))
+        for term_entries in self._entries.values():
+            term_entries.sort()
+        self._sorted = sorted(self._entries)
+        for term in self._sorted:
+            self._index_grams(term)
+
+    def clear(self) -> None:
+        """Empties the index"""
+        self._entries.clear()
+        self._sorted.clear()
+        self._grams.clear()
+        self._term_grams.clear()
+
+    def add(self, username: str, account: str) -> None:
+        """Indexes a new entry"""
+        for term in (username.lower(), account.lower()):
+            if term not in self._entries:
+                bisect.insort(self._sorted, term)
+                self._index_grams(term)
+            bisect.insort(self._entries[term], (username, account))
+
+    def remove(self, username: str, account: str) -> None:
+        """Drops an entry from the index, and any term no other entry uses"""
+        for term in (username.lower(), account.lower()):
+            entries = self._entries.get(term)
+            if entries is None:
+                continue
+            position = bisect.bisect_left(entries, (username, account))
+            if entries[position:position + 1] == [(username, account)]:
+                del entries[position]
+            if not entries:
+                del self._entries[term]
+                del self._sorted[bisect.bisect_left(self._sorted, term)]
+                for gram in self._term_grams.pop(term):
+                    self._grams[gram].discard(term)
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[str, str]]:
+        """
+        Finds the entries whose username or account matches a partly typed query.
+
+        Prefix matches come first in alphabetical order, then fuzzy matches by trigram similarity.
+
+        Args:
+            query (str): What was typed so far, case doesn't matter.
+            limit (int, optional): Most entries to return. Default is 20.
+
+        Returns:
+            list[tuple[str, str]]: Matching (username, account) pairs, best first.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        terms, found = [], 0
+        start = bisect.bisect_left(self._sorted, query)
+        for term in self._sorted[start:start + limit]:
+            if not term.startswith(query):
+                break
+            terms.append(term)
+            found += len(self._entries[term])
+        if found < limit:
+            terms.extend(self._fuzzy(query, set(terms), limit - len(terms)))
+
+        results: dict[tuple[str, str], None] = {}
+        for term in terms:
+            for entry in self._entries[term][:limit]:
+                results[entry] = None
+                if len(results) == limit:
+                    return list(results)
+        return list(results)
+
+    def _fuzzy(self, query: str, found: set[str], limit: int) -> list[str]:
+        """Returns up to limit terms not in found that share enough trigrams with the query"""
+        grams = trigrams(query)
+        required = max(1, math.ceil(len(grams) * SIMILARITY))
+        # Any term with `required` shared trigrams has at least one of the len - required + 1 rarest
+        rarest = sorted(grams, key=lambda gram: len(self._grams.get(gram, ())))[:len(grams) - required + 1]
+        candidates: set[str] = set()
+        for gram in rarest:
+            posting = self._grams.get(gram, ())
+            if len(candidates) + len(posting) > CANDIDATES:
+                # The rarer trigrams are the more telling ones, top up from this one and stop
+                candidates.update(itertools.islice(posting, CANDIDATES - len(candidates)))
+                break
+            candidates.update(posting)
+        candidates -= found
+        term_grams = self._term_grams
+        scored = []
+        for term in candidates:
+            shared = len(grams & term_grams[term])
+            if shared >= required:
+                # Most shared trigrams first, then the closest in length, a typo rarely adds or drops letters
+                scored.append((-shared, abs(len(term) - len(query)), term))
+        return [term for *_, term in heapq.nsmallest(limit, scored)]
+
+    def _index_grams(self, term: str) -> None:
+        grams = trigrams(term)
+        self._term_grams[term] = grams
+        for gram in grams:
+            self._grams[gram].add(term)
@@ -0,0 +1,159 @@
+import base64
+import json
+import logging
+import os
+import zlib
+
+import password_db
+from drive_uploader import DriveFolder
+
+MANIFEST = 'Passwords-manifest.json'
+# Deltas kept on top of a snapshot, the sync after that compacts them all into a new snapshot
+COMPACT_AFTER = 20
+FORMAT = 1
+
+
+class SyncError(RuntimeError):
+    """Raised when a backup can't be made or restored, e.g. a missing file or the wrong master password"""
+
+
+def _manifest(connection) -> dict | None:
+    """Returns the manifest of the last backup made from this database, None before the first one"""
+    row = connection.execute("SELECT Value FROM sync_state WHERE Name = 'manifest'").fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _pack(name: str, rows: list[tuple[str, str, bytes]], deleted: list[tuple[str, str]]) -> bytes:
+    """Compresses and encrypts a backup file, bound to its name so files can't be swapped around"""
+    payload = {'rows': [(username, account, base64.b64encode(token).decode()) for username, account, token in rows],
+               'deleted': deleted}
+    return password_db.vault.seal(zlib.compress(json.dumps(payload).encode()), name.encode())
+
+
+def _unpack(name: str, data: bytes) -> dict:
+    return json.loads(zlib.decompress(password_db.vault.unseal(data, name.encode())))
+
+
+def sync(folder: DriveFolder, compact_after: int = COMPACT_AFTER) -> str:
+    """
+    Backs up what changed in Passwords.db since the last sync, the vault has to be unlocked.
+
+    The first sync uploads a snapshot of every entry. Later ones only upload a delta with the current
+    state of the entries added, edited or deleted since, read from the changes log, until compact_after
+    deltas pile up and the next sync replaces them with a fresh snapshot. Files are compressed and
+    encrypted with the vault key. The manifest listing the snapshot and its deltas is written last,
+    so an interrupted sync leaves the previous backup intact.
+
+    Args:
+        folder (DriveFolder): The Drive folder holding the backup.
+        compact_after (int, optional): Deltas allowed before compacting. Default is 20.
+
+    Returns:
+        str: 'snapshot', 'delta' or 'up to date', what was uploaded.
+    """
+    connection = password_db.get_connection()
+    # One read transaction, so the entries match the change log position recorded with them
+    connection.execute("BEGIN")
+    try:
+        manifest = _manifest(connection)
+        # Synced changes are deleted from the log, so its last Seq comes from the AUTOINCREMENT counter
+        seq = connection.execute("SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'changes'), 0)"
+                                 ).fetchone()[0]
+        if manifest is not None and seq == manifest['seq']:
+            return 'up to date'
+        if manifest is None or len(manifest['deltas']) >= compact_after:
+            generation = manifest['generation'] + 1 if manifest else 1
+            name = f'Passwords-snapshot-{generation:04d}.bin'
+            rows = connection.execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager").fetchall()
+            deleted = []
+            salt, n, r, p, verifier = connection.execute("SELECT Salt, N, R, P, Verifier FROM vault").fetchone()
+            obsolete = [manifest['snapshot'], *manifest['deltas']] if manifest else []
+            manifest = {'format': FORMAT, 'vault': {'salt': salt.hex(), 'n': n, 'r': r, 'p': p,
+                                                    'verifier': verifier.hex()},
+                        'generation': generation, 'snapshot': name, 'deltas': []}
+        else:
+            name = f"Passwords-delta-{manifest['generation']:04d}-{len(manifest['deltas']) + 1:04d}.bin"
+            changed = connection.execute("SELECT DISTINCT USERNAME, ACCOUNT FROM changes WHERE Seq > ?",
+                                         (manifest['seq'],)).fetchall()
+            rows = connection.execute("SELECT USERNAME, ACCOUNT, PASSWORD FROM manager WHERE (USERNAME, ACCOUNT) IN "
+                                      "(SELECT USERNAME, ACCOUNT FROM changes WHERE Seq > ?)",
+                                      (manifest['seq'],)).fetchall()
+            present = {(username, account) for username, account, _ in rows}
+            deleted = [key for key in changed if key not in present]
+            obsolete = []
+            manifest['deltas'].append(name)
+    finally:
+        connection.commit()
+
+    data = _pack(name, rows, deleted)
+    folder.write(name, data)
+    manifest['seq'] = seq
+    folder.write(MANIFEST, json.dumps(manifest).encode())
+    with connection:
+        connection.execute("INSERT OR REPLACE INTO sync_state VALUES ('manifest', ?)", (json.dumps(manifest),))
+        connection.execute("DELETE FROM changes WHERE Seq <= ?", (seq,))
+    # Only once the manifest stopped listing them
+    for obsolete_name in obsolete:
+        folder.delete(obsolete_name)
+    kind = 'delta' if manifest['deltas'] else 'snapshot'
+    logging.info(f"Backed up {len(rows)} entries and {len(deleted)} deletions in {name} ({len(data)} bytes)")
+    return kind
+
+
+def restore(folder: DriveFolder, password: str, database: str) -> int:
+    """
+    Rebuilds a password database from its Drive backup: the snapshot, then every delta in order.
+
+    The restored database continues the backup, its next sync only uploads what changed after it.
+
+    Args:
+        folder (DriveFolder): The Drive folder holding the backup.
+        password (str): The vault's master password.
+        database (str): Path of the database to create, it must not exist yet.
+
+    Returns:
+        int: The number of entries restored.
+    """
+    if os.path.exists(database):
+        raise SyncError(f"{database} already exists")
+    data = folder.read(MANIFEST)
+    if data is None:
+        raise SyncError(f"No backup found in {folder.folder_name}")
+    manifest = json.loads(data)
+    vault = manifest['vault']
+
+    password_db.close()
+    password_db.use_database(database)
+    password_db.create_database()
+    connection = password_db.get_connection()
+    with connection:
+        connection.execute("INSERT INTO vault VALUES (?, ?, ?, ?, ?)",
+                           (bytes.fromhex(vault['salt']), vault['n'], vault['r'], vault['p'],
+                            bytes.fromhex(vault['verifier'])))
+    if not password_db.unlock(password):
+        password_db.close()
+        os.remove(database)
+        raise SyncError("Wrong master password")
+
+    entries: dict[tuple[str, str], bytes] = {}
+    for name in [manifest['snapshot'], *manifest['deltas']]:
+        data = folder.read(name)
+        if data is None:
+            raise SyncError(f"{name} is missing from the backup")
+        payload = _unpack(name, data)
+        for username, account, token in payload['rows']:
+            entries[(username, account)] = base64.b64decode(token)
+        for username, account in payload['deleted']:
+            entries.pop((username, account), None)
+
+    with connection:
+        connection.executemany("INSERT INTO manager VALUES(?, ?, ?)",
+                               ((username, account, token) for (username, account), token in entries.items()))
+        connection.execute("DELETE FROM changes")
+        # Carry on numbering changes from where the backup left off
+        connection.execute("DELETE FROM sqlite_sequence WHERE name = 'changes'")
+        connection.execute("INSERT INTO sqlite_sequence VALUES ('changes', ?)", (manifest['seq'],))
+        connection.execute("INSERT OR REPLACE INTO sync_state VALUES ('manifest', ?)", (json.dumps(manifest),))
+    password_db.index.rebuild(entries)
+    logging.info(f"Restored {len(entries)} entries from {1 + len(manifest['deltas'])} backup files")
+    return len(entries)
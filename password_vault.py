@@ -0,0 +1,138 @@
+import hashlib
+import hmac
+import logging
+import os
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+NONCE_SIZE = 12
+SALT_SIZE = 16
+KEY_SIZE = 32
+# Sealed with the vault key when the vault is created, it only opens with the right master password
+VERIFIER = b'Passwords.db vault'
+
+
+class VaultLocked(RuntimeError):
+    """Raised when an entry is encrypted or decrypted before the vault was unlocked"""
+
+
+class Vault:
+    """
+    Encrypts each password entry with AES-256-GCM under a key derived from the master password.
+
+    The key comes from scrypt, whose cost is tunable through n, r and p and stored with the vault,
+    so raising the defaults only affects vaults created afterwards. It is derived once, on unlock,
+    and kept in memory until lock(), so decrypting thousands of entries only costs AES.
+
+    Every entry is sealed with a fresh nonce and its username and account as associated data, a
+    ciphertext copied onto another entry fails to decrypt.
+
+    Args:
+        n (int, optional): scrypt CPU/memory cost, a power of two. Default is 2**15 (32 MiB with r=8).
+        r (int, optional): scrypt block size. Default is 8.
+        p (int, optional): scrypt parallelism. Default is 1.
+    """
+
+    def __init__(self, n: int = 2 ** 15, r: int = 8, p: int = 1):
+        self.n, self.r, self.p = n, r, p
+        self._cipher: AESGCM | None = None
+        self._pepper = os.urandom(SALT_SIZE)
+        self._confirmation = b''
+
+    @property
+    def unlocked(self) -> bool:
+        return self._cipher is not None
+
+    @staticmethod
+    def derive_key(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        """Runs scrypt over the master password, the one deliberately slow step of unlocking"""
+        # scrypt needs 128 * r * (n + p + 2) bytes, hashlib refuses anything above 32 MiB unless told otherwise
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, dklen=KEY_SIZE,
+                              maxmem=128 * r * (n + p + 2) + 2 ** 20)
+
+    def create(self, password: str) -> tuple[bytes, int, int, int, bytes]:
+        """
+        Sets up a new vault for a master password and unlocks it.
+
+        Args:
+            password (str): The master password.
+
+        Returns:
+            tuple: The (salt, n, r, p, verifier) to store with the vault.
+        """
+        salt = os.urandom(SALT_SIZE)
+        self._open(password, AESGCM(self.derive_key(password, salt, self.n, self.r, self.p)))
+        logging.info(f"Created vault with scrypt n={self.n}, r={self.r}, p={self.p}")
+        return salt, self.n, self.r, self.p, self._seal(VERIFIER, b'')
+
+    def unlock(self, password: str, salt: bytes, n: int, r: int, p: int, verifier: bytes) -> bool:
+        """
+        Derives the key from the master password and keeps it for the session if it opens the verifier.
+
+        Once unlocked, asking again for the same password only compares it in memory, it doesn't rerun scrypt.
+
+        Args:
+            password (str): The master password.
+            salt (bytes): The vault's salt.
+            n (int): The vault's scrypt CPU/memory cost.
+            r (int): The vault's scrypt block size.
+            p (int): The vault's scrypt parallelism.
+            verifier (bytes): The vault's sealed verifier.
+
+        Returns:
+            bool: True if the password is the vault's master password.
+        """
+        if self.unlocked:
+            return hmac.compare_digest(self._confirm(password), self._confirmation)
+        cipher = AESGCM(self.derive_key(password, salt, n, r, p))
+        try:
+            cipher.decrypt(verifier[:NONCE_SIZE], verifier[NONCE_SIZE:], b'')
+        except InvalidTag:
+            logging.info("Vault unlock failed")
+            return False
+        self._open(password, cipher)
+        logging.info("Vault unlocked")
+        return True
+
+    def lock(self) -> None:
+        """Forgets the session key"""
+        self._cipher = None
+        self._confirmation = b''
+
+    def encrypt(self, username: str, account: str, password: str) -> bytes:
+        """Seals an entry's password, bound to its username and account"""
+        return self._seal(password.encode(), self._entry(username, account))
+
+    def decrypt(self, username: str, account: str, token: bytes) -> str:
+        """Opens a password sealed by encrypt() for the same username and account"""
+        if self._cipher is None:
+            raise VaultLocked("The vault is locked")
+        return self._cipher.decrypt(token[:NONCE_SIZE], token[NONCE_SIZE:], self._entry(username, account)).decode()
+
+    def seal(self, data: bytes, associated: bytes) -> bytes:
+        """Encrypts arbitrary data with the session key, e.g. a backup file, bound to associated (its name)"""
+        return self._seal(data, associated)
+
+    def unseal(self, token: bytes, associated: bytes) -> bytes:
+        """Opens data sealed by seal() with the same associated data, raising InvalidTag if it was tampered with"""
+        if self._cipher is None:
+            raise VaultLocked("The vault is locked")
+        return self._cipher.decrypt(token[:NONCE_SIZE], token[NONCE_SIZE:], associated)
+
+    def _open(self, password: str, cipher: AESGCM) -> None:
+        self._cipher = cipher
+        self._confirmation = self._confirm(password)
+
+    def _confirm(self, password: str) -> bytes:
+        return hmac.new(self._pepper, password.encode(), hashlib.sha256).digest()
+
+    def _seal(self, data: bytes, associated: bytes) -> bytes:
+        if self._cipher is None:
+            raise VaultLocked("The vault is locked")
+        nonce = os.urandom(NONCE_SIZE)
+        return nonce + self._cipher.encrypt(nonce, data, associated)
+
+    @staticmethod
+    def _entry(username: str, account: str) -> bytes:
+        return f'{username}\0{account}'.encode()
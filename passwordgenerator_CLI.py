@@ -0,0 +1,39 @@
+import click
+
+from password_policy import MODES, PasswordPolicy
+
+
+@click.command(name='passwords', help="Generate COUNT random passwords, one per line")
+@click.argument('count', type=click.IntRange(min=1))
+@click.option('-l', '--length', type=click.IntRange(min=1), default=16, show_default=True,
+              help='Length of every password')
+@click.option('-m', '--mode', type=click.Choice(MODES), default='random', show_default=True,
+              help='Random characters, pronounceable syllables or a passphrase of words')
+@click.option('--digits/--no-digits', default=True, help='Include digits')
+@click.option('--special/--no-special', default=True, help='Include special characters')
+@click.option('--min-lower', type=click.IntRange(min=0), default=1, show_default=True,
+              help='Minimum lower case letters')
+@click.option('--min-upper', type=click.IntRange(min=0), default=1, show_default=True,
+              help='Minimum upper case letters, capitalised words in a passphrase')
+@click.option('--min-digits', type=click.IntRange(min=0), default=1, show_default=True, help='Minimum digits')
+@click.option('--min-special', type=click.IntRange(min=0), default=1, show_default=True,
+              help='Minimum special characters')
+@click.option('--no-ambiguous', is_flag=True, help='Leave out look-alike characters such as l, 1, O and 0')
+@click.option('-w', '--words', type=click.IntRange(min=1), default=5, show_default=True, help='Words per passphrase')
+@click.option('--wordlist', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='Passphrase words, one per line, instead of made-up words')
+@click.option('-o', '--output', type=click.File('w'), default='-', help='File to write to, stdout by default')
+def generate(count, length, mode, digits, special, min_lower, min_upper, min_digits, min_special, no_ambiguous,
+             words, wordlist, output):
+    try:
+        policy = PasswordPolicy(length, min_lower, min_upper, min_digits, min_special, digits, special, no_ambiguous,
+                                mode, words, wordlist=wordlist)
+        click.echo(f"{policy.entropy():.1f} bits of entropy per password", err=True)
+        for passwords in policy.generate(count):
+            output.write('\n'.join(passwords) + '\n')
+    except (ValueError, OSError) as error:
+        click.echo(f"An error occurred: {error}")
+
+
+if __name__ == '__main__':
+    generate()
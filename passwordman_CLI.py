@@ -0,0 +1,104 @@
+import click
+
+import password_db
+import password_policy
+import password_sync
+from drive_uploader import DriveFolder, drive_service, load_credentials
+
+TOKEN_FILE = r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\token3.json'
+CREDENTIALS_FILE = r'C:\Users\huzai\PycharmProjects\Python-projects-1\Google\Drive_Credentials.json'
+DRIVE_FOLDER = 'Hexzdrivefolder'
+
+
+@click.group(name='passwords', help="Back the PasswordmanGUI vault up to Google Drive and restore it")
+@click.option('-f', '--folder', default=DRIVE_FOLDER, help='Drive folder holding the backup')
+@click.option('--endpoint', default=None,
+              help='Drive API endpoint to use instead of Google, e.g. a local fake Drive server. '
+                   'Requests to it are sent unauthenticated')
+@click.option('--ca-certs', default=None, type=click.Path(exists=True, dir_okay=False),
+              help="CA bundle to verify the endpoint's certificate with")
+@click.pass_context
+def passwords(context, folder, endpoint, ca_certs):
+    context.obj = (folder, endpoint, ca_certs)
+
+
+def open_vault(password: str) -> bool:
+    """Unlocks the vault, explaining why not when it can't be"""
+    if password_db.needs_new_master():
+        click.echo("The vault has no master password yet, set one in PasswordmanGUI first")
+        return False
+    if not password_db.unlock(password):
+        click.echo("Wrong master password")
+        return False
+    return True
+
+
+def backup_folder(context: click.Context) -> DriveFolder:
+    """Connects to the Drive folder given on the command line"""
+    folder, endpoint, ca_certs = context.obj
+    if endpoint:
+        from google.auth.credentials import AnonymousCredentials  # type: ignore
+
+        creds = AnonymousCredentials()
+    else:
+        creds = load_credentials(TOKEN_FILE, CREDENTIALS_FILE)
+    return DriveFolder(drive_service(creds, endpoint, ca_certs), folder)
+
+
+@passwords.command(name='sync', help="Upload what changed in the vault since the last backup")
+@click.option('-d', '--database', default=password_db.DATABASE, type=click.Path(exists=True, dir_okay=False),
+              help='Passwords database to back up')
+@click.option('--password', prompt='Master password', hide_input=True, help='The vault\'s master password')
+@click.pass_context
+def sync(context, database, password):
+    try:
+        password_db.use_database(database)
+        password_db.create_database()
+        if not open_vault(password):
+            return
+        kind = password_sync.sync(backup_folder(context))
+        click.echo({'snapshot': "Uploaded a new snapshot of the vault", 'delta': "Uploaded the changes since the last "
+                    "backup", 'up to date': "The backup is already up to date"}[kind])
+    except Exception as error:
+        click.echo(f"An error occurred: {error}")
+    finally:
+        password_db.close()
+
+
+@passwords.command(name='restore', help="Rebuild the vault into DATABASE from the Drive backup")
+@click.argument('database', type=click.Path(dir_okay=False))
+@click.option('--password', prompt='Master password', hide_input=True, help='The vault\'s master password')
+@click.pass_context
+def restore(context, database, password):
+    try:
+        restored = password_sync.restore(backup_folder(context), password, database)
+        click.echo(f"Restored {restored} entries into {database}")
+    except Exception as error:
+        click.echo(f"An error occurred: {error}")
+    finally:
+        password_db.close()
+
+
+@passwords.command(name='audit', help="List the weak, reused and low entropy passwords in the vault")
+@click.option('-d', '--database', default=password_db.DATABASE, type=click.Path(exists=True, dir_okay=False),
+              help='Passwords database to audit')
+@click.option('--password', prompt='Master password', hide_input=True, help='The vault\'s master password')
+def audit(database, password):
+    try:
+        password_db.use_database(database)
+        password_db.create_database()
+        if not open_vault(password):
+            return
+        entries = password_db.entries()
+        findings = password_policy.audit(entries)
+        for username, account, bits, problems in findings:
+            click.echo(f"{account} / {username}: {', '.join(problems)} ({bits:.0f} bits)")
+        click.echo(f"{len(findings)} of {len(entries)} passwords need changing")
+    except Exception as error:
+        click.echo(f"An error occurred: {error}")
+    finally:
+        password_db.close()
+
+
+if __name__ == '__main__':
+    passwords()
@@ -0,0 +1,135 @@
+import logging
+import os
+import re
+import sqlite3
+
+import sqlite_pool
+from sqlite_pool import ConnectionPool
+
+DATABASE = 'Passwordmanager.db'
+# Where Passwordmanager.py kept its entries before the database, imported once and renamed to
+# Passwords.txt.migrated
+LEGACY_FILE = 'Passwords.txt'
+LEGACY_LINE = re.compile(r'Account: (.*?), Username: (.*?), Password: (.*)')
+
+pool = ConnectionPool(DATABASE)
+
+# ACCOUNT is the primary key of a WITHOUT ROWID table, so the row lives in the key's b-tree:
+# exists, search and remove are a single seek, and a remove deletes one row instead of
+# rewriting every other entry.
+MIGRATIONS = [
+    ["CREATE TABLE IF NOT EXISTS accounts (ACCOUNT TEXT PRIMARY KEY, USERNAME TEXT NOT NULL, "
+     "PASSWORD TEXT NOT NULL) WITHOUT ROWID"],
+]
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns the current thread's long-lived connection to Passwordmanager.db"""
+    return pool.connect()
+
+
+def close() -> None:
+    """Closes every pooled connection to Passwordmanager.db"""
+    pool.close_all()
+
+
+def use_database(database: str) -> None:
+    """
+    Points the connection pool at another database file.
+
+    Args:
+        database (str): Path to the SQLite database file.
+    """
+    pool.database = database
+
+
+def create_database(legacy_file: str = LEGACY_FILE) -> None:
+    """
+    Creates or migrates the accounts table, importing Passwords.txt the first time.
+
+    Args:
+        legacy_file (str, optional): The old text file to import. Default is Passwords.txt.
+    """
+    connection = get_connection()
+    sqlite_pool.migrate(connection, MIGRATIONS)
+    if os.path.exists(legacy_file):
+        imported = import_text(legacy_file)
+        os.replace(legacy_file, f'{legacy_file}.migrated')
+        logging.info(f"Moved {imported} entries from {legacy_file} into {pool.database}")
+
+
+def import_text(path: str) -> int:
+    """
+    Imports entries saved as "Account: X, Username: Y, Password: Z" lines.
+
+    The old file allowed the same account more than once, only its first entry is kept.
+    Lines that don't match the format are logged and skipped.
+
+    Args:
+        path (str): Path to the text file.
+
+    Returns:
+        int: The number of entries imported.
+    """
+    rows = []
+    with open(path, 'r') as file:
+        for number, line in enumerate(file, start=1):
+            line = line.rstrip('\n')
+            match = LEGACY_LINE.fullmatch(line)
+            if match:
+                rows.append(match.groups())
+            elif line.strip():
+                logging.warning(f"Skipped line {number} of {path}, it isn't an account entry")
+    connection = get_connection()
+    with connection:
+        before = connection.total_changes
+        connection.executemany("INSERT OR IGNORE INTO accounts (ACCOUNT, USERNAME, PASSWORD) VALUES (?, ?, ?)",
+                               rows)
+        return connection.total_changes - before
+
+
+def add(account: str, username: str, password: str) -> bool:
+    """
+    Saves a new account.
+
+    Returns:
+        bool: False if the account already exists, it is left unchanged.
+    """
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute("INSERT OR IGNORE INTO accounts (ACCOUNT, USERNAME, PASSWORD) VALUES (?, ?, ?)",
+                                    (account, username, password))
+    return cursor.rowcount == 1
+
+
+def remove(account: str) -> bool:
+    """
+    Deletes an account.
+
+    Returns:
+        bool: False if there was no such account.
+    """
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute("DELETE FROM accounts WHERE ACCOUNT = ?", (account,))
+    return cursor.rowcount == 1
+
+
+def find(account: str) -> tuple[str, str] | None:
+    """
+    Looks an account up.
+
+    Returns:
+        tuple | None: The (username, password) of the account, None if it doesn't exist.
+    """
+    return get_connection().execute("SELECT USERNAME, PASSWORD FROM accounts WHERE ACCOUNT = ?",
+                                    (account,)).fetchone()
+
+
+def exists(account: str) -> bool:
+    return get_connection().execute("SELECT 1 FROM accounts WHERE ACCOUNT = ?", (account,)).fetchone() is not None
+
+
+def entries() -> list[tuple[str, str, str]]:
+    """Returns every (account, username, password), ordered by account"""
+    return get_connection().execute("SELECT ACCOUNT, USERNAME, PASSWORD FROM accounts ORDER BY ACCOUNT").fetchall()
@@ -0,0 +1,77 @@
+import logging
+import sqlite3
+import threading
+
+
+class ConnectionPool:
+    """
+    Hands out one long-lived SQLite connection per thread for a single database file.
+
+    Connections are opened lazily on first use, switched to WAL journal mode and keep
+    sqlite3's prepared-statement cache, so repeated queries with the same SQL text are
+    only compiled once per connection.
+
+    Args:
+        database (str): Path to the SQLite database file.
+        cached_statements (int, optional): Size of the per-connection statement cache. Default is 256.
+    """
+
+    def __init__(self, database: str, cached_statements: int = 256):
+        self.database = database
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Return the calling thread's connection, opening it if needed.
+
+        Returns:
+            sqlite3.Connection: A connection owned by the current thread.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # check_same_thread is off only so close_all() can run from the GUI thread,
+            # every connection is still used exclusively by the thread that opened it.
+            connection = sqlite3.connect(self.database, cached_statements=self.cached_statements,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+            logging.info(f"Opened connection to {self.database}")
+        return connection
+
+    def close_all(self) -> None:
+        """Close every connection handed out by the pool."""
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except sqlite3.Error as error:
+                    logging.error(f"Error closing connection to {self.database}: {error}")
+            self._connections.clear()
+            self._local = threading.local()
+        logging.info(f"Closed all connections to {self.database}")
+
+
+def migrate(connection: sqlite3.Connection, migrations: list[list[str]]) -> None:
+    """
+    Applies any schema migrations newer than the database's user_version.
+
+    Migration n (1-based) runs in its own transaction and sets user_version to n, so a
+    database only ever runs each migration once.
+
+    Args:
+        connection (sqlite3.Connection): The connection to migrate.
+        migrations (list[list[str]]): The SQL statements of every migration, oldest first.
+    """
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    for number, statements in enumerate(migrations[version:], start=version + 1):
+        with connection:
+            for statement in statements:
+                connection.execute(statement)
+            connection.execute(f'PRAGMA user_version = {number}')
+        logging.info(f'Applied migration {number}')
@@ -0,0 +1,127 @@
+import logging
+import queue
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+class TaskRunner:
+    """
+    Runs slow work off the Tk event loop and hands the results back on it.
+
+    I/O (database queries) runs on a thread pool and CPU heavy work (rendering charts and
+    spreadsheets) on a process pool, started on first use. Finished futures are collected on a
+    queue that the widget polls with after(), so on_done/on_error always run on the Tk thread
+    and may touch widgets.
+
+    Every task is submitted under a key, e.g. 'view'. Submitting a key again supersedes the
+    earlier task: it is cancelled if it has not started and its result is dropped if it has.
+
+    Args:
+        widget (tk.Misc): Any widget of the window, used to schedule the polling.
+        io_workers (int, optional): Threads for I/O tasks. Default is 4.
+        render_workers (int | None, optional): Processes for render tasks. Default is one per CPU.
+        render_initializer (Callable | None, optional): Run once in every render process, must be picklable.
+        render_initargs (tuple, optional): Arguments for render_initializer.
+        poll_interval (int, optional): Milliseconds between polls while tasks are running. Default is 50ms.
+    """
+
+    def __init__(self, widget: tk.Misc, io_workers: int = 4, render_workers: int | None = None,
+                 render_initializer: Callable | None = None, render_initargs: tuple = (), poll_interval: int = 50):
+        self.widget = widget
+        self.render_workers = render_workers
+        self.render_initializer = render_initializer
+        self.render_initargs = render_initargs
+        self.poll_interval = poll_interval
+        self._io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='tk-io')
+        self._render: 'ProcessPoolExecutor | None' = None
+        self._latest: dict[str, Future] = {}
+        self._finished: queue.Queue = queue.Queue()
+        self._polling = False
+
+    def run_io(self, key: str, function: Callable, *args, on_done: Callable,
+               on_error: Callable | None = None) -> Future:
+        """
+        Runs function(*args) on the I/O thread pool.
+
+        Args:
+            key (str): Identifies the request, a newer task with the same key supersedes this one.
+            function (Callable): The work to run.
+            on_done (Callable): Called with the result on the Tk thread.
+            on_error (Callable | None, optional): Called with the exception on the Tk thread. Default logs it.
+
+        Returns:
+            Future: The submitted task.
+        """
+        return self._submit(self._io, key, function, args, on_done, on_error)
+
+    def run_render(self, key: str, function: Callable, *args, on_done: Callable,
+                   on_error: Callable | None = None) -> Future:
+        """
+        Runs function(*args) on the render process pool.
+
+        function and args must be picklable, so pass module level functions and plain values, never widgets.
+        Arguments are the same as run_io().
+        """
+        if self._render is None:
+            # Importing the process pool pulls in multiprocessing, so it waits for the first render
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._render = ProcessPoolExecutor(max_workers=self.render_workers, initializer=self.render_initializer,
+                                               initargs=self.render_initargs)
+        return self._submit(self._render, key, function, args, on_done, on_error)
+
+    def cancel(self, key: str) -> None:
+        """Cancels the task running under key, if any, so its callbacks never run"""
+        future = self._latest.pop(key, None)
+        if future is not None:
+            future.cancel()
+            logging.info(f"Cancelled {key} task")
+
+    def running(self, key: str) -> bool:
+        """Returns whether a task is still pending under key"""
+        return key in self._latest
+
+    def shutdown(self) -> None:
+        """Cancels every pending task and stops the pools without waiting for running ones"""
+        for key in list(self._latest):
+            self.cancel(key)
+        self._io.shutdown(wait=False, cancel_futures=True)
+        if self._render is not None:
+            self._render.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, executor, key: str, function: Callable, args: tuple, on_done: Callable,
+                on_error: Callable | None) -> Future:
+        self.cancel(key)
+        future = executor.submit(function, *args)
+        self._latest[key] = future
+        # Runs on the worker's thread, so only hand the future over and let _poll() dispatch it
+        future.add_done_callback(lambda done: self._finished.put((key, done, on_done, on_error)))
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_interval, self._poll)
+        return future
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                key, future, on_done, on_error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            if self._latest.get(key) is not future:
+                continue  # Superseded or cancelled
+            del self._latest[key]
+            error = future.exception()
+            if error is None:
+                on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                logging.error(f"{key} task failed: {error}")
+        if self._latest:
+            self.widget.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,121 @@
+import logging
+import tkinter as tk
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+
+class VirtualList(tk.Frame):
+    """
+    A read-only scrolling text list that only ever holds the rows in view.
+
+    Rows come from a source: a row count and a fetch(start, stop) callable returning the formatted
+    rows of that range, e.g. a LIMIT/OFFSET query or a slice of arrays. Rows are fetched a page at
+    a time as the list scrolls and the last few pages are kept, so a list of a million rows costs
+    about as much to show and scroll as a screenful. Each render replaces the text in one insert.
+
+    Every row of a source spans the same number of lines (row_height), a header and a footer can
+    stay fixed above and below the rows.
+
+    Args:
+        master (tk.Misc): The parent widget.
+        page_size (int, optional): Rows fetched at a time. Default is 100.
+        cached_pages (int, optional): Pages kept after they scroll out of view. Default is 8.
+        **text_options: Options for the text widget, e.g. width, height (in lines) and font.
+    """
+
+    def __init__(self, master: tk.Misc, page_size: int = 100, cached_pages: int = 8, **text_options):
+        super().__init__(master)
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self.text = tk.Text(self, wrap=tk.NONE, **text_options)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.config(state='disabled')
+        for sequence, step in (('<Button-4>', -1), ('<Button-5>', 1), ('<Up>', -1), ('<Down>', 1)):
+            self.text.bind(sequence, lambda event, step=step: self._step(step))
+        self.text.bind('<MouseWheel>', lambda event: self._step(-1 if event.delta > 0 else 1))
+        self.text.bind('<Prior>', lambda event: self._step(-self.visible_rows))
+        self.text.bind('<Next>', lambda event: self._step(self.visible_rows))
+        self.text.bind('<Home>', lambda event: self.scroll_to(0) or 'break')
+        self.text.bind('<End>', lambda event: self.scroll_to(self.count) or 'break')
+        self.clear()
+
+    @property
+    def visible_rows(self) -> int:
+        """How many rows fit between the header and the footer"""
+        footer = self._footer.count('\n') + 1 if self._footer else 0
+        lines = int(self.text.cget('height')) - self._header.count('\n') - footer
+        return max(1, lines // self._row_height)
+
+    def set_source(self, count: int, fetch: Callable[[int, int], Sequence[str]], row_height: int = 1,
+                   header: str = '', footer: str = '') -> None:
+        """
+        Shows count rows fetched on demand, from the top.
+
+        Args:
+            count (int): The number of rows.
+            fetch (Callable[[int, int], Sequence[str]]): Returns the formatted rows from start up to stop.
+            row_height (int, optional): Lines every row spans. Default is 1.
+            header (str, optional): Text kept above the rows, ending in a newline. Default is none.
+            footer (str, optional): Text kept below the rows. Default is none.
+        """
+        self.count, self._fetch, self._row_height = count, fetch, row_height
+        self._header, self._footer = header, footer
+        self._pages: OrderedDict[int, Sequence[str]] = OrderedDict()
+        self._first = 0
+        self._render()
+
+    def set_rows(self, rows: Sequence[str], row_height: int = 1, header: str = '', footer: str = '') -> None:
+        """Shows rows that are already in memory, only the visible ones are ever rendered"""
+        self.set_source(len(rows), lambda start, stop: rows[start:stop], row_height, header, footer)
+
+    def clear(self) -> None:
+        """Empties the list"""
+        self.set_rows([])
+
+    def scroll_to(self, row: int) -> None:
+        """Scrolls so row is the first visible one, as far as the rows allow"""
+        first = max(0, min(row, self.count - self.visible_rows))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def _step(self, rows: int) -> str:
+        self.scroll_to(self._first + rows)
+        return 'break'  # Keep Tk's own text scrolling out of it
+
+    def _scrollbar(self, action: str, amount: str, unit: str = 'units') -> None:
+        if action == 'moveto':
+            self.scroll_to(round(float(amount) * self.count))
+        else:
+            self.scroll_to(self._first + int(amount) * (self.visible_rows if unit == 'pages' else 1))
+
+    def _rows(self, start: int, stop: int) -> list[str]:
+        """Returns rows start to stop from the cached pages, fetching the missing ones"""
+        rows = []
+        for page in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+            if page in self._pages:
+                self._pages.move_to_end(page)
+            else:
+                page_start = page * self.page_size
+                self._pages[page] = self._fetch(page_start, min(page_start + self.page_size, self.count))
+                logging.info(f"Fetched rows {page_start} to {page_start + len(self._pages[page])}")
+                while len(self._pages) > self.cached_pages:
+                    self._pages.popitem(last=False)
+            rows.extend(self._pages[page])
+        offset = start - start // self.page_size * self.page_size
+        return rows[offset:offset + stop - start]
+
+    def _render(self) -> None:
+        stop = min(self._first + self.visible_rows, self.count)
+        rows = self._rows(self._first, stop) if stop > self._first else []
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, self._header + '\n'.join(rows) + ('\n' if rows and self._footer else '') +
+                         self._footer)
+        self.text.config(state='disabled')
+        if self.count:
+            self.scrollbar.set(self._first / self.count, stop / self.count)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,236 @@
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import sqlite_pool
+from sqlite_pool import ConnectionPool
+
+DATABASE = 'Weather.db'
+BASE_URL = 'http://api.openweathermap.org'
+ICON_URL = 'http://openweathermap.org/img/wn'
+
+MINUTE, HOUR, DAY = 60, 60 * 60, 24 * 60 * 60
+# The free OpenWeather plan allows 60 API calls a minute
+CALLS_PER_MINUTE = 60
+# Attempts at a request the API answers with 429 Too Many Requests
+RETRIES = 3
+# How long each kind of response is fresh, then how much longer it may still be shown while a
+# background request refreshes it. Past both, a lookup waits for the network again.
+TTLS = {'geocode': 30 * DAY, 'weather': 10 * MINUTE, 'forecast': HOUR, 'icon': 30 * DAY}
+STALE = {'geocode': 365 * DAY, 'weather': HOUR, 'forecast': 6 * HOUR, 'icon': 365 * DAY}
+
+MIGRATIONS = [
+    ["CREATE TABLE IF NOT EXISTS responses (Kind TEXT NOT NULL, Key TEXT NOT NULL, Body BLOB NOT NULL, "
+     "Fetched REAL NOT NULL, PRIMARY KEY (Kind, Key)) WITHOUT ROWID"],
+]
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread making API calls.
+
+    Up to calls requests go through at once, then one more every period / calls seconds.
+
+    Args:
+        calls (int): Requests allowed per period.
+        period (float): Length of the period in seconds.
+        clock (Callable, optional): Monotonic time in seconds. Default is time.monotonic.
+        sleep (Callable, optional): Waits a number of seconds. Default is time.sleep.
+    """
+
+    def __init__(self, calls: int, period: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.calls, self.period = calls, period
+        self.clock, self.sleep = clock, sleep
+        self.waited = 0.0
+        self._tokens = float(calls)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until the next request may be sent"""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.calls, self._tokens + (now - self._updated) * self.calls / self.period)
+            self._updated = now
+            # Taking the token up front reserves the caller's slot, a negative balance is the queue ahead
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens) * self.period / self.calls
+            self.waited += wait
+        if wait:
+            self.sleep(wait)
+
+
+class WeatherClient:
+    """
+    Fetches from the OpenWeather API through a persistent cache in Weather.db.
+
+    City names are geocoded once and their coordinates kept for a month, current conditions are
+    kept for 10 minutes and the 5 day forecast for an hour, see TTLS. A response past its TTL but
+    within STALE is returned straight away while a background thread fetches a fresh one
+    (stale-while-revalidate), and any cached response is returned if the network fails.
+
+    The client is thread safe: every thread shares the session's connection pool and the rate
+    limiter, and gets its own connection to the cache.
+
+    Args:
+        api_key (str): The OpenWeather API key.
+        base_url (str, optional): API root, e.g. a local stub server. Default is BASE_URL.
+        icon_url (str, optional): Weather icon root. Default is ICON_URL.
+        database (str, optional): Path to the cache database. Default is Weather.db.
+        session (requests.Session, optional): Session to send requests with, a new one by default.
+        clock (Callable, optional): Returns the current time in seconds. Default is time.time.
+        timeout (float, optional): Seconds to wait for a response. Default is 10.
+        rate_limit (RateLimiter, optional): Limits the API calls, icons aren't counted. Default is
+            CALLS_PER_MINUTE a minute.
+        pool_size (int, optional): Connections kept open per host. Default is 10.
+    """
+
+    def __init__(self, api_key: str, base_url: str = BASE_URL, icon_url: str = ICON_URL, database: str = DATABASE,
+                 session: requests.Session | None = None, clock: Callable[[], float] = time.time,
+                 timeout: float = 10, rate_limit: RateLimiter | None = None, pool_size: int = 10):
+        self.api_key, self.base_url, self.icon_url = api_key, base_url.rstrip('/'), icon_url.rstrip('/')
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self.clock, self.timeout = clock, timeout
+        self.rate_limit = rate_limit or RateLimiter(CALLS_PER_MINUTE, MINUTE)
+        self.pool = ConnectionPool(database)
+        sqlite_pool.migrate(self.pool.connect(), MIGRATIONS)
+        self.hits = self.stale_hits = self.misses = 0
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='weather-refresh')
+        self._refreshing: set[tuple[str, str]] = set()
+        self._fetching: dict[tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def coordinates(self, city: str) -> tuple[float, float] | None:
+        """
+        Looks a city up with the geocoding API.
+
+        Args:
+            city (str): The city name.
+
+        Returns:
+            tuple | None: Its (lat, lon), None if OpenWeather doesn't know the city.
+        """
+        places = json.loads(self._get('geocode', city.strip().lower(), f'{self.base_url}/geo/1.0/direct',
+                                      {'q': city.strip(), 'limit': 1}))
+        return (places[0]['lat'], places[0]['lon']) if places else None
+
+    def current(self, city: str) -> dict | None:
+        """Returns the current weather response for a city, None if it isn't found"""
+        return self._by_coordinates('weather', city, '/data/2.5/weather', {})
+
+    def forecast(self, city: str) -> dict | None:
+        """
+        Returns the full 5 day forecast response for a city, None if it isn't found.
+
+        Every forecast is fetched and cached for all 5 days, 8 three-hourly entries a day, so asking
+        for fewer days is a slice of the same cached response.
+        """
+        return self._by_coordinates('forecast', city, '/data/2.5/forecast', {'cnt': 40})
+
+    def icon(self, code: str) -> bytes:
+        """Returns the PNG of a weather icon"""
+        return self._get('icon', code, f'{self.icon_url}/{code}.png', None)
+
+    def close(self) -> None:
+        """Waits for background refreshes and closes the cache database and the session"""
+        self._refresher.shutdown(wait=True)
+        self.pool.close_all()
+        self.session.close()
+
+    def _by_coordinates(self, kind: str, city: str, path: str, params: dict) -> dict | None:
+        coordinates = self.coordinates(city)
+        if coordinates is None:
+            return None
+        lat, lon = coordinates
+        return json.loads(self._get(kind, f'{lat:.4f},{lon:.4f}', f'{self.base_url}{path}',
+                                    {'lat': lat, 'lon': lon, **params}))
+
+    def _get(self, kind: str, key: str, url: str, params: dict | None) -> bytes:
+        """Returns a response from the cache when it's fresh or within its stale window, else fetches it"""
+        body, age = self._cached(kind, key)
+        if age < TTLS[kind] + STALE[kind]:
+            return self._serve(kind, key, url, params, body, age)
+        # Threads missing the same entry wait for the first one's request instead of repeating it
+        with self._lock:
+            fetching = self._fetching.setdefault((kind, key), threading.Lock())
+        with fetching:
+            body, age = self._cached(kind, key)
+            if age < TTLS[kind] + STALE[kind]:
+                return self._serve(kind, key, url, params, body, age)
+            self._count('misses')
+            try:
+                return self._fetch(kind, key, url, params)
+            except requests.RequestException as error:
+                if body is None:
+                    raise
+                logging.warning(f"Showing a cached {kind} for {key}, the request failed: {error}")
+                return body
+
+    def _cached(self, kind: str, key: str) -> tuple[bytes | None, float]:
+        """Returns the cached body of an entry and its age, (None, inf) if it was never fetched"""
+        row = self.pool.connect().execute("SELECT Body, Fetched FROM responses WHERE Kind = ? AND Key = ?",
+                                          (kind, key)).fetchone()
+        return (row[0], self.clock() - row[1]) if row else (None, math.inf)
+
+    def _serve(self, kind: str, key: str, url: str, params: dict | None, body: bytes, age: float) -> bytes:
+        if age < TTLS[kind]:
+            self._count('hits')
+        else:
+            self._count('stale_hits')
+            self._revalidate(kind, key, url, params)
+        return body
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _fetch(self, kind: str, key: str, url: str, params: dict | None) -> bytes:
+        query = {**params, 'appid': self.api_key} if params is not None else None
+        for attempt in range(RETRIES):
+            if query is not None:
+                self.rate_limit.acquire()
+            response = self.session.get(url, params=query, timeout=self.timeout)
+            if response.status_code != 429 or attempt == RETRIES - 1:
+                break
+            retry_after = response.headers.get('Retry-After', '1')
+            logging.warning(f"Rate limited fetching {kind} for {key}, retrying in {retry_after}s")
+            time.sleep(float(retry_after) if retry_after.replace('.', '', 1).isdigit() else 1)
+        response.raise_for_status()
+        connection = self.pool.connect()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO responses (Kind, Key, Body, Fetched) VALUES (?, ?, ?, ?)",
+                               (kind, key, response.content, self.clock()))
+        logging.info(f"Fetched {kind} for {key}")
+        return response.content
+
+    def _revalidate(self, kind: str, key: str, url: str, params: dict | None) -> None:
+        """Refreshes a stale response in the background, once however often it's asked for meanwhile"""
+        with self._lock:
+            if (kind, key) in self._refreshing:
+                return
+            self._refreshing.add((kind, key))
+
+        def refresh() -> None:
+            try:
+                self._fetch(kind, key, url, params)
+            except (requests.RequestException, sqlite3.Error) as error:
+                logging.warning(f"Couldn't refresh the {kind} for {key}: {error}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((kind, key))
+
+        self._refresher.submit(refresh)
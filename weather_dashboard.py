@@ -0,0 +1,81 @@
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from weather_client import WeatherClient
+
+WORKERS = 8
+
+
+def parse_cities(text: str) -> list[str]:
+    """Splits a comma separated list of cities, dropping blanks and repeats"""
+    cities: dict[str, str] = {}
+    for city in text.split(','):
+        if city.strip():
+            cities.setdefault(city.strip().lower(), city.strip().capitalize())
+    return list(cities.values())
+
+
+def fetch_city(client: WeatherClient, city: str) -> tuple[str, dict | None, dict | None, bytes | None, float,
+                                                           str | None]:
+    """
+    Fetches a city's current weather, forecast and weather icon, timing the whole lookup.
+
+    Args:
+        client (WeatherClient): The client to fetch through.
+        city (str): The city name.
+
+    Returns:
+        tuple: (city, current, forecast, icon, seconds, error), current and forecast are None if the
+            city isn't found, error describes a failed request.
+    """
+    start = time.perf_counter()
+    current = forecast = icon = error = None
+    try:
+        current = client.current(city)
+        if current is None:
+            error = "City not found"
+        else:
+            forecast = client.forecast(city)
+            icon = client.icon(current["weather"][0]["icon"])
+    except requests.RequestException as request_error:
+        error = str(request_error)
+        logging.error(f"Dashboard request for {city} failed: {request_error}")
+    return city, current, forecast, icon, time.perf_counter() - start, error
+
+
+def fetch_cities(client: WeatherClient, cities: list[str], workers: int = WORKERS) -> list[tuple]:
+    """
+    Fetches every city at once on a thread pool, sharing the client's session, cache and rate limiter.
+
+    Args:
+        client (WeatherClient): The client to fetch through.
+        cities (list[str]): The city names.
+        workers (int, optional): Cities fetched side by side. Default is 8.
+
+    Returns:
+        list[tuple]: fetch_city() results, in the order of cities.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(cities))), thread_name_prefix='weather') as pool:
+        results = list(pool.map(lambda city: fetch_city(client, city), cities))
+    logging.info(f"Fetched the weather of {len(cities)} cities")
+    return results
+
+
+def latency_stats(results: list[tuple]) -> tuple[float, float, float]:
+    """
+    Summarises how long the cities took.
+
+    Args:
+        results (list[tuple]): fetch_cities() results.
+
+    Returns:
+        tuple: The median, 95th percentile and slowest lookup, in milliseconds.
+    """
+    times = [seconds * 1000 for *_, seconds, _ in results]
+    if len(times) < 2:
+        return (times[0],) * 3 if times else (0.0, 0.0, 0.0)
+    return statistics.median(times), statistics.quantiles(times, n=20, method='inclusive')[-1], max(times)